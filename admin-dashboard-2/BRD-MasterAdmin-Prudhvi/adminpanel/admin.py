@@ -89,9 +89,12 @@ class SystemSettingAdmin(admin.ModelAdmin):
 
 @admin.register(Dashboard)
 class DashboardAdmin(admin.ModelAdmin):
-    list_display = ('id', 'total_tenants', 'active_users', 'total_loans', 'disbursed_amount', 'updated_at')
-    readonly_fields = ('created_at', 'updated_at')
+    list_display = ('id', 'tenant', 'total_tenants', 'active_users', 'total_loans', 'disbursed_amount', 'updated_at')
+    readonly_fields = ('created_at', 'updated_at', 'etag')
     fieldsets = (
+        ("Scope", {
+            "fields": ('tenant',)
+        }),
         ("KPIs", {
             "fields": (
                 'total_tenants', 'tenants_trend',
@@ -108,6 +111,6 @@ class DashboardAdmin(admin.ModelAdmin):
             )
         }),
         ("Timestamps", {
-            "fields": ('created_at', 'updated_at')
+            "fields": ('created_at', 'updated_at', 'etag')
         }),
     )
\ No newline at end of file
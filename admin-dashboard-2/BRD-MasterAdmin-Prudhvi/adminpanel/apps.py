@@ -4,3 +4,6 @@ class AdminpanelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'adminpanel'
     verbose_name = "Master Admin Panel"
+
+    def ready(self):
+        from . import signals  # noqa: F401
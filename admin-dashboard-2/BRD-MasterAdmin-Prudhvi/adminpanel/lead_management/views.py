@@ -2,8 +2,10 @@ from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from .models import Lead
 from .serializers import LeadSerializer
+from brd_platform.pagination import CreatedAtCursorPagination
 
 class LeadViewSet(viewsets.ModelViewSet):
     queryset = Lead.objects.all().order_by("-created_at")
     serializer_class = LeadSerializer
+    pagination_class = CreatedAtCursorPagination
     permission_classes = [IsAuthenticated]
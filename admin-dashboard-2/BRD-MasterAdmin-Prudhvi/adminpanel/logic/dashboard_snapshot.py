@@ -0,0 +1,92 @@
+# adminpanel/logic/dashboard_snapshot.py
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from adminpanel.models import Dashboard
+from reporting.logic.rollup import build_dashboard_stats
+
+
+def format_trend(current, previous):
+    """Percentage change versus the previous snapshot, e.g. '+12.5%'."""
+    current = float(current or 0)
+    previous = float(previous or 0)
+    if previous == 0:
+        return "+0%" if current == 0 else "+100%"
+    change = (current - previous) / previous * 100
+    return f"{change:+.1f}%"
+
+
+def get_snapshot(tenant_id=None):
+    # Rows without an etag were never built by refresh_snapshot (e.g. the pre-cache id=1
+    # dashboard row); treat them as missing so the first request refreshes them in place.
+    return Dashboard.objects.filter(tenant_id=tenant_id).exclude(etag="").order_by("id").first()
+
+
+def snapshot_payload(dashboard):
+    return {
+        "kpis": {
+            "totalTenants": dashboard.total_tenants,
+            "tenantsTrend": dashboard.tenants_trend,
+            "activeUsers": dashboard.active_users,
+            "usersTrend": dashboard.users_trend,
+            "totalLoans": dashboard.total_loans,
+            "loansTrend": dashboard.loans_trend,
+            "disbursedAmount": dashboard.disbursed_amount,
+            "amountTrend": dashboard.amount_trend,
+        },
+        "charts": {
+            "monthlyDisbursement": dashboard.monthly_disbursement,
+            "loanStatusDistribution": dashboard.loan_status_distribution,
+            "recentActivity": dashboard.recent_activity
+        },
+        "refreshedAt": dashboard.updated_at,
+    }
+
+
+def _digest(kpis, charts):
+    content = {"kpis": kpis, "charts": charts}
+    return hashlib.sha1(json.dumps(content, sort_keys=True, cls=DjangoJSONEncoder).encode()).hexdigest()
+
+
+@transaction.atomic
+def refresh_snapshot(tenant_id=None):
+    """
+    Recomputes one snapshot from the live aggregates. Trends are taken against the
+    previous snapshot values, and the row is left untouched when nothing changed so
+    its ETag / Last-Modified stay valid for polling clients.
+    """
+    stats = build_dashboard_stats(tenant_id)
+    kpis = stats["kpis"]
+    # JSONField needs plain JSON types (amounts come back as Decimal)
+    charts = json.loads(json.dumps(stats["charts"], cls=DjangoJSONEncoder))
+    charts.pop("usersPerBranch", None)
+    digest = _digest(kpis, charts)
+
+    # Make sure the row exists before locking it: select_for_update locks nothing on a miss, and
+    # get_or_create re-reads the row when a concurrent first request wins the insert
+    Dashboard.objects.get_or_create(tenant_id=tenant_id)
+    dashboard = Dashboard.objects.select_for_update().get(tenant_id=tenant_id)
+    if dashboard.etag == digest:
+        return dashboard, False
+
+    dashboard.tenants_trend = format_trend(kpis["totalTenants"], dashboard.total_tenants)
+    dashboard.users_trend = format_trend(kpis["activeUsers"], dashboard.active_users)
+    dashboard.loans_trend = format_trend(kpis["totalLoans"], dashboard.total_loans)
+    dashboard.amount_trend = format_trend(kpis["disbursedTotal"], dashboard.disbursed_total)
+
+    dashboard.total_tenants = kpis["totalTenants"]
+    dashboard.active_users = kpis["activeUsers"]
+    dashboard.total_loans = kpis["totalLoans"]
+    dashboard.disbursed_amount = kpis["disbursedAmount"]
+    dashboard.disbursed_total = kpis["disbursedTotal"]
+
+    dashboard.monthly_disbursement = charts["monthlyDisbursement"]
+    dashboard.loan_status_distribution = charts["loanStatusDistribution"]
+    dashboard.recent_activity = charts["recentActivity"]
+
+    dashboard.etag = digest
+    dashboard.save()
+    return dashboard, True
@@ -0,0 +1,135 @@
+# adminpanel/logic/role_permissions.py
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from adminpanel.models import RoleMaster
+
+VERSION_KEY = "rbac:version"
+SNAPSHOT_KEY = "rbac:roles:{version}"
+SNAPSHOT_TTL = 24 * 60 * 60  # superseded snapshots simply expire
+EMPTY = frozenset()
+# Built-in administrator roles have no RoleMaster row; they hold every permission code
+# (tenant scoping still applies to the data they reach)
+UNRESTRICTED_ROLES = frozenset({"MASTER_ADMIN", "SUPER_ADMIN", "TENANT_ADMIN"})
+
+
+def normalize_role_name(name):
+    """Maps "Loan Officer", "LOAN_OFFICER" and "loan-officer" alike to "loan_officer"."""
+    return re.sub(r"[^a-z0-9]+", "_", (name or "").strip().lower()).strip("_")
+
+
+def granted(permissions):
+    """Permission codes a RoleMaster.permissions value grants: {"loan_approve": true, ...} or a list of codes."""
+    if isinstance(permissions, dict):
+        return {code for code, allowed in permissions.items() if allowed is True}
+    if isinstance(permissions, (list, tuple)):
+        return {code for code in permissions if isinstance(code, str)}
+    return set()
+
+
+def compile_roles(rows):
+    """
+    rows: (id, name, parent_role_id, permissions) for every role.
+    Returns ({role_id: effective codes}, {normalized name: role_id}). A role gets its own
+    granted codes plus everything its ancestors grant; a False on the child does not revoke
+    an inherited grant (update_permissions writes False for every code it knows).
+    A parent cycle is cut where it loops back, so every role in it gets the whole cycle's codes.
+    """
+    own = {}
+    parents = {}
+    names = {}
+    for role_id, name, parent_id, permissions in rows:
+        own[role_id] = granted(permissions)
+        parents[role_id] = parent_id
+        names[normalize_role_name(name)] = role_id
+
+    effective = {}
+    for role_id in own:
+        # Single-parent chain: walk it up, stopping at the root or where it loops back
+        codes, seen, current = set(), set(), role_id
+        while current in own and current not in seen:
+            seen.add(current)
+            codes |= own[current]
+            current = parents[current]
+        effective[role_id] = codes
+    return effective, names
+
+
+class RolePermissionResolver:
+    """
+    Effective permission sets of every RoleMaster, compiled in one query and kept as
+    frozensets in process memory, so a check is a set lookup. The compiled snapshot is
+    shared through the Django cache under a version stamp; RoleMaster saves bump the
+    stamp (adminpanel.signals) and each process re-reads it at most every `check_interval`
+    seconds.
+    """
+
+    def __init__(self, check_interval=5):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        # (version, {role_id: frozenset}, {normalized name: role_id}), swapped as one tuple
+        self._state = (None, {}, {})
+        self._checked_at = 0.0
+
+    # ---------------- lookups ----------------
+    def permissions_for(self, role_id=None, role_name=None):
+        roles, names = self._snapshot()
+        if role_id is not None and role_id in roles:
+            return roles[role_id]
+        if role_name:
+            return roles.get(names.get(normalize_role_name(role_name)), EMPTY)
+        return EMPTY
+
+    def user_permissions(self, user):
+        return self.permissions_for(getattr(user, "role_id", None), getattr(user, "role", None))
+
+    def has_permission(self, user, code):
+        if not user or not getattr(user, "is_authenticated", False):
+            return False
+        if getattr(user, "is_superuser", False) or getattr(user, "role", None) in UNRESTRICTED_ROLES:
+            return True
+        return code in self.user_permissions(user)
+
+    # ---------------- snapshot ----------------
+    def _snapshot(self):
+        state = self._state
+        now = time.monotonic()
+        if state[0] is not None and now - self._checked_at < self.check_interval:
+            return state[1], state[2]
+
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            cache.add(VERSION_KEY, time.time_ns(), None)
+            version = cache.get(VERSION_KEY)
+        if version != state[0]:
+            compiled = cache.get(SNAPSHOT_KEY.format(version=version))
+            if compiled is None:
+                compiled = self._compile()
+                cache.set(SNAPSHOT_KEY.format(version=version), compiled, SNAPSHOT_TTL)
+            roles, names = compiled
+            state = (version, {role_id: frozenset(codes) for role_id, codes in roles.items()}, names)
+            with self._lock:
+                self._state = state
+        self._checked_at = now
+        return state[1], state[2]
+
+    def _compile(self):
+        rows = RoleMaster.objects.values_list("id", "name", "parent_role_id", "permissions")
+        effective, names = compile_roles(rows)
+        return {role_id: sorted(codes) for role_id, codes in effective.items()}, names
+
+    # ---------------- invalidation ----------------
+    def invalidate(self):
+        """Moves every process to a fresh snapshot (this one immediately, others within check_interval)."""
+        cache.set(VERSION_KEY, time.time_ns(), None)
+        with self._lock:
+            self._state = (None, {}, {})
+
+
+role_permissions = RolePermissionResolver(
+    check_interval=getattr(settings, "ROLE_PERMISSION_CHECK_INTERVAL", 5),
+)
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from tenants.models import Tenant
+from adminpanel.logic.dashboard_snapshot import refresh_snapshot
+
+
+class Command(BaseCommand):
+    help = "Refresh the cached dashboard snapshots (platform-wide and per tenant)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenant", help="tenant_id (UUID) to refresh; defaults to platform + all active tenants")
+        parser.add_argument(
+            "--interval", type=int, default=0,
+            help="Keep running and refresh every N seconds (background worker mode)"
+        )
+
+    def handle(self, *args, **options):
+        scopes = [None]
+        if options["tenant"]:
+            tenant_pk = Tenant.objects.filter(tenant_id=options["tenant"]).values_list("pk", flat=True).first()
+            if tenant_pk is None:
+                raise CommandError(f"Tenant {options['tenant']} not found")
+            scopes = [tenant_pk]
+
+        while True:
+            targets = scopes
+            if not options["tenant"]:
+                targets = scopes + list(Tenant.objects.filter(is_active=True).values_list("pk", flat=True))
+
+            changed = 0
+            for tenant_pk in targets:
+                _, updated = refresh_snapshot(tenant_pk)
+                changed += updated
+            self.stdout.write(self.style.SUCCESS(
+                f"Refreshed {len(targets)} dashboard snapshots ({changed} changed)."
+            ))
+
+            if not options["interval"]:
+                break
+            close_old_connections()
+            time.sleep(options["interval"])
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0015_chargeconfig_interestconfig_repaymentconfig_riskrule_and_more'),
+        ('adminpanel', '0012_dashboard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dashboard',
+            name='disbursed_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=18),
+        ),
+        migrations.AddField(
+            model_name='dashboard',
+            name='etag',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='dashboard',
+            name='tenant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='dashboard_snapshots', to='tenants.tenant'),
+        ),
+        migrations.AddConstraint(
+            model_name='dashboard',
+            constraint=models.UniqueConstraint(fields=('tenant',), name='uniq_dashboard_snapshot_tenant'),
+        ),
+    ]
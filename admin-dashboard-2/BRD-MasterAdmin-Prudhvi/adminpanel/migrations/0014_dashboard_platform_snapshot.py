@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:05
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+def collapse_platform_snapshots(apps, schema_editor):
+    # Keep the row the views already served (lowest id) and blank its etag so the next
+    # request rebuilds it; this also refreshes the legacy id=1 row from before the cache.
+    Dashboard = apps.get_model('adminpanel', 'Dashboard')
+    platform = Dashboard.objects.filter(tenant__isnull=True).order_by('id')
+    keep = platform.first()
+    if keep is None:
+        return
+    platform.exclude(pk=keep.pk).delete()
+    Dashboard.objects.filter(pk=keep.pk).update(etag='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('adminpanel', '0013_dashboard_snapshot_cache'),
+    ]
+
+    operations = [
+        migrations.RunPython(collapse_platform_snapshots, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='dashboard',
+            name='uniq_dashboard_snapshot_tenant',
+        ),
+        migrations.AddConstraint(
+            model_name='dashboard',
+            constraint=models.UniqueConstraint(condition=models.Q(('tenant__isnull', False)), fields=('tenant',), name='uniq_dashboard_snapshot_tenant'),
+        ),
+        migrations.AddConstraint(
+            model_name='dashboard',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('tenant', models.Value(0)), condition=models.Q(('tenant__isnull', True)), name='uniq_dashboard_snapshot_platform'),
+        ),
+    ]
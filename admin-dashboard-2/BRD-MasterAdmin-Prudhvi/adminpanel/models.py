@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.db.models import JSONField  # Use JSONField for flexible storage
+from django.db.models.functions import Coalesce
 import uuid 
 
 User = get_user_model()
@@ -295,8 +296,17 @@ class Setting(models.Model):
 
 class Dashboard(models.Model):
     """
-    Model to store the entire dashboard data in one place.
+    Dashboard snapshot cache, one row per tenant plus one platform-wide row (tenant=None).
+    Rows are refreshed from the live aggregates by the refresh_dashboard_snapshots command.
     """
+    tenant = models.ForeignKey(
+        "tenants.Tenant",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="dashboard_snapshots"
+    )
+
     # KPIs
     total_tenants = models.IntegerField(default=0)
     tenants_trend = models.CharField(max_length=20, blank=True)
@@ -305,6 +315,7 @@ class Dashboard(models.Model):
     total_loans = models.IntegerField(default=0)
     loans_trend = models.CharField(max_length=20, blank=True)
     disbursed_amount = models.CharField(max_length=50, blank=True)  # e.g., "₹2,847 Cr"
+    disbursed_total = models.DecimalField(max_digits=18, decimal_places=2, default=0)
     amount_trend = models.CharField(max_length=20, blank=True)
 
     # Charts
@@ -312,6 +323,9 @@ class Dashboard(models.Model):
     loan_status_distribution = JSONField(default=list, blank=True)
     recent_activity = JSONField(default=list, blank=True)
 
+    # Cache validators
+    etag = models.CharField(max_length=64, blank=True)
+
     # Meta
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -319,6 +333,17 @@ class Dashboard(models.Model):
     class Meta:
         verbose_name = "Dashboard"
         verbose_name_plural = "Dashboards"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["tenant"], condition=models.Q(tenant__isnull=False), name="uniq_dashboard_snapshot_tenant"
+            ),
+            # NULLs never collide under the constraint above, so the platform-wide snapshot
+            # (tenant NULL) is kept unique through an index on COALESCE(tenant, 0)
+            models.UniqueConstraint(
+                Coalesce("tenant", models.Value(0)), condition=models.Q(tenant__isnull=True),
+                name="uniq_dashboard_snapshot_platform",
+            ),
+        ]
 
     def __str__(self):
         return f"Dashboard Snapshot {self.created_at.strftime('%Y-%m-%d %H:%M:%S')}"
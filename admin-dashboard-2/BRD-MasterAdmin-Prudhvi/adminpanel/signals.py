@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .logic.role_permissions import role_permissions
+from .models import RoleMaster
+
+
+@receiver(post_save, sender=RoleMaster)
+@receiver(post_delete, sender=RoleMaster)
+def invalidate_role_permissions(sender, instance, **kwargs):
+    # After commit, so no process can recompile from the pre-save rows
+    transaction.on_commit(role_permissions.invalidate)
@@ -1,3 +1,148 @@
+import datetime
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from tenants.models import Tenant
+from crm.models import Customer
+from los.models import LoanApplication
+from users.models import User
+from .logic.role_permissions import compile_roles, role_permissions
+from .logic.dashboard_snapshot import get_snapshot, refresh_snapshot
+from .models import Dashboard, RoleMaster
+
+
+class RolePermissionTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        role_permissions.invalidate()
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.officer = RoleMaster.objects.create(
+                name="Loan Officer", permissions={"loan_view": True, "loan_create": True, "loan_approve": False},
+            )
+            self.manager = RoleMaster.objects.create(
+                name="Branch Manager", parent_role=self.officer, permissions={"loan_approve": True},
+            )
+
+    def make_user(self, email, **fields):
+        return User.objects.create_user(email=email, password="pw", tenant=self.tenant, **fields)
+
+    def test_compile_inherits_parents_and_cuts_cycles(self):
+        effective, names = compile_roles([
+            (1, "Viewer", 3, {"loan_view": True}),
+            (2, "Approver", 1, ["loan_approve"]),
+            (3, "Loop", 2, {"audit_view": True, "loan_edit": False}),
+        ])
+        self.assertEqual(effective[2], {"loan_approve", "loan_view", "audit_view"})
+        self.assertEqual(effective[3], {"audit_view", "loan_approve", "loan_view"})
+        self.assertEqual(names["approver"], 2)
+
+    def test_checks_are_served_without_queries(self):
+        user = self.make_user("manager@acme.test", role="STAFF", role_id=self.manager.pk)
+        self.assertTrue(role_permissions.has_permission(user, "loan_approve"))
+        with self.assertNumQueries(0):
+            self.assertTrue(role_permissions.has_permission(user, "loan_view"))
+            self.assertFalse(role_permissions.has_permission(user, "loan_disburse"))
+
+    def test_role_name_fallback_and_invalidation_on_save(self):
+        user = self.make_user("officer@acme.test", role="LOAN_OFFICER")
+        self.assertFalse(role_permissions.has_permission(user, "loan_disburse"))
+
+        self.officer.permissions = {**self.officer.permissions, "loan_disburse": True}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.officer.save()
+        self.assertTrue(role_permissions.has_permission(user, "loan_disburse"))
+
+    def test_los_actions_require_role_permissions(self):
+        customer = Customer.objects.create(name="Borrower", tenant=self.tenant)
+        app = LoanApplication.objects.create(
+            tenant=self.tenant, customer=customer, first_name="Test", last_name="User", mobile_no="9999999999",
+            email="test@example.com", dob=datetime.date(1990, 1, 1), pan_number="ABCDE1234F", gender="M",
+            res_address_line1="Line 1", res_city="Pune", res_state="MH", res_pincode="411001",
+            requested_amount=Decimal("100000"),
+        )
+        client = APIClient()
+        base = f"/api/v1/los/loan-applications/{app.pk}"
+
+        client.force_authenticate(self.make_user("officer@acme.test", role="STAFF", role_id=self.officer.pk))
+        self.assertEqual(client.post(f"{base}/generate-sanction/").status_code, 403)
+        self.assertEqual(client.post(f"{base}/change-status/", {"status": "DISBURSED"}).status_code, 403)
+
+        client.force_authenticate(self.make_user("manager@acme.test", role="STAFF", role_id=self.manager.pk))
+        # Permission passes; the application itself is not ready for sanction yet
+        self.assertEqual(client.post(f"{base}/generate-sanction/").status_code, 400)
+
+    def test_tenant_admins_are_not_blocked_by_missing_role_rows(self):
+        customer = Customer.objects.create(name="Borrower", tenant=self.tenant)
+        app = LoanApplication.objects.create(
+            tenant=self.tenant, customer=customer, first_name="Test", last_name="User", mobile_no="9999999999",
+            email="test@example.com", dob=datetime.date(1990, 1, 1), pan_number="ABCDE1234F", gender="M",
+            res_address_line1="Line 1", res_city="Pune", res_state="MH", res_pincode="411001",
+            requested_amount=Decimal("100000"), status="SANCTIONED",
+        )
+        client = APIClient()
+        base = f"/api/v1/los/loan-applications/{app.pk}"
+        for number, role in enumerate(("TENANT_ADMIN", "SUPER_ADMIN")):
+            client.force_authenticate(self.make_user(f"admin{number}@acme.test", role=role))
+            self.assertNotEqual(client.post(f"{base}/generate-sanction/").status_code, 403)
+
+        response = client.post(f"{base}/change-status/", {"status": "DISBURSED"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["status"], "DISBURSED")
+
+
+class DashboardSnapshotTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(email="root@platform.test", password="pw", role="MASTER_ADMIN"))
+
+    def test_legacy_row_is_refreshed_before_it_is_served(self):
+        legacy = Dashboard.objects.create(total_tenants=999, disbursed_amount="stale")
+        self.assertIsNone(get_snapshot())
+        Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+
+        response = self.client.get("/api/v1/adminpanel/dashboard/full/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["kpis"]["totalTenants"], 1)
+        legacy.refresh_from_db()
+        self.assertNotEqual(legacy.etag, "")
+        self.assertEqual(Dashboard.objects.count(), 1)
+
+        again = self.client.get("/api/v1/adminpanel/dashboard/full/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+    def test_anonymous_callers_are_refused(self):
+        response = APIClient().get("/api/v1/adminpanel/dashboard/full/")
+        self.assertEqual(response.status_code, 401)
+        self.assertFalse(Dashboard.objects.exists())
+
+    def test_tenant_users_only_see_their_own_snapshot(self):
+        tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        Tenant.objects.create(name="Globex Credit", tenant_type="NBFC", email="ops@globex.test")
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(email="admin@acme.test", password="pw", tenant=tenant, role="ADMIN"))
+        response = client.get("/api/v1/adminpanel/dashboard/full/")
+        self.assertEqual(response.data["kpis"]["totalTenants"], 1)
+        self.assertEqual(list(Dashboard.objects.values_list("tenant_id", flat=True)), [tenant.pk])
+
+    def test_refresh_reuses_a_row_inserted_concurrently(self):
+        # Another first request inserted the (still empty) row before this one took its lock
+        racer = Dashboard.objects.create()
+        dashboard, changed = refresh_snapshot()
+        self.assertEqual((dashboard.pk, changed), (racer.pk, True))
+        self.assertEqual(Dashboard.objects.count(), 1)
 
-# Create your tests here.
+    def test_one_snapshot_per_scope(self):
+        tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        refresh_snapshot()
+        refresh_snapshot(tenant.pk)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Dashboard.objects.create(etag="other")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Dashboard.objects.create(tenant=tenant, etag="other")
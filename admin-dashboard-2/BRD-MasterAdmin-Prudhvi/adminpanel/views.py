@@ -4,8 +4,12 @@ from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.permissions import AllowAny
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 
+from reporting.logic.filters import resolve_report_tenant
+from users.authentication import ClaimsJWTAuthentication
+from .logic.dashboard_snapshot import get_snapshot, refresh_snapshot, snapshot_payload
 
 
 from .models import (
@@ -256,46 +260,31 @@ class TenantSubscriptionView(APIView):
 
 class DashboardFullView(APIView):
     """
-    Returns full dashboard data from the database.
-    Creates a default record if none exists.
+    Serves the cached dashboard snapshot (see refresh_dashboard_snapshots).
+    Responds with ETag / Last-Modified so polling clients get 304 Not Modified.
     """
-    permission_classes = [AllowAny]
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        # Try to get the latest dashboard record
-        dashboard, created = Dashboard.objects.get_or_create(
-            id=1,  # Ensure a single dashboard record
-            defaults={
-                "total_tenants": 0,
-                "tenants_trend": "+0%",
-                "active_users": 0,
-                "users_trend": "+0%",
-                "total_loans": 0,
-                "loans_trend": "+0%",
-                "disbursed_amount": "₹0",
-                "amount_trend": "+0%",
-                "monthly_disbursement": [],
-                "loan_status_distribution": [],
-                "recent_activity": [],
-            }
-        )
-
-        data = {
-            "kpis": {
-                "totalTenants": dashboard.total_tenants,
-                "tenantsTrend": dashboard.tenants_trend,
-                "activeUsers": dashboard.active_users,
-                "usersTrend": dashboard.users_trend,
-                "totalLoans": dashboard.total_loans,
-                "loansTrend": dashboard.loans_trend,
-                "disbursedAmount": dashboard.disbursed_amount,
-                "amountTrend": dashboard.amount_trend,
-            },
-            "charts": {
-                "monthlyDisbursement": dashboard.monthly_disbursement,
-                "loanStatusDistribution": dashboard.loan_status_distribution,
-                "recentActivity": dashboard.recent_activity
-            }
-        }
-
-        return Response(data)
+        tenant_id = resolve_report_tenant(request)
+
+        dashboard = get_snapshot(tenant_id)
+        if dashboard is None:
+            # First request for this scope: build the snapshot once
+            dashboard, _ = refresh_snapshot(tenant_id)
+
+        etag = quote_etag(dashboard.etag)
+        last_modified = int(dashboard.updated_at.timestamp())
+
+        conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if conditional is None:
+            response = Response(snapshot_payload(dashboard))
+        else:
+            # 304 Not Modified (or 412 for a failed If-Match precondition)
+            response = Response(status=conditional.status_code)
+
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        response["Cache-Control"] = "private, no-cache"
+        return response
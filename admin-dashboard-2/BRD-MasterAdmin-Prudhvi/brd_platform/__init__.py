@@ -0,0 +1,8 @@
+# Load the Celery app with Django so @shared_task binds to it. Celery is only needed for
+# REPORT_JOB_BACKEND = "celery"; without it report jobs run on the in-process pool.
+try:
+    from .celery import app as celery_app
+except ImportError:
+    celery_app = None
+
+__all__ = ('celery_app',)
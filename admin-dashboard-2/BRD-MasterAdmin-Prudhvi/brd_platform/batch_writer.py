@@ -0,0 +1,122 @@
+# brd_platform/batch_writer.py
+import atexit
+import logging
+import threading
+from collections import deque
+
+from django.db import close_old_connections, transaction
+from django.forms.models import model_to_dict
+
+logger = logging.getLogger(__name__)
+
+ATTEMPTS_ATTR = '_batch_writer_attempts'  # failed inserts so far, kept on the queued instance
+
+
+class BatchWriter:
+    """
+    Write-behind queue for append-only rows (login activity, audit entries). Request code
+    calls add(instance); the row is queued once the surrounding transaction commits and a
+    daemon thread inserts queued rows with one bulk_create every `flush_interval` seconds,
+    or as soon as `batch_size` rows are waiting. When `max_pending` rows are queued the
+    caller flushes inline instead, so a stalled database slows requests rather than
+    growing memory or dropping rows. Pending rows are flushed at interpreter exit.
+    When a bulk insert fails the batch is inserted row by row; rows that fail on their own
+    are re-queued for the next flush and only dropped (and logged with their values) after
+    `max_attempts` failed inserts.
+    """
+
+    def __init__(self, model, batch_size=200, flush_interval=1.0, max_pending=10000, name=None, max_attempts=3):
+        self.model = model
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.name = name or f"{model._meta.label_lower}-writer"
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one bulk insert at a time
+        self._wake = threading.Event()
+        self._thread = None
+        self.written = 0
+        self.failed = 0
+
+    # ---------------- producer side ----------------
+    def add(self, instance):
+        transaction.on_commit(lambda: self._push(instance))
+
+    def _push(self, instance):
+        with self._lock:
+            self._pending.append(instance)
+            pending = len(self._pending)
+        if pending >= self.max_pending:
+            self.flush()
+        elif pending >= self.batch_size:
+            self._wake.set()
+        self._ensure_thread()
+
+    def __len__(self):
+        return len(self._pending)
+
+    # ---------------- flushing ----------------
+    def flush(self):
+        """Inserts everything queued so far; returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._pending)
+                self._pending.clear()
+            if not batch:
+                return 0
+            try:
+                # Atomic so a failure part-way through leaves nothing behind to duplicate
+                with transaction.atomic():
+                    self.model.objects.bulk_create(batch, batch_size=self.batch_size)
+                written = len(batch)
+            except Exception:
+                logger.warning("%s: bulk insert of %d rows failed, inserting them one by one",
+                               self.name, len(batch), exc_info=True)
+                written = self._insert_each(batch)
+            self.written += written
+            return written
+
+    def _insert_each(self, batch):
+        written = 0
+        retry = []
+        for instance in batch:
+            try:
+                with transaction.atomic():
+                    self.model.objects.bulk_create([instance])
+                written += 1
+            except Exception:
+                attempts = getattr(instance, ATTEMPTS_ATTR, 0) + 1
+                setattr(instance, ATTEMPTS_ATTR, attempts)
+                if attempts < self.max_attempts:
+                    retry.append(instance)
+                else:
+                    self.failed += 1
+                    logger.exception("%s: dropped row after %d failed inserts: %r",
+                                     self.name, attempts, model_to_dict(instance))
+        if retry:
+            with self._lock:
+                self._pending.extendleft(reversed(retry))
+        return written
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if not self._pending:
+                continue
+            close_old_connections()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
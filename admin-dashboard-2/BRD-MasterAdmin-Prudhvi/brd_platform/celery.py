@@ -0,0 +1,16 @@
+"""
+Celery app for brd_platform. Used when REPORT_JOB_BACKEND = "celery"; start a worker with
+
+    celery -A brd_platform worker -l info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'brd_platform.settings')
+
+app = Celery('brd_platform')
+# Broker, serializer and result settings come from the CELERY_* Django settings
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
@@ -0,0 +1,45 @@
+import contextlib
+import contextvars
+
+from django.conf import settings
+
+# Set while reporting code reads (see replica_reads); contextvars keep it per request/thread
+_replica_reads = contextvars.ContextVar("replica_reads", default=False)
+
+
+def read_database():
+    """Alias reporting reads should use: REPORTING_READ_DATABASE when configured, else default."""
+    alias = getattr(settings, "REPORTING_READ_DATABASE", "default")
+    return alias if alias in settings.DATABASES else "default"
+
+
+@contextlib.contextmanager
+def replica_reads():
+    """Routes every read inside the block to read_database(); writes still go to default."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Writes, migrations and ordinary reads use "default". Reads made inside replica_reads()
+    (report computations and exports) use the read replica, which may lag by a few seconds.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get():
+            return read_database()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as default
+        return {obj1._state.db, obj2._state.db} <= {"default", read_database()} or None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
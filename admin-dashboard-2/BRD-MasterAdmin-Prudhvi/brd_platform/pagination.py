@@ -0,0 +1,54 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class ViewPageSizeMixin:
+    """
+    Lets a view tune its own limits with `page_size` / `max_page_size` class attributes
+    instead of needing a paginator subclass per endpoint.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = getattr(view, 'page_size', None) or self.page_size
+        self.max_page_size = getattr(view, 'max_page_size', None) or self.max_page_size
+        return super().paginate_queryset(queryset, request, view)
+
+
+class DefaultPageNumberPagination(ViewPageSizeMixin, PageNumberPagination):
+    """Bounded page-number pages for list endpoints that opt in with pagination_class."""
+    page_size = getattr(settings, 'API_PAGE_SIZE', 50)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 200)
+
+
+class CreatedAtCursorPagination(ViewPageSizeMixin, CursorPagination):
+    """
+    Keyset pagination on (created_at, id) so deep pages cost the same as the first one.
+    Responses are {"next", "previous", "results"}; clients follow the `next` link.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = getattr(settings, 'API_PAGE_SIZE', 50)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 200)
+
+
+# --- Keyset variants for tables whose insert timestamp has another name ---
+
+class TimestampCursorPagination(CreatedAtCursorPagination):
+    ordering = ('-timestamp', '-id')
+
+
+class PaidAtCursorPagination(CreatedAtCursorPagination):
+    ordering = ('-paid_at', '-id')
+
+
+class CollectedAtCursorPagination(CreatedAtCursorPagination):
+    ordering = ('-collected_at', '-id')
+
+
+class UploadedAtCursorPagination(CreatedAtCursorPagination):
+    ordering = ('-uploaded_at', '-id')
+
+
+class ReceivedAtCursorPagination(CreatedAtCursorPagination):
+    ordering = ('-received_at', '-id')
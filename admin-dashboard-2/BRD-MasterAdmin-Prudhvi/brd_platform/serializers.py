@@ -0,0 +1,33 @@
+from rest_framework.permissions import SAFE_METHODS
+
+
+class SparseFieldsMixin:
+    """
+    Sparse fieldsets: `?fields=id,status,created_at` trims the serializer to those fields.
+    Unknown names are ignored; without the parameter every field is returned.
+    Only read requests are trimmed: on POST/PUT/PATCH a dropped field would silently
+    skip validation and saving of the submitted value.
+    """
+    fields_query_param = 'fields'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or not hasattr(request, 'query_params'):
+            return
+        if request.method not in SAFE_METHODS:
+            return
+        raw = request.query_params.get(self.fields_query_param)
+        if not raw:
+            return
+        wanted = {name.strip() for name in raw.split(',') if name.strip()}
+        for name in set(self.fields) - wanted:
+            self.fields.pop(name)
+
+
+def requested_fields(request, param='fields'):
+    """Returns the ?fields= set (or None when absent) so views can skip unneeded joins."""
+    raw = request.query_params.get(param) if request is not None else None
+    if not raw:
+        return None
+    return {name.strip() for name in raw.split(',') if name.strip()}
@@ -50,6 +50,8 @@ INSTALLED_APPS += ["axes"]
 
 
 MIDDLEWARE = [
+    # First, so its total covers the rest of the stack (brd_platform/timing.py)
+    "brd_platform.timing.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
 
@@ -61,7 +63,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
 
     # Tenant middleware (your custom)
-    "brd_platform.middleware.TenantMiddleware",
+    "brd_platform.tenant_context.TenantMiddleware",
 
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
@@ -80,6 +82,45 @@ AXES_EXCLUDE_URLS = [
 
 
 
+# Process-local tenant resolution cache (brd_platform.tenant_context)
+TENANT_CACHE_MAXSIZE = int(os.environ.get("TENANT_CACHE_MAXSIZE", 1024))
+TENANT_CACHE_TTL = int(os.environ.get("TENANT_CACHE_TTL", 300))  # seconds
+
+# RoleMaster permission sets are cached per process and re-validated this often (seconds)
+ROLE_PERMISSION_CHECK_INTERVAL = int(os.environ.get("ROLE_PERMISSION_CHECK_INTERVAL", 5))
+
+# Compiled scorecards kept per process (least recently used are dropped beyond this)
+SCORECARD_CACHE_SIZE = int(os.environ.get("SCORECARD_CACHE_SIZE", 256))
+
+# Compiled TenantRuleConfig objects, same scheme
+RULE_CONFIG_CHECK_INTERVAL = int(os.environ.get("RULE_CONFIG_CHECK_INTERVAL", 5))
+
+# Shared cache (report results, version stamps). Redis when REDIS_URL is set so
+# every worker sees the same entries; per-process memory otherwise.
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": REDIS_URL}}
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# Report jobs: "local" runs them on an in-process thread pool, "celery" hands them to workers
+REPORT_JOB_BACKEND = os.environ.get("REPORT_JOB_BACKEND", "local")
+REPORT_JOB_WORKERS = int(os.environ.get("REPORT_JOB_WORKERS", 4))
+REPORT_JOB_TIMEOUT = int(os.environ.get("REPORT_JOB_TIMEOUT", 1800))  # seconds before a job counts as lost
+
+# Celery (brd_platform/celery.py), used by REPORT_JOB_BACKEND = "celery". The broker defaults to
+# the shared Redis; without a broker the celery backend is refused and jobs run locally.
+CELERY_BROKER_URL = os.environ.get("CELERY_BROKER_URL", REDIS_URL or "")
+CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND") or None  # job state lives on Report rows
+CELERY_TASK_IGNORE_RESULT = True
+CELERY_TASK_SERIALIZER = "json"
+CELERY_ACCEPT_CONTENT = ["json"]
+CELERY_TASK_ACKS_LATE = True  # a job lost with its worker is redelivered instead of dropped
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1  # report jobs are long; don't hoard them on one worker
+REPORT_CACHE_TTL = int(os.environ.get("REPORT_CACHE_TTL", 300))  # seconds
+REPORT_EXPORT_ASYNC_ROWS = int(os.environ.get("REPORT_EXPORT_ASYNC_ROWS", 50000))
+
+
 ROOT_URLCONF = "brd_platform.urls"
 
 TEMPLATES = [
@@ -100,12 +141,65 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "brd_platform.wsgi.application"
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# Database profile: DB_PROFILE=sqlite (local dev, default) or postgres (production).
+# Reporting reads inside brd_platform.db_router.replica_reads() go to REPORTING_READ_DATABASE.
+DB_PROFILE = os.environ.get("DB_PROFILE", "sqlite")
+PGBOUNCER = os.environ.get("DB_PGBOUNCER", "0") == "1"
+
+
+def postgres_database(host, port):
+    options = {
+        "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", 5)),
+        "sslmode": os.environ.get("DB_SSLMODE", "prefer"),
+        "application_name": os.environ.get("DB_APPLICATION_NAME", "brd_platform"),
     }
-}
+    statement_timeout = os.environ.get("DB_STATEMENT_TIMEOUT_MS")
+    if statement_timeout and not PGBOUNCER:
+        # pgbouncer rejects startup options; set it on the pool's role instead
+        options["options"] = f"-c statement_timeout={int(statement_timeout)}"
+    return {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.environ.get("POSTGRES_DB", "brd_platform"),
+        "USER": os.environ.get("POSTGRES_USER", "brd_platform"),
+        "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+        "HOST": host,
+        "PORT": port,
+        # Persistent connections, re-validated before reuse after a request boundary
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": os.environ.get("DB_CONN_HEALTH_CHECKS", "1") == "1",
+        # Transaction-pooling pgbouncer cannot keep server-side cursors across transactions
+        "DISABLE_SERVER_SIDE_CURSORS": PGBOUNCER,
+        "OPTIONS": options,
+    }
+
+
+if DB_PROFILE == "postgres":
+    DATABASES = {
+        "default": postgres_database(os.environ.get("POSTGRES_HOST", "localhost"), os.environ.get("POSTGRES_PORT", "5432")),
+    }
+    if os.environ.get("POSTGRES_REPLICA_HOST"):
+        DATABASES["replica"] = postgres_database(
+            os.environ["POSTGRES_REPLICA_HOST"], os.environ.get("POSTGRES_REPLICA_PORT", "5432"),
+        )
+        DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+    REPORTING_READ_DATABASE = os.environ.get("REPORTING_READ_DATABASE", "replica" if "replica" in DATABASES else "default")
+else:
+    # Two aliases on one file, so replica routing can be exercised locally and in tests;
+    # reads only move to it when REPORTING_READ_DATABASE=replica.
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+        },
+        "replica": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": BASE_DIR / "db.sqlite3",
+            "TEST": {"MIRROR": "default"},
+        },
+    }
+    REPORTING_READ_DATABASE = os.environ.get("REPORTING_READ_DATABASE", "default")
+
+DATABASE_ROUTERS = ["brd_platform.db_router.ReplicaRouter"]
 
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
@@ -114,6 +208,37 @@ AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator"},
 ]
 
+# Password hashing profile. "pbkdf2" uses users.hashers.PBKDF2PasswordHasher with
+# PASSWORD_PBKDF2_ITERATIONS rounds (Django's default of 600000 is the floor; weaker
+# existing hashes are re-hashed to the configured count on next login). "fast" (MD5) is
+# for local runs and test suites only and is ignored unless DEBUG is on.
+PASSWORD_HASHER_PROFILE = os.environ.get("PASSWORD_HASHER_PROFILE", "pbkdf2")
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get("PASSWORD_PBKDF2_ITERATIONS", 600000))
+PASSWORD_HASHERS = [
+    "users.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+if PASSWORD_HASHER_PROFILE == "fast" and DEBUG:
+    PASSWORD_HASHERS.insert(0, "django.contrib.auth.hashers.MD5PasswordHasher")
+
+# Login path: LoginActivity rows are queued and bulk-inserted by a background thread
+LOGIN_ACTIVITY_BATCH_SIZE = int(os.environ.get("LOGIN_ACTIVITY_BATCH_SIZE", 200))
+LOGIN_ACTIVITY_FLUSH_INTERVAL = float(os.environ.get("LOGIN_ACTIVITY_FLUSH_INTERVAL", 1.0))  # seconds
+LOGIN_ACTIVITY_MAX_PENDING = int(os.environ.get("LOGIN_ACTIVITY_MAX_PENDING", 10000))
+
+# Audit trail (users.logic.audit.AuditMixin on the tenant viewsets), same write-behind queue
+AUDIT_LOG_BATCH_SIZE = int(os.environ.get("AUDIT_LOG_BATCH_SIZE", 500))
+AUDIT_LOG_FLUSH_INTERVAL = float(os.environ.get("AUDIT_LOG_FLUSH_INTERVAL", 2.0))  # seconds
+AUDIT_LOG_MAX_PENDING = int(os.environ.get("AUDIT_LOG_MAX_PENDING", 20000))
+
+# Per-stage request timings (brd_platform.timing): Server-Timing response header, and a
+# warning log for requests slower than SERVER_TIMING_SLOW_MS
+SERVER_TIMING_HEADER = os.environ.get("SERVER_TIMING_HEADER", str(DEBUG)).lower() in ("1", "true", "yes")
+SERVER_TIMING_SLOW_MS = int(os.environ.get("SERVER_TIMING_SLOW_MS", 500))
+
 AUTH_USER_MODEL = "users.User"
 
 # ✅ ADDED THIS SECTION TO FIX AXES WARNING
@@ -135,6 +260,11 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Pagination is opt-in per view (pagination_class, see brd_platform.pagination): list
+# endpoints whose clients expect a bare array stay unpaginated
+API_PAGE_SIZE = int(os.environ.get("API_PAGE_SIZE", 50))
+API_MAX_PAGE_SIZE = int(os.environ.get("API_MAX_PAGE_SIZE", 200))
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework_simplejwt.authentication.JWTAuthentication",
@@ -188,4 +318,10 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
     "UPDATE_LAST_LOGIN": False,
-}
\ No newline at end of file
+    # Re-issues identity claims from the User row instead of copying them forward
+    "TOKEN_REFRESH_SERIALIZER": "users.serializers.ClaimsTokenRefreshSerializer",
+}
+
+# How long the per-user is_active / identity snapshot checked on every request is cached
+# (seconds); User saves drop it immediately
+AUTH_USER_STATE_TTL = int(os.environ.get("AUTH_USER_STATE_TTL", 300))
\ No newline at end of file
@@ -1,24 +1,156 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
 from django.utils.deprecation import MiddlewareMixin
 from tenants.models import Tenant
 
-class TenantMiddleware(MiddlewareMixin):
+
+class TenantCache:
     """
-    Resolve tenant and attach to request. Strategy:
-    1) If request.user has tenant -> use that
-    2) Else check header X-Tenant-ID
-    3) Else None
+    Process-local LRU + TTL cache of Tenant rows, keyed by pk, tenant_id (UUID) and slug.
+    Unknown identifiers are cached as misses too, so a bad header cannot hammer the DB.
+    Cached tenants are shared between requests and must be treated as read-only.
     """
-    def process_request(self, request):
-        request.tenant = None
-        user = getattr(request, 'user', None)
-        if getattr(user, 'is_authenticated', False):
-            t = getattr(user, 'tenant', None)
-            if t:
-                request.tenant = t
-                return
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (expires_at, tenant or None)
+        self._keys_by_pk = {}           # tenant pk -> keys pointing at it
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # ---------------- lookups ----------------
+    def get_by_pk(self, pk):
+        return self._get(('pk', int(pk)), lambda: Tenant.objects.filter(pk=pk).first())
+
+    def get_by_uuid(self, tenant_id):
+        return self._get(('uuid', str(tenant_id)), lambda: Tenant.objects.filter(tenant_id=tenant_id).first())
+
+    def get_by_slug(self, slug):
+        return self._get(('slug', slug), lambda: Tenant.objects.filter(slug=slug).first())
+
+    def resolve(self, identifier):
+        """Accepts a tenant_id UUID or a slug, as sent in the X-Tenant-Id header."""
+        if not identifier:
+            return None
+        try:
+            return self.get_by_uuid(uuid.UUID(str(identifier)))
+        except ValueError:
+            return self.get_by_slug(str(identifier))
+
+    def _get(self, key, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        tenant = loader()
+
+        with self._lock:
+            expires_at = time.monotonic() + self.ttl
+            if tenant is None:
+                self._store(key, expires_at, None)
+            else:
+                for alias in (('pk', tenant.pk), ('uuid', str(tenant.tenant_id)), ('slug', tenant.slug)):
+                    self._store(alias, expires_at, tenant)
+                self._keys_by_pk.setdefault(tenant.pk, set()).update(
+                    {('pk', tenant.pk), ('uuid', str(tenant.tenant_id)), ('slug', tenant.slug)}
+                )
+        return tenant
+
+    def _store(self, key, expires_at, tenant):
+        self._entries[key] = (expires_at, tenant)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # ---------------- invalidation ----------------
+    def invalidate(self, tenant):
+        """Drops every key of a tenant (including a slug it had before being renamed)."""
+        with self._lock:
+            keys = self._keys_by_pk.pop(tenant.pk, set())
+            keys |= {('pk', tenant.pk), ('uuid', str(tenant.tenant_id)), ('slug', tenant.slug)}
+            for key in keys:
+                self._entries.pop(key, None)
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_pk.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+tenant_cache = TenantCache(
+    maxsize=getattr(settings, "TENANT_CACHE_MAXSIZE", 1024),
+    ttl=getattr(settings, "TENANT_CACHE_TTL", 300),
+)
+
+
+def is_platform_user(user):
+    return bool(getattr(user, "is_superuser", False) or getattr(user, "role", None) == "MASTER_ADMIN")
+
+
+def resolve_request_tenant(request):
+    """
+    The tenant a request acts for:
+    1) an authenticated user's own tenant, always;
+    2) the X-Tenant-Id header (tenant UUID or slug), only for platform users
+       (MASTER_ADMIN / superuser), who have no tenant of their own;
+    3) otherwise None.
+    Lookups go through tenant_cache, so the hot path costs no queries.
+    """
+    user = getattr(request, 'user', None)
+    if not getattr(user, 'is_authenticated', False):
+        return None
+    tenant_pk = getattr(user, 'tenant_id', None)
+    if tenant_pk:
+        return tenant_cache.get_by_pk(tenant_pk)
+    if is_platform_user(user):
         tenant_id = request.headers.get('X-Tenant-Id') or request.META.get('HTTP_X_TENANT_ID')
         if tenant_id:
-            try:
-                request.tenant = Tenant.objects.get(tenant_id=tenant_id)
-            except Tenant.DoesNotExist:
-                request.tenant = None
+            return tenant_cache.resolve(tenant_id)
+    return None
+
+
+class TenantMiddleware(MiddlewareMixin):
+    """
+    Sets request.tenant for session-authenticated requests (admin, browsable API).
+    API requests authenticate with JWT inside the view, after this runs; viewsets that
+    read request.tenant use TenantScopedMixin, which resolves it again once the user is known.
+    """
+    def process_request(self, request):
+        request.tenant = resolve_request_tenant(request)
+
+
+class TenantScopedMixin:
+    """DRF view mixin: request.tenant resolved after authentication (see resolve_request_tenant)."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        request.tenant = resolve_request_tenant(request)
@@ -0,0 +1,61 @@
+# brd_platform/timing.py
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Stage timings of the current request: [(name, milliseconds)], or None outside a request
+_stages = contextvars.ContextVar("request_stages", default=None)
+
+
+@contextmanager
+def stage(name):
+    """Times the block and records it against the current request (no-op bookkeeping outside one)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages = _stages.get()
+        if stages is not None:
+            stages.append((name, (time.perf_counter() - started) * 1000))
+
+
+def recorded_stages():
+    return list(_stages.get() or [])
+
+
+class ServerTimingMiddleware:
+    """
+    Collects stage() timings per request. Adds them as a Server-Timing header when
+    SERVER_TIMING_HEADER is on, and logs requests slower than SERVER_TIMING_SLOW_MS with
+    their stage breakdown.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.header = getattr(settings, "SERVER_TIMING_HEADER", False)
+        self.slow_ms = getattr(settings, "SERVER_TIMING_SLOW_MS", 500)
+
+    def __call__(self, request):
+        token = _stages.set([])
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+            stages = _stages.get()
+        finally:
+            _stages.reset(token)
+        total = (time.perf_counter() - started) * 1000
+
+        if stages and self.header:
+            metrics = [f"{name};dur={ms:.1f}" for name, ms in stages] + [f"total;dur={total:.1f}"]
+            response["Server-Timing"] = ", ".join(metrics)
+        if stages and total >= self.slow_ms:
+            logger.warning(
+                "Slow request %s %s: %.0f ms (%s)", request.method, request.path, total,
+                ", ".join(f"{name} {ms:.0f} ms" for name, ms in stages),
+            )
+        return response
@@ -3,7 +3,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from .views import home
+from .views import home, TenantCacheStatsView
 from users.views import CustomTokenObtainPairView, MasterAdminLoginView, TenantLoginView
 # from adminpanel.views import SettingsView
 
@@ -34,5 +34,6 @@ urlpatterns = [
     path("api/v1/los/", include("los.urls")), 
     
     # path("api/v1/lms/", include("lms.urls")), # Keep LMS commented until ready
+    path("api/v1/system/tenant-cache/", TenantCacheStatsView.as_view(), name="tenant-cache-stats"),
     path("api/v1/", include("reporting.urls")), 
 ]+ static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -1,4 +1,17 @@
 from django.http import JsonResponse
+from rest_framework.views import APIView
+from rest_framework.response import Response
+
+from .permissions import IsMasterAdmin
+from .tenant_context import tenant_cache
 
 def home(request):
     return JsonResponse({"status":"ok","message":"BRD Platform API"})
+
+
+class TenantCacheStatsView(APIView):
+    """Hit/miss counters of this worker process's tenant cache."""
+    permission_classes = [IsMasterAdmin]
+
+    def get(self, request):
+        return Response(tenant_cache.stats())
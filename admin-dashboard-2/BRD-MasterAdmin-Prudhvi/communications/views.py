@@ -2,8 +2,10 @@ from rest_framework import viewsets
 from .models import Communication
 from .serializers import CommunicationSerializer
 from users.permissions import DefaultPermission
+from brd_platform.pagination import CreatedAtCursorPagination
 
 class CommunicationViewSet(viewsets.ModelViewSet):
     queryset = Communication.objects.all().order_by('-created_at')
     serializer_class = CommunicationSerializer
+    pagination_class = CreatedAtCursorPagination
     permission_classes = [DefaultPermission]
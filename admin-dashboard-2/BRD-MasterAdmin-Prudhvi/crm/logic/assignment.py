@@ -0,0 +1,17 @@
+# crm/logic/assignment.py
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q
+
+User = get_user_model()
+
+OPEN_LEAD_STATUSES = ("NEW", "CONTACTED", "QUALIFIED")
+
+
+def least_loaded_sales_executive(tenant):
+    """Active SALES_EXECUTIVE of the tenant holding the fewest open leads (oldest account wins ties)."""
+    return (
+        User.objects.filter(tenant=tenant, role="SALES_EXECUTIVE", is_active=True)
+        .annotate(open_leads=Count("lead", filter=Q(lead__status__in=OPEN_LEAD_STATUSES)))
+        .order_by("open_leads", "created_at", "pk")
+        .first()
+    )
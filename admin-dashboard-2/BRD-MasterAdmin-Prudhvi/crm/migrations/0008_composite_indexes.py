@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crm', '0007_business'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['tenant', 'created_at'], name='lead_tenant_created'),
+        ),
+    ]
@@ -14,6 +14,11 @@ class Lead(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['tenant', 'created_at'], name='lead_tenant_created'),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.email or self.phone})"
 
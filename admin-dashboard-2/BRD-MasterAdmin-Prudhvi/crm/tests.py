@@ -1,3 +1,73 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from tenants.models import Tenant, Branch
+from users.models import User
+from .models import Lead
+
+
+class TenantScopeTests(TestCase):
+
+    def setUp(self):
+        self.acme = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        self.globex = Tenant.objects.create(name="Globex Credit", tenant_type="NBFC", email="ops@globex.test")
+        Lead.objects.create(name="Acme lead", tenant=self.acme)
+        Lead.objects.create(name="Globex lead", tenant=self.globex)
+
+    def leads(self, user, tenant=None):
+        client = APIClient()
+        client.force_authenticate(user)
+        headers = {"HTTP_X_TENANT_ID": str(tenant.tenant_id)} if tenant else {}
+        response = client.get("/api/v1/crm/leads/", **headers)
+        self.assertEqual(response.status_code, 200)
+        return [row["name"] for row in response.data["results"]]
+
+    def test_tenant_user_is_pinned_to_own_tenant(self):
+        user = User.objects.create_user(email="sales@acme.test", password="pw", tenant=self.acme, role="SALES_EXECUTIVE")
+        self.assertEqual(self.leads(user), ["Acme lead"])
+        # Another tenant's id in the header is ignored
+        self.assertEqual(self.leads(user, self.globex), ["Acme lead"])
+
+    def test_header_is_ignored_for_users_without_a_tenant(self):
+        user = User.objects.create_user(email="drifter@example.test", password="pw", role="SALES_EXECUTIVE")
+        self.assertEqual(self.leads(user, self.globex), [])
+
+        client = APIClient()
+        client.force_authenticate(user)
+        client.post("/api/v1/crm/leads/", {"name": "Planted"}, HTTP_X_TENANT_ID=str(self.globex.tenant_id))
+        self.assertFalse(Lead.objects.filter(name="Planted", tenant=self.globex).exists())
+
+    def test_master_admin_selects_tenant_with_header(self):
+        admin = User.objects.create_user(email="root@platform.test", password="pw", role="MASTER_ADMIN")
+        self.assertEqual(self.leads(admin, self.globex), ["Globex lead"])
+        self.assertEqual(self.leads(admin), [])
+
+
+class ListResponseShapeTests(TestCase):
+    """Pagination is opt-in: the frontend reads `results` only from cursor-paginated endpoints."""
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(email="admin@acme.test", password="pw", tenant=self.tenant, role="ADMIN")
+        )
+
+    def test_leads_are_cursor_paginated(self):
+        for number in range(3):
+            Lead.objects.create(name=f"Lead {number}", tenant=self.tenant)
+        first = self.client.get("/api/v1/crm/leads/", {"page_size": 2})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(set(first.data), {"next", "previous", "results"})
+        self.assertEqual([row["name"] for row in first.data["results"]], ["Lead 2", "Lead 1"])
+
+        second = self.client.get(first.data["next"])
+        self.assertEqual([row["name"] for row in second.data["results"]], ["Lead 0"])
+        self.assertIsNone(second.data["next"])
+
+    def test_unpaginated_endpoints_return_a_list(self):
+        Branch.objects.create(tenant=self.tenant, branch_code="BR001", name="Pune")
+        response = self.client.get("/api/v1/tenants/branches/")
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(response.data[0]["name"], "Pune")
@@ -1,4 +1,5 @@
 from rest_framework import viewsets, permissions
+from rest_framework.exceptions import ValidationError
 from .models import Lead, Customer, LeadActivity, Business
 from .serializers import (
     LeadSerializer, 
@@ -6,9 +7,15 @@ from .serializers import (
     LeadActivitySerializer, 
     BusinessSerializer
 )
+from brd_platform.tenant_context import TenantScopedMixin
+from brd_platform.pagination import CreatedAtCursorPagination
+from crm.logic.assignment import least_loaded_sales_executive
+from tenants.logic.rule_config import rules_for
+from users.logic.audit import AuditMixin
 
-class LeadViewSet(viewsets.ModelViewSet):
+class LeadViewSet(TenantScopedMixin, AuditMixin, viewsets.ModelViewSet):
     serializer_class = LeadSerializer
+    pagination_class = CreatedAtCursorPagination
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
@@ -19,10 +26,20 @@ class LeadViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         tenant = getattr(self.request, "tenant", None)
-        serializer.save(tenant=tenant)
+        rules = rules_for(tenant.pk if tenant else None)
+
+        phone = serializer.validated_data.get("phone")
+        if phone and rules.validation.phone_10_digits and not (phone.isdigit() and len(phone) == 10):
+            raise ValidationError({"phone": "Phone number must be 10 digits"})
+
+        extra = {}
+        if tenant and not serializer.validated_data.get("assigned_to") and rules.auto_assign("sales"):
+            extra["assigned_to"] = least_loaded_sales_executive(tenant)
+        serializer.save(tenant=tenant, **extra)
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(TenantScopedMixin, AuditMixin, viewsets.ModelViewSet):
     serializer_class = CustomerSerializer
+    pagination_class = CreatedAtCursorPagination
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
@@ -35,8 +52,9 @@ class CustomerViewSet(viewsets.ModelViewSet):
         tenant = getattr(self.request, "tenant", None)
         serializer.save(tenant=tenant)
 
-class LeadActivityViewSet(viewsets.ReadOnlyModelViewSet):
+class LeadActivityViewSet(TenantScopedMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = LeadActivitySerializer
+    pagination_class = CreatedAtCursorPagination
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
@@ -46,7 +64,7 @@ class LeadActivityViewSet(viewsets.ReadOnlyModelViewSet):
         return LeadActivity.objects.none()
 
 # ✅ Added Business ViewSet
-class BusinessViewSet(viewsets.ModelViewSet):
+class BusinessViewSet(TenantScopedMixin, AuditMixin, viewsets.ModelViewSet):
     serializer_class = BusinessSerializer
     permission_classes = [permissions.IsAuthenticated]
 
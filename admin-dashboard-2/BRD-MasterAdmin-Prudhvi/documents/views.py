@@ -2,9 +2,11 @@ from rest_framework import viewsets
 from .models import Document
 from .serializers import DocumentSerializer
 from users.permissions import DefaultPermission
+from brd_platform.pagination import CreatedAtCursorPagination
 
 
 class DocumentViewSet(viewsets.ModelViewSet):
     queryset = Document.objects.all().order_by('-created_at')
     serializer_class = DocumentSerializer
+    pagination_class = CreatedAtCursorPagination
     permission_classes = [DefaultPermission]
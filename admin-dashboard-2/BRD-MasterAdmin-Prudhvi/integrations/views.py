@@ -1,8 +1,10 @@
 from rest_framework import viewsets, permissions
 from .models import APIIntegration, WebhookLog
 from .serializers import APIIntegrationSerializer, WebhookLogSerializer
+from brd_platform.tenant_context import TenantScopedMixin
+from brd_platform.pagination import ReceivedAtCursorPagination
 
-class APIIntegrationViewSet(viewsets.ModelViewSet):
+class APIIntegrationViewSet(TenantScopedMixin, viewsets.ModelViewSet):
     serializer_class = APIIntegrationSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -15,8 +17,9 @@ class APIIntegrationViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(tenant=getattr(self.request, "tenant", None))
 
-class WebhookLogViewSet(viewsets.ReadOnlyModelViewSet):
+class WebhookLogViewSet(TenantScopedMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = WebhookLogSerializer
+    pagination_class = ReceivedAtCursorPagination
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
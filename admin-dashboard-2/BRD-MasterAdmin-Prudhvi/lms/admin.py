@@ -1,10 +1,11 @@
 # lms/admin.py
 from django.contrib import admin
-from .models import LoanAccount, Repayment, Collection
+from .models import LoanAccount, Repayment, Collection, Installment, AccrualEntry
 
 @admin.register(LoanAccount)
 class LoanAccountAdmin(admin.ModelAdmin):
-    list_display = ('account_id', 'loan_application', 'disbursed_at', 'outstanding_principal')
+    list_display = ('account_id', 'loan_application', 'disbursed_at', 'outstanding_principal', 'dpd', 'asset_class')
+    list_filter = ('asset_class',)
     search_fields = ('account_id', 'loan_application__application_id')
 
 @admin.register(Repayment)
@@ -16,3 +17,15 @@ class RepaymentAdmin(admin.ModelAdmin):
 class CollectionAdmin(admin.ModelAdmin):
     list_display = ('loan_account', 'collector', 'amount', 'collected_at')
     search_fields = ('collector__email',)
+
+@admin.register(Installment)
+class InstallmentAdmin(admin.ModelAdmin):
+    list_display = ('loan_account', 'installment_no', 'due_date', 'principal_due', 'interest_due', 'principal_paid', 'interest_paid')
+    list_filter = ('due_date',)
+    raw_id_fields = ('loan_account',)
+
+@admin.register(AccrualEntry)
+class AccrualEntryAdmin(admin.ModelAdmin):
+    list_display = ('loan_account', 'business_date', 'entry_type', 'amount', 'rate', 'dpd')
+    list_filter = ('entry_type', 'business_date')
+    raw_id_fields = ('loan_account', 'installment')
@@ -0,0 +1,347 @@
+# lms/logic/accrual.py
+import datetime
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from decimal import Decimal
+
+import numpy as np
+from django.db import connection, connections, transaction
+from django.db.models import Max, Min, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from lms.models import LoanAccount, Installment, AccrualEntry
+from tenants.models import ChargeConfig, InterestConfig, RepaymentConfig, TenantLoanProduct
+from .overdue import overdue_positions
+from .schedule import latest_by_tenant
+
+ZERO = Decimal('0.00')
+DAYS_IN_YEAR = 365            # ACT/365 daily interest
+PENALTY_PERIOD_DAYS = 30      # percentage penalties are per month of overdue, accrued daily when RECURRING
+DEFAULT_GRACE_DAYS = 3        # RepaymentConfig.grace_days default
+
+# InterestConfig.accrual_stage: PRE_EMI accrues only in the broken period up to the first due date
+# (interest after that is recognised through the schedule); POST_EMI accrues for the life of the loan.
+# InterestConfig.accrual_method: SIMPLE and COMPOUND accrue on the outstanding principal, FLAT on the
+# scheduled (original) principal. Daily accrual never capitalises, so SIMPLE and COMPOUND accrue alike.
+
+SLAB_RANGE_RE = re.compile(r'^\s*(\d+)\s*(?:-|to)\s*(\d+)', re.IGNORECASE)
+SLAB_OPEN_RE = re.compile(r'^\s*(>=?)?\s*(\d+)\s*(\+)?')
+RATE_RE = re.compile(r'-?\d+(?:\.\d+)?')
+
+
+class AccrualConfigError(ValueError):
+    pass
+
+
+def parse_slabs(slab_config):
+    """
+    {'1-30 days': '2%', '31-60 days': 4, '90+ days': '6%'} -> sorted [(low, high, rate)].
+    Bounds are inclusive DPD; an open-ended slab ('90+', '>90') has high = None.
+    """
+    slabs = []
+    for label, value in (slab_config or {}).items():
+        match = RATE_RE.search(str(value))
+        if not match:
+            raise AccrualConfigError(f"Slab '{label}': cannot parse rate '{value}'")
+        rate = float(match.group())
+        bounds = SLAB_RANGE_RE.match(str(label))
+        if bounds:
+            low, high = sorted((int(bounds.group(1)), int(bounds.group(2))))
+        else:
+            bounds = SLAB_OPEN_RE.match(str(label))
+            if not bounds:
+                raise AccrualConfigError(f"Slab '{label}': cannot parse day range")
+            low = int(bounds.group(2)) + (1 if bounds.group(1) == '>' else 0)
+            high = None
+        slabs.append((low, high, rate))
+    return sorted(slabs, key=lambda slab: slab[0])
+
+
+class PenaltyPolicy:
+    """Latest PENALTY ChargeConfig of a tenant plus its grace days, evaluated column-wise."""
+
+    def __init__(self, charge=None, grace_days=DEFAULT_GRACE_DAYS):
+        self.grace_days = grace_days
+        self.basis = charge.basis if charge else None
+        self.recurring = bool(charge) and charge.frequency == 'RECURRING'
+        self.value = float(charge.value) if charge else 0.0
+        slabs = parse_slabs(charge.slab_config) if charge and charge.basis == 'SLAB' else []
+        self.lows = np.array([low for low, _, _ in slabs], dtype=np.int64)
+        self.highs = np.array([np.iinfo(np.int64).max if high is None else high for _, high, _ in slabs], dtype=np.int64)
+        self.rates = np.array([rate for _, _, rate in slabs], dtype=np.float64)
+
+    def evaluate(self, dpd, overdue_paise, charged_dpd=None):
+        """
+        Returns (penalty in paise, rate %) arrays for one business date.
+        charged_dpd: highest DPD at which a penalty was already posted against each account's
+        oldest overdue installment (-1 when none); ONE_TIME penalties are charged once a threshold
+        has been crossed and not yet charged, so a missed business date does not skip them.
+        """
+        n = len(dpd)
+        charged_dpd = np.full(n, -1, dtype=np.int64) if charged_dpd is None else charged_dpd
+        penalty = np.zeros(n, dtype=np.int64)
+        rate = np.zeros(n, dtype=np.float64)
+        if self.basis is None:
+            return penalty, rate
+        first_day = self.grace_days + 1
+        penalised = dpd >= first_day
+
+        if self.basis == 'SLAB':
+            if not len(self.lows):
+                return penalty, rate
+            slot = np.clip(np.searchsorted(self.lows, dpd, side='right') - 1, 0, None)
+            in_slab = (dpd >= self.lows[slot]) & (dpd <= self.highs[slot])
+            rate = np.where(penalised & in_slab, self.rates[slot], 0.0)
+            # ONE_TIME slabs charge once per slab, from its first penalised day
+            threshold = np.maximum(self.lows[slot], first_day)
+        else:
+            rate = np.where(penalised, self.value if self.basis == 'PERCENTAGE' else 0.0, 0.0)
+            threshold = np.full(n, first_day, dtype=np.int64)
+        trigger = (dpd >= threshold) & (charged_dpd < threshold)
+
+        if self.basis == 'FIXED':
+            amount = np.full(n, self.value * 100, dtype=np.float64)
+        else:
+            amount = overdue_paise * rate / 100
+        if self.recurring:
+            amount = amount / PENALTY_PERIOD_DAYS
+        else:
+            amount = np.where(trigger, amount, 0.0)
+        penalty = np.where(penalised & (overdue_paise > 0), np.rint(amount), 0).astype(np.int64)
+        return penalty, rate
+
+
+class AccrualPolicy:
+    """Interest and penalty settings of one tenant, resolved once per run."""
+
+    def __init__(self, tenant_id):
+        self.tenant_id = tenant_id
+        self.default_interest = latest_by_tenant(InterestConfig, [tenant_id]).get(tenant_id)
+        self.product_interest = {
+            product.name: product.interest_config
+            for product in TenantLoanProduct.objects.filter(tenant_id=tenant_id, interest_config__isnull=False)
+            .select_related('interest_config')
+        }
+        repayment = latest_by_tenant(RepaymentConfig, [tenant_id]).get(tenant_id)
+        charge = (
+            ChargeConfig.objects.filter(tenant_id=tenant_id, category='PENALTY')
+            .order_by('-created_at', '-id').first()
+        )
+        self.penalty = PenaltyPolicy(charge, repayment.grace_days if repayment else DEFAULT_GRACE_DAYS)
+
+    def interest_config(self, product_name):
+        return self.product_interest.get(product_name) or self.default_interest
+
+    def interest_terms(self, account_rate, product_name):
+        """(annual rate % or None, flat?, pre-EMI only?) for one account."""
+        config = self.interest_config(product_name)
+        rate = account_rate
+        if rate is None and config is not None:
+            rate = config.base_rate + (config.spread_margin if config.interest_type == 'FLOATING' else 0)
+        flat = config is not None and config.accrual_method == 'FLAT'
+        pre_emi = config is not None and config.accrual_stage == 'PRE_EMI'
+        return (float(rate) if rate is not None else np.nan), flat, pre_emi
+
+
+def _new_summary():
+    return {
+        "tenants": 0, "accounts": 0,
+        "interest_entries": 0, "interest": ZERO,
+        "penalty_entries": 0, "penalty": ZERO,
+        "already_accrued": 0,
+    }
+
+
+def _paise(values):
+    return np.array([int((v or 0) * 100) for v in values], dtype=np.int64)
+
+
+# ------------------------------------------------------------------
+# 1. ONE CHUNK (fixed number of queries, NumPy arithmetic in paise)
+# ------------------------------------------------------------------
+
+def accrue_chunk(rows, policy, business_date, summary, dry_run=False):
+    """rows: (account id, outstanding_principal, interest_rate, product name) tuples."""
+    n = len(rows)
+    ids = [row[0] for row in rows]
+
+    done = {'INTEREST': set(), 'PENALTY': set()}
+    for account_id, entry_type in AccrualEntry.objects.filter(
+        loan_account_id__in=ids, business_date=business_date,
+    ).values_list('loan_account_id', 'entry_type'):
+        done[entry_type].add(account_id)
+    summary["already_accrued"] += len(done['INTEREST'] | done['PENALTY'])
+
+    schedule = {
+        row['loan_account_id']: row
+        for row in Installment.objects.filter(loan_account_id__in=ids)
+        .values('loan_account_id').annotate(first_due=Min('due_date'), scheduled=Sum('principal_due'))
+    }
+    positions = overdue_positions(ids, business_date)
+
+    # --- 1. INTEREST ---
+    terms = [policy.interest_terms(rate, product) for _, _, rate, product in rows]
+    annual_rate = np.array([t[0] for t in terms], dtype=np.float64)
+    flat = np.fromiter((t[1] for t in terms), dtype=bool, count=n)
+    pre_emi = np.fromiter((t[2] for t in terms), dtype=bool, count=n)
+    outstanding = _paise(row[1] for row in rows)
+    scheduled = _paise(schedule[pk]['scheduled'] if pk in schedule else 0 for pk in ids)
+    first_due = np.array([schedule[pk]['first_due'] if pk in schedule else None for pk in ids], dtype='datetime64[D]')
+
+    base = np.where(flat & (scheduled > 0), scheduled, outstanding)
+    in_window = ~pre_emi | np.isnat(first_due) | (np.datetime64(business_date) < first_due)
+    known_rate = ~np.isnan(annual_rate)
+    interest = np.zeros(n, dtype=np.int64)
+    interest[known_rate] = np.rint(base[known_rate] * annual_rate[known_rate] / 100 / DAYS_IN_YEAR).astype(np.int64)
+    interest[~in_window] = 0
+
+    # --- 2. PENALTY ---
+    dpd = np.array([positions[pk].dpd if pk in positions else 0 for pk in ids], dtype=np.int64)
+    overdue = _paise(positions[pk].amount if pk in positions else 0 for pk in ids)
+    charged_dpd = None
+    if policy.penalty.basis is not None and not policy.penalty.recurring:
+        charged = dict(
+            AccrualEntry.objects.filter(
+                entry_type='PENALTY', installment_id__in=[position.oldest_installment_id for position in positions.values()],
+            ).values('installment_id').annotate(top=Max('dpd')).order_by().values_list('installment_id', 'top')
+        )
+        charged_dpd = np.array(
+            [charged.get(positions[pk].oldest_installment_id, -1) if pk in positions else -1 for pk in ids],
+            dtype=np.int64,
+        )
+    penalty, penalty_rate = policy.penalty.evaluate(dpd, overdue, charged_dpd)
+
+    entries = []
+    penalties = {}
+    for i, pk in enumerate(ids):
+        if interest[i] > 0 and pk not in done['INTEREST']:
+            entries.append(AccrualEntry(
+                loan_account_id=pk, business_date=business_date, entry_type='INTEREST',
+                amount=Decimal(int(interest[i])) / 100, base_amount=Decimal(int(base[i])) / 100,
+                rate=Decimal(str(annual_rate[i])), dpd=int(dpd[i]),
+            ))
+            summary["interest_entries"] += 1
+            summary["interest"] += entries[-1].amount
+        if penalty[i] > 0 and pk not in done['PENALTY']:
+            installment_id = positions[pk].oldest_installment_id
+            entries.append(AccrualEntry(
+                loan_account_id=pk, installment_id=installment_id, business_date=business_date,
+                entry_type='PENALTY', amount=Decimal(int(penalty[i])) / 100,
+                base_amount=Decimal(int(overdue[i])) / 100, rate=Decimal(str(penalty_rate[i])), dpd=int(dpd[i]),
+            ))
+            penalties[installment_id] = entries[-1].amount
+            summary["penalty_entries"] += 1
+            summary["penalty"] += entries[-1].amount
+    summary["accounts"] += n
+
+    if dry_run or not entries:
+        return
+    with transaction.atomic():
+        if penalties:
+            # Same lock protocol as allocation.allocate_bulk: account rows first, in id order
+            penalised = sorted({entry.loan_account_id for entry in entries if entry.entry_type == 'PENALTY'})
+            list(LoanAccount.objects.select_for_update(of=('self',)).filter(pk__in=penalised).order_by('pk').values_list('pk'))
+            installments = list(Installment.objects.filter(pk__in=penalties).only('id', 'penalty_due'))
+            for installment in installments:
+                installment.penalty_due += penalties[installment.pk]
+            Installment.objects.bulk_update(installments, ['penalty_due'], batch_size=1000)
+        # The unique (account, date, type) constraint makes a concurrent duplicate run roll back here
+        AccrualEntry.objects.bulk_create(entries, batch_size=2000)
+
+
+# ------------------------------------------------------------------
+# 2. PER-TENANT PASS
+# ------------------------------------------------------------------
+
+def accrue_tenant(tenant_id, business_date, chunk_size=2000, dry_run=False, progress=None):
+    """
+    Accrues one business date for every open account of a tenant, in keyset chunks.
+    Idempotent: accounts that already have an entry of a type for the date are skipped,
+    so a failed or repeated run can simply be started again.
+    """
+    policy = AccrualPolicy(tenant_id)
+    cutoff = timezone.make_aware(datetime.datetime.combine(business_date + datetime.timedelta(days=1), datetime.time.min))
+    accounts = (
+        LoanAccount.objects.filter(loan_application__tenant_id=tenant_id, outstanding_principal__gt=0)
+        .annotate(started_at=Coalesce('disbursed_at', 'created_at'))
+        .filter(started_at__lt=cutoff)
+        .order_by('pk')
+    )
+    summary = _new_summary()
+    summary["tenants"] = 1
+    last_pk = 0
+    while True:
+        rows = list(accounts.filter(pk__gt=last_pk).values_list(
+            'id', 'outstanding_principal', 'interest_rate', 'loan_application__product__name',
+        )[:chunk_size])
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+        accrue_chunk(rows, policy, business_date, summary, dry_run)
+        if progress:
+            progress(summary)
+    return summary
+
+
+def _accrue_tenant_worker(tenant_id, business_date, chunk_size, dry_run):
+    summary = accrue_tenant(tenant_id, datetime.date.fromisoformat(business_date), chunk_size, dry_run)
+    connections.close_all()
+    return {key: str(value) if isinstance(value, Decimal) else value for key, value in summary.items()}
+
+
+def _init_worker():
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    # Forked children must not reuse the parent's socket
+    connections.close_all()
+
+
+def _merge(summary, part):
+    for key, value in part.items():
+        summary[key] += Decimal(value) if isinstance(summary[key], Decimal) else value
+
+
+# ------------------------------------------------------------------
+# 3. ENTRY POINT
+# ------------------------------------------------------------------
+
+def run_accruals(business_date=None, tenant_ids=None, workers=1, chunk_size=2000, dry_run=False, progress=None):
+    """
+    End-of-day accrual for the whole book (or the given tenants).
+    With workers > 1 tenants are spread over a process pool; each worker opens its own
+    database connection, so the parent closes its connections before the pool starts.
+    """
+    business_date = business_date or timezone.localdate()
+    if tenant_ids is None:
+        tenant_ids = sorted(set(
+            LoanAccount.objects.filter(outstanding_principal__gt=0)
+            .values_list('loan_application__tenant_id', flat=True).distinct()
+        ))
+    summary = _new_summary()
+
+    # SQLite allows a single writer, so parallel tenants would only fail with "database is locked"
+    if workers <= 1 or len(tenant_ids) <= 1 or connection.vendor == 'sqlite':
+        for tenant_id in tenant_ids:
+            _merge(summary, accrue_tenant(tenant_id, business_date, chunk_size, dry_run))
+            if progress:
+                progress(summary)
+    else:
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=min(workers, len(tenant_ids)), initializer=_init_worker) as pool:
+            futures = [
+                pool.submit(_accrue_tenant_worker, tenant_id, business_date.isoformat(), chunk_size, dry_run)
+                for tenant_id in tenant_ids
+            ]
+            for future in as_completed(futures):
+                _merge(summary, future.result())
+                if progress:
+                    progress(summary)
+
+    summary["business_date"] = business_date.isoformat()
+    summary["interest"] = str(summary["interest"])
+    summary["penalty"] = str(summary["penalty"])
+    return summary
@@ -0,0 +1,203 @@
+# lms/logic/allocation.py
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from lms.models import LoanAccount, Installment, Repayment
+from tenants.models import RepaymentConfig, default_waterfall
+from reporting.logic import rollup
+
+ZERO = Decimal('0.00')
+
+# RepaymentConfig.waterfall_sequence bucket -> Installment column prefix
+BUCKETS = {
+    'Penalties': 'penalty',
+    'Charges': 'charges',
+    'Fees': 'fees',
+    'Interest': 'interest',
+    'Principal': 'principal',
+}
+EXCESS = 'Excess'
+PAID_FIELDS = [f"{prefix}_paid" for prefix in BUCKETS.values()]
+
+
+class PaymentError(ValueError):
+    pass
+
+
+class Payment:
+    """One incoming payment: a single API request or one line of a bank statement."""
+    __slots__ = ('loan_account_id', 'amount', 'paid_at', 'reference')
+
+    def __init__(self, loan_account_id, amount, paid_at=None, reference=None):
+        self.loan_account_id = loan_account_id
+        self.amount = Decimal(str(amount)).quantize(ZERO)
+        paid_at = paid_at or timezone.now()
+        if timezone.is_naive(paid_at):
+            paid_at = timezone.make_aware(paid_at)
+        self.paid_at = paid_at
+        self.reference = reference
+        if self.amount <= 0:
+            raise PaymentError(f"Payment amount must be positive, got {amount}")
+
+
+def waterfall_for_tenants(tenant_ids):
+    """Latest RepaymentConfig.waterfall_sequence per tenant, keeping only known buckets."""
+    sequences = {}
+    configs = (
+        RepaymentConfig.objects.filter(tenant_id__in=tenant_ids)
+        .order_by('tenant_id', '-created_at', '-id')
+        .values_list('tenant_id', 'waterfall_sequence')
+    )
+    for tenant_id, sequence in configs:
+        if tenant_id not in sequences:
+            sequences[tenant_id] = [name for name in (sequence or []) if name in BUCKETS] or default_waterfall()
+    return sequences
+
+
+def allocate_to_installments(amount, installments, sequence):
+    """
+    Applies amount across the given open installments (oldest first) bucket by bucket:
+    all overdue penalties, then all charges, ... then principal. Mutates the installments'
+    *_paid columns and returns ({bucket: Decimal}, set of touched installment ids).
+    """
+    split = {name: ZERO for name in sequence}
+    touched = set()
+    remaining = amount
+    for name in sequence:
+        prefix = BUCKETS[name]
+        for installment in installments:
+            if remaining <= 0:
+                break
+            due = getattr(installment, f"{prefix}_due") - getattr(installment, f"{prefix}_paid")
+            if due <= 0:
+                continue
+            applied = min(due, remaining)
+            setattr(installment, f"{prefix}_paid", getattr(installment, f"{prefix}_paid") + applied)
+            split[name] += applied
+            remaining -= applied
+            touched.add(installment.pk)
+    split[EXCESS] = remaining
+    return split, touched
+
+
+def allocate_payment_to_schedule(amount, schedule, paid_on, sequence):
+    """
+    Clears everything due up to paid_on through the waterfall, then applies what is left to
+    the upcoming installments one at a time in due-date order (an advance payment settles the
+    next installment in full before touching the one after it). Only money left once the whole
+    schedule is settled is returned as Excess, the account's credit balance.
+    """
+    due_now = [inst for inst in schedule if inst.due_date <= paid_on]
+    split, touched = allocate_to_installments(amount, due_now, sequence)
+    for inst in schedule:
+        if split[EXCESS] <= 0:
+            break
+        if inst.due_date <= paid_on:
+            continue
+        part, part_touched = allocate_to_installments(split[EXCESS], [inst], sequence)
+        for name in sequence:
+            split[name] += part[name]
+        split[EXCESS] = part[EXCESS]
+        touched |= part_touched
+    return split, touched
+
+
+@transaction.atomic
+def allocate_bulk(payments, batch_size=1000):
+    """
+    Allocates a batch of payments (e.g. a whole bank statement) in one transaction.
+
+    Lock protocol: every writer of an account's installments first locks the LoanAccount
+    row with select_for_update, always in ascending id order, so concurrent settlement runs
+    queue per account instead of deadlocking. Reads are one query per table for the whole
+    batch; writes are bulk_create / bulk_update.
+
+    Payments against accounts without a schedule go entirely to principal (the previous
+    behaviour). Money left after clearing dues up to the payment date goes to the upcoming
+    installments; only what is left once the schedule is settled is kept as Excess.
+    Returns a summary with per-bucket totals and the created Repayment rows.
+    """
+    payments = sorted(payments, key=lambda p: (p.loan_account_id, p.paid_at))
+    account_ids = sorted({p.loan_account_id for p in payments})
+
+    accounts = {
+        account.pk: account
+        for account in LoanAccount.objects.select_for_update(of=('self',))
+        .filter(pk__in=account_ids)
+        .select_related('loan_application')
+        .only('id', 'outstanding_principal', 'loan_application__tenant')
+        .order_by('pk')
+    }
+    missing = [pk for pk in account_ids if pk not in accounts]
+    if missing:
+        raise PaymentError(f"Unknown loan accounts: {missing[:20]}")
+
+    open_installments = defaultdict(list)
+    unsettled = Q()
+    for prefix in BUCKETS.values():
+        unsettled |= Q(**{f"{prefix}_paid__lt": F(f"{prefix}_due")})
+    for installment in (
+        Installment.objects.filter(loan_account_id__in=account_ids).filter(unsettled)
+        .order_by('loan_account_id', 'due_date', 'installment_no')
+    ):
+        open_installments[installment.loan_account_id].append(installment)
+
+    tenant_of = {pk: account.loan_application.tenant_id for pk, account in accounts.items()}
+    sequences = waterfall_for_tenants(set(tenant_of.values()))
+
+    totals = defaultdict(lambda: ZERO)
+    changed_installments = {}
+    repayments = []
+    for payment in payments:
+        account = accounts[payment.loan_account_id]
+        sequence = sequences.get(tenant_of[account.pk], default_waterfall())
+        schedule = open_installments.get(account.pk)
+        if schedule:
+            paid_on = timezone.localdate(payment.paid_at)
+            split, touched = allocate_payment_to_schedule(payment.amount, schedule, paid_on, sequence)
+            for inst in schedule:
+                if inst.pk in touched:
+                    changed_installments[inst.pk] = inst
+        else:
+            split = {name: ZERO for name in sequence}
+            split['Principal'] = payment.amount
+            split[EXCESS] = ZERO
+
+        account.outstanding_principal = (account.outstanding_principal or ZERO) - split.get('Principal', ZERO)
+        for name, value in split.items():
+            totals[name] += value
+        repayments.append(Repayment(
+            loan_account_id=account.pk,
+            amount=payment.amount,
+            paid_at=payment.paid_at,
+            transaction_reference=payment.reference,
+            allocation={name: str(value) for name, value in split.items()},
+        ))
+
+    Repayment.objects.bulk_create(repayments, batch_size=batch_size)
+    if changed_installments:
+        Installment.objects.bulk_update(list(changed_installments.values()), PAID_FIELDS, batch_size=batch_size)
+    LoanAccount.objects.bulk_update(list(accounts.values()), ['outstanding_principal'], batch_size=batch_size)
+
+    # bulk_create skips the Repayment post_save rollup signal
+    rollup.record_repayments(
+        (tenant_of[r.loan_account_id], r.amount, timezone.localdate(r.paid_at)) for r in repayments
+    )
+
+    return {
+        "payments": len(repayments),
+        "accounts": len(accounts),
+        "amount": str(sum((r.amount for r in repayments), ZERO)),
+        "buckets": {name: str(value) for name, value in totals.items()},
+        "repayments": repayments,
+    }
+
+
+def allocate_payment(loan_account_id, amount, paid_at=None, reference=None):
+    """Single-payment entry point used by RepaymentViewSet.create; returns the Repayment."""
+    summary = allocate_bulk([Payment(loan_account_id, amount, paid_at, reference)])
+    return summary["repayments"][0]
@@ -0,0 +1,121 @@
+# lms/logic/classification.py
+from collections import Counter
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from lms.models import LoanAccount, AssetClassSummary
+from reporting.logic import report_cache
+from .overdue import overdue_positions
+
+# (first DPD of the bucket, asset class); an account is NPA once overdue for more than 90 days
+DPD_BUCKETS = (
+    (0, 'STANDARD'),
+    (1, 'SMA_0'),
+    (31, 'SMA_1'),
+    (61, 'SMA_2'),
+    (91, 'NPA'),
+)
+BUCKET_STARTS = np.array([start for start, _ in DPD_BUCKETS], dtype=np.int64)
+BUCKET_CLASSES = np.array([asset_class for _, asset_class in DPD_BUCKETS], dtype=object)
+
+
+def classify_dpd(dpd):
+    """Vector of DPD -> vector of asset classes."""
+    return BUCKET_CLASSES[np.searchsorted(BUCKET_STARTS, np.maximum(dpd, 0), side='right') - 1]
+
+
+def classify_chunk(rows, as_of, summary):
+    """
+    rows: (account id, current dpd, current asset class) tuples.
+    Returns unsaved LoanAccount instances for the rows whose DPD or class changed.
+    """
+    ids = [row[0] for row in rows]
+    positions = overdue_positions(ids, as_of)
+    n = len(rows)
+    old_dpd = np.fromiter((row[1] for row in rows), dtype=np.int64, count=n)
+    old_class = np.array([row[2] for row in rows], dtype=object)
+    dpd = np.fromiter((positions[pk].dpd if pk in positions else 0 for pk in ids), dtype=np.int64, count=n)
+    new_class = classify_dpd(dpd)
+
+    class_changed = new_class != old_class
+    changed = []
+    for i in np.flatnonzero(class_changed | (dpd != old_dpd)):
+        account = LoanAccount(pk=ids[i], dpd=int(dpd[i]), asset_class=new_class[i])
+        if class_changed[i]:
+            account.asset_class_since = as_of
+            summary["moved"][f"{old_class[i]}->{new_class[i]}"] += 1
+        changed.append(account)
+    summary["accounts"] += n
+    summary["updated"] += len(changed)
+    return changed
+
+
+def rebuild_summaries(as_of, tenant_id=None):
+    """Replaces AssetClassSummary rows with one grouped query over the classified accounts."""
+    accounts = LoanAccount.objects.filter(outstanding_principal__gt=0)
+    existing = AssetClassSummary.objects.all()
+    if tenant_id:
+        accounts = accounts.filter(loan_application__tenant_id=tenant_id)
+        existing = existing.filter(tenant_id=tenant_id)
+    grouped = (
+        accounts.values('loan_application__tenant_id', 'loan_application__branch_id', 'asset_class')
+        .annotate(count=Count('id'), amount=Sum('outstanding_principal'))
+        .order_by()
+    )
+    rows = [
+        AssetClassSummary(
+            tenant_id=row['loan_application__tenant_id'],
+            branch_id=row['loan_application__branch_id'],
+            asset_class=row['asset_class'],
+            accounts=row['count'],
+            outstanding=row['amount'],
+            as_of_date=as_of,
+        )
+        for row in grouped
+    ]
+    with transaction.atomic():
+        existing.delete()
+        AssetClassSummary.objects.bulk_create(rows, batch_size=1000)
+    # The NPA report reads these rows
+    report_cache.invalidate({row.tenant_id for row in rows} | ({tenant_id} if tenant_id else set()))
+    return len(rows)
+
+
+def classify_accounts(tenant_id=None, as_of=None, chunk_size=5000, progress=None):
+    """
+    Recomputes DPD and asset class for open accounts (and resets closed ones that are still
+    flagged) in keyset chunks. Only rows whose DPD or class changed are written, with one
+    bulk_update per chunk; the bucket summary is then rebuilt for the tenant(s).
+    """
+    as_of = as_of or timezone.localdate()
+    accounts = LoanAccount.objects.filter(
+        Q(outstanding_principal__gt=0) | Q(dpd__gt=0) | ~Q(asset_class='STANDARD')
+    )
+    if tenant_id:
+        accounts = accounts.filter(loan_application__tenant_id=tenant_id)
+    accounts = accounts.order_by('pk')
+
+    summary = {"as_of": as_of.isoformat(), "accounts": 0, "updated": 0, "moved": Counter()}
+    last_pk = 0
+    while True:
+        rows = list(accounts.filter(pk__gt=last_pk).values_list('id', 'dpd', 'asset_class')[:chunk_size])
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+        changed = classify_chunk(rows, as_of, summary)
+        if changed:
+            # Accounts changing class get a new asset_class_since; the rest keep theirs
+            moved = [account for account in changed if account.asset_class_since]
+            same = [account for account in changed if not account.asset_class_since]
+            with transaction.atomic():
+                LoanAccount.objects.bulk_update(moved, ['dpd', 'asset_class', 'asset_class_since'], batch_size=1000)
+                LoanAccount.objects.bulk_update(same, ['dpd'], batch_size=1000)
+        if progress:
+            progress(summary)
+
+    summary["summary_rows"] = rebuild_summaries(as_of, tenant_id)
+    summary["moved"] = dict(summary["moved"])
+    return summary
@@ -0,0 +1,233 @@
+# lms/logic/ingest.py
+import csv
+import datetime
+import hashlib
+import io
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from lms.models import LoanAccount, Repayment
+from .allocation import Payment, allocate_bulk
+
+# CSV header aliases -> canonical column
+CSV_COLUMNS = {
+    'account_id': 'account_id', 'loan_account': 'account_id', 'account': 'account_id',
+    'amount': 'amount', 'paid_amount': 'amount',
+    'paid_at': 'paid_at', 'date': 'paid_at', 'value_date': 'paid_at', 'txn_date': 'paid_at',
+    'transaction_reference': 'reference', 'reference': 'reference', 'utr': 'reference', 'umrn': 'reference',
+    'status': 'status', 'result': 'status',
+    'reason': 'reason', 'reason_code': 'reason',
+}
+
+# Fixed-width NACH debit response record: (column, start, end), 0-based, end exclusive.
+# Amount is in paise; date is DDMMYYYY; status 1 = debited, 0 = returned.
+NACH_LAYOUT = (
+    ('account_id', 0, 36),
+    ('amount', 36, 49),
+    ('paid_at', 49, 57),
+    ('status', 57, 58),
+    ('reason', 58, 60),
+    ('reference', 60, 90),
+)
+NACH_MIN_LENGTH = 60  # the trailing reference may be blank-trimmed
+
+SUCCESS_STATUSES = {'', '1', 'success', 'successful', 'paid', 'debited', 'ok', 'accepted'}
+
+DERIVED_REFERENCE_PREFIX = 'AUTO-'
+
+
+class Reject:
+    __slots__ = ('line_no', 'reason', 'raw')
+
+    def __init__(self, line_no, reason, raw=''):
+        self.line_no = line_no
+        self.reason = reason
+        self.raw = raw
+
+
+# ------------------------------------------------------------------
+# 1. PARSERS (generators over a text stream; one record in memory at a time)
+# ------------------------------------------------------------------
+
+def text_stream(binary):
+    """Wraps an uploaded/opened binary file for line iteration without reading it whole."""
+    return io.TextIOWrapper(binary, encoding='utf-8-sig', newline='')
+
+
+def parse_csv(stream):
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = [CSV_COLUMNS.get(name.strip().lower()) for name in header]
+    if 'account_id' not in columns or 'amount' not in columns:
+        yield Reject(1, "header must include account_id and amount", ','.join(header))
+        return
+    for line_no, row in enumerate(reader, start=2):
+        if not any(cell.strip() for cell in row):
+            continue
+        yield line_no, {col: cell.strip() for col, cell in zip(columns, row) if col}, ','.join(row)
+
+
+def parse_nach(stream):
+    for line_no, line in enumerate(stream, start=1):
+        line = line.rstrip('\r\n')
+        if not line.strip():
+            continue
+        if len(line) < NACH_MIN_LENGTH:
+            yield Reject(line_no, f"record shorter than {NACH_MIN_LENGTH} characters", line)
+            continue
+        record = {name: line[start:end].strip() for name, start, end in NACH_LAYOUT}
+        try:
+            record['amount'] = str(Decimal(int(record['amount'])) / 100)
+        except ValueError:
+            yield Reject(line_no, "amount is not numeric", line)
+            continue
+        yield line_no, record, line
+
+
+PARSERS = {'csv': parse_csv, 'nach': parse_nach}
+
+
+def detect_format(filename, default='csv'):
+    name = (filename or '').lower()
+    if name.endswith(('.txt', '.nach', '.dat')):
+        return 'nach'
+    if name.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+# ------------------------------------------------------------------
+# 2. NORMALISE + MATCH
+# ------------------------------------------------------------------
+
+def _parse_paid_at(raw):
+    if not raw:
+        return timezone.now()
+    value = parse_datetime(raw)
+    if value is None:
+        day = parse_date(raw) if '-' in raw else None
+        if day is None:
+            for fmt in ('%d%m%Y', '%d/%m/%Y', '%d-%m-%Y'):
+                try:
+                    day = datetime.datetime.strptime(raw, fmt).date()
+                    break
+                except ValueError:
+                    continue
+        if day is None:
+            raise ValueError(f"unrecognised date '{raw}'")
+        value = datetime.datetime.combine(day, datetime.time(12, 0))
+    return timezone.make_aware(value) if timezone.is_naive(value) else value
+
+
+def build_account_index(tenant_id=None):
+    """account_id (canonical UUID string) -> LoanAccount pk, streamed from one query."""
+    accounts = LoanAccount.objects.all()
+    if tenant_id:
+        accounts = accounts.filter(loan_application__tenant_id=tenant_id)
+    return {str(account_id): pk for account_id, pk in accounts.values_list('account_id', 'pk').iterator(chunk_size=5000)}
+
+
+def derived_reference(account_pk, amount, paid_at, occurrence):
+    """
+    Deterministic transaction_reference for a row that carries none: the same account, amount
+    and value date always give the same key, and the nth identical row of a file gets the nth
+    key, so genuine repeat payments in one file post while a re-upload is recognised.
+    """
+    digest = hashlib.sha256(f"{account_pk}|{amount}|{paid_at}".encode()).hexdigest()[:32]
+    return f"{DERIVED_REFERENCE_PREFIX}{digest}-{occurrence}"
+
+
+def to_payments(records, index):
+    """Turns parsed records into Payment objects, yielding Reject for anything unusable."""
+    occurrences = Counter()
+    for item in records:
+        if isinstance(item, Reject):
+            yield item
+            continue
+        line_no, record, raw = item
+        status = record.get('status', '').lower()
+        if status not in SUCCESS_STATUSES:
+            reason = record.get('reason') or status
+            yield Reject(line_no, f"debit not successful ({reason})", raw)
+            continue
+        pk = index.get(record.get('account_id', '').lower())
+        if pk is None:
+            yield Reject(line_no, f"unknown account_id {record.get('account_id')}", raw)
+            continue
+        try:
+            payment = Payment(pk, record['amount'], _parse_paid_at(record.get('paid_at')), record.get('reference') or None)
+        except (InvalidOperation, ValueError) as exc:
+            yield Reject(line_no, str(exc) or "invalid amount", raw)
+            continue
+        if payment.reference is None:
+            key = (pk, payment.amount, record.get('paid_at', ''))
+            occurrences[key] += 1
+            payment.reference = derived_reference(*key, occurrences[key])
+        yield line_no, payment, raw
+
+
+# ------------------------------------------------------------------
+# 3. PIPELINE
+# ------------------------------------------------------------------
+
+def ingest(stream, file_format='csv', tenant_id=None, chunk_size=2000, on_reject=None, progress=None, max_rejects=200):
+    """
+    Streams a repayment file through parse -> match -> allocate_bulk in chunks.
+    Memory stays bounded by chunk_size plus the account index, regardless of file size.
+    Rows whose transaction_reference already exists are rejected, so re-uploading a file is safe;
+    rows without one are keyed by derived_reference().
+    """
+    index = build_account_index(tenant_id)
+    pipeline = to_payments(PARSERS[file_format](stream), index)
+    summary = {"rows": 0, "posted": 0, "amount": Decimal('0.00'), "rejected": 0, "rejects": [], "buckets": {}}
+
+    def reject(item):
+        summary["rejected"] += 1
+        if len(summary["rejects"]) < max_rejects:
+            summary["rejects"].append({"line": item.line_no, "reason": item.reason})
+        if on_reject:
+            on_reject(item)
+
+    while True:
+        batch = list(islice(pipeline, chunk_size))
+        if not batch:
+            break
+        summary["rows"] += len(batch)
+
+        matched = []
+        for item in batch:
+            if isinstance(item, Reject):
+                reject(item)
+            else:
+                matched.append(item)
+
+        references = {payment.reference for _, payment, _ in matched}
+        seen = set(
+            Repayment.objects.filter(transaction_reference__in=references).values_list('transaction_reference', flat=True)
+        ) if references else set()
+        payments = []
+        for line_no, payment, raw in matched:
+            if payment.reference in seen:
+                reject(Reject(line_no, f"duplicate transaction_reference {payment.reference}", raw))
+                continue
+            seen.add(payment.reference)
+            payments.append(payment)
+
+        if payments:
+            result = allocate_bulk(payments)
+            summary["posted"] += result["payments"]
+            summary["amount"] += Decimal(result["amount"])
+            for bucket, value in result["buckets"].items():
+                summary["buckets"][bucket] = summary["buckets"].get(bucket, Decimal('0.00')) + Decimal(value)
+        if progress:
+            progress(summary)
+
+    summary["amount"] = str(summary["amount"])
+    summary["buckets"] = {bucket: str(value) for bucket, value in summary["buckets"].items()}
+    return summary
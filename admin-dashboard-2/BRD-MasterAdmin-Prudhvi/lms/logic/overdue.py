@@ -0,0 +1,48 @@
+# lms/logic/overdue.py
+from decimal import Decimal
+
+from django.db.models import F, Q
+
+from lms.models import Installment
+
+ZERO = Decimal('0.00')
+
+# An installment is overdue once its due date has passed with principal or interest unpaid.
+# Fees, charges and penalties do not start (or extend) the days-past-due clock.
+UNPAID = Q(principal_paid__lt=F('principal_due')) | Q(interest_paid__lt=F('interest_due'))
+
+
+class OverduePosition:
+    """Overdue state of one account as of a business date."""
+    __slots__ = ('oldest_due_date', 'dpd', 'amount', 'installments', 'oldest_installment_id')
+
+    def __init__(self, oldest_due_date, dpd, amount, installments, oldest_installment_id):
+        self.oldest_due_date = oldest_due_date
+        self.dpd = dpd
+        self.amount = amount
+        self.installments = installments
+        self.oldest_installment_id = oldest_installment_id
+
+
+def overdue_positions(account_ids, as_of):
+    """
+    account_id -> OverduePosition for every account in account_ids with an unpaid installment
+    due before as_of (accounts that are current are absent). One query per call.
+    DPD counts from the oldest unpaid due date: an installment due today is not yet overdue.
+    """
+    positions = {}
+    rows = (
+        Installment.objects.filter(loan_account_id__in=account_ids, due_date__lt=as_of)
+        .filter(UNPAID)
+        .order_by('loan_account_id', 'due_date', 'installment_no')
+        .values_list('loan_account_id', 'id', 'due_date', 'principal_due', 'interest_due', 'principal_paid', 'interest_paid')
+    )
+    for account_id, pk, due_date, principal_due, interest_due, principal_paid, interest_paid in rows:
+        unpaid = (principal_due - principal_paid) + (interest_due - interest_paid)
+        position = positions.get(account_id)
+        if position is None:
+            positions[account_id] = OverduePosition(due_date, (as_of - due_date).days, unpaid, 1, pk)
+        else:
+            position.amount += unpaid
+            position.installments += 1
+    return positions
@@ -0,0 +1,321 @@
+# lms/logic/schedule.py
+from collections import defaultdict
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+
+from lms.models import LoanAccount, Installment
+from tenants.models import Holiday, InterestConfig, RepaymentConfig, TenantLoanProduct
+
+PERIODS_PER_YEAR = {'MONTHLY': 12, 'BI_WEEKLY': 26, 'WEEKLY': 52}
+PERIOD_DAYS = {'BI_WEEKLY': 14, 'WEEKLY': 7}
+STEP_UP_RATE = 0.10          # STEP_UP schedules: installment grows 10% every 12 months
+DEFAULT_CYCLE_DATE = 5       # RepaymentConfig.cycle_date default
+ALL_DAYS = '1111111'         # only Holiday rows move a due date, not weekends
+
+
+class AccountTerms:
+    """Everything the generator needs for one account, resolved from the account and tenant configs."""
+    __slots__ = (
+        'account', 'tenant_id', 'principal', 'annual_rate', 'tenor_months', 'start',
+        'schedule_type', 'frequency', 'cycle_date', 'accrual_method',
+    )
+
+    def __init__(self, account, tenant_id, principal, annual_rate, tenor_months, start,
+                 schedule_type='EMI', frequency='MONTHLY', cycle_date=DEFAULT_CYCLE_DATE, accrual_method='COMPOUND'):
+        self.account = account
+        self.tenant_id = tenant_id
+        self.principal = principal
+        self.annual_rate = annual_rate
+        self.tenor_months = tenor_months
+        self.start = start
+        self.schedule_type = schedule_type
+        self.frequency = frequency
+        self.cycle_date = cycle_date
+        self.accrual_method = accrual_method
+
+    @property
+    def periods(self):
+        if self.frequency == 'MONTHLY':
+            return self.tenor_months
+        return max(1, round(self.tenor_months * PERIODS_PER_YEAR[self.frequency] / 12))
+
+
+# ------------------------------------------------------------------
+# 1. TERMS RESOLUTION (a fixed number of queries per chunk)
+# ------------------------------------------------------------------
+
+def latest_by_tenant(model, tenant_ids):
+    latest = {}
+    for config in model.objects.filter(tenant_id__in=tenant_ids).order_by('tenant_id', '-created_at', '-id'):
+        latest.setdefault(config.tenant_id, config)
+    return latest
+
+
+def resolve_terms(accounts, repayment_config=None, interest_config=None):
+    """
+    Config precedence per account: explicit override, then the tenant loan product with the
+    same name as the application's product, then the tenant's most recent config.
+    Returns (terms, skipped) where skipped lists (account_id, reason).
+    """
+    tenant_ids = {account.loan_application.tenant_id for account in accounts}
+    products = {
+        (product.tenant_id, product.name): product
+        for product in TenantLoanProduct.objects.filter(tenant_id__in=tenant_ids)
+        .select_related('repayment_config', 'interest_config')
+    }
+    latest_repayment = latest_by_tenant(RepaymentConfig, tenant_ids)
+    latest_interest = latest_by_tenant(InterestConfig, tenant_ids)
+
+    terms, skipped = [], []
+    for account in accounts:
+        app = account.loan_application
+        product = products.get((app.tenant_id, app.product.name)) if app.product_id else None
+        repayment = repayment_config or (product and product.repayment_config) or latest_repayment.get(app.tenant_id)
+        interest = interest_config or (product and product.interest_config) or latest_interest.get(app.tenant_id)
+
+        principal = account.outstanding_principal if account.outstanding_principal else app.requested_amount
+        annual_rate = account.interest_rate
+        if annual_rate is None and interest is not None:
+            annual_rate = interest.base_rate
+            if interest.interest_type == 'FLOATING':
+                annual_rate += interest.spread_margin
+        tenor = account.tenor_months or app.requested_tenure
+
+        if not principal or principal <= 0:
+            skipped.append((account.pk, 'no principal'))
+            continue
+        if annual_rate is None:
+            skipped.append((account.pk, 'no interest rate'))
+            continue
+        if not tenor or tenor <= 0:
+            skipped.append((account.pk, 'no tenor'))
+            continue
+
+        terms.append(AccountTerms(
+            account=account,
+            tenant_id=app.tenant_id,
+            principal=principal,
+            annual_rate=annual_rate,
+            tenor_months=tenor,
+            start=(account.disbursed_at or account.created_at).date(),
+            schedule_type=repayment.schedule_type if repayment else 'EMI',
+            frequency=repayment.frequency if repayment else 'MONTHLY',
+            cycle_date=repayment.cycle_date if repayment else DEFAULT_CYCLE_DATE,
+            # "SIMPLE" and "COMPOUND" charge interest on the outstanding principal (SIMPLE never
+            # capitalises unpaid interest); "FLAT" charges it on the original principal every period
+            accrual_method=interest.accrual_method if interest else 'COMPOUND',
+        ))
+    return terms, skipped
+
+
+def load_holidays(tenant_ids):
+    holidays = defaultdict(list)
+    for tenant_id, day in Holiday.objects.filter(tenant_id__in=tenant_ids).values_list('tenant_id', 'date'):
+        holidays[tenant_id].append(day)
+    return {tenant_id: np.array(sorted(days), dtype='datetime64[D]') for tenant_id, days in holidays.items()}
+
+
+# ------------------------------------------------------------------
+# 2. VECTORISED GENERATOR (accounts x periods arrays, amounts in paise)
+# ------------------------------------------------------------------
+
+def _amounts(schedule_type, accrual_method, principal, rate, periods, per_year):
+    """Float principal/interest matrices (rows = accounts, columns = periods), zero past each tenor."""
+    width = int(periods.max())
+    k = np.arange(1, width + 1)[None, :]
+    mask = k <= periods[:, None]
+    P = principal[:, None]
+    i = rate[:, None]
+    last = k == periods[:, None]
+
+    if schedule_type == 'BULLET':
+        interest = P * i * mask
+        principal_part = P * last
+        return principal_part, interest, mask
+
+    if schedule_type == 'STEP_UP':
+        growth = (1 + STEP_UP_RATE) ** ((k - 1) // per_year[:, None])
+    else:
+        growth = np.ones_like(k, dtype=np.float64)
+    growth = growth * mask
+
+    if accrual_method == 'FLAT':
+        # Flat: interest on the original principal every period, principal split by the growth profile
+        interest = P * i * mask
+        principal_part = P * growth / growth.sum(axis=1, keepdims=True)
+        return principal_part, interest, mask
+
+    # Reducing balance: pay_k = A * g_k with A set so the discounted payments equal P
+    safe_i = np.where(i > 0, i, 0.0)
+    discount = (1 + safe_i) ** -k.astype(np.float64)
+    base = P / (growth * discount).sum(axis=1, keepdims=True)
+    payment = base * growth
+
+    if accrual_method == 'SIMPLE':
+        # Interest on the outstanding principal only: when an installment does not cover its
+        # period's interest the interest stays due in full and the principal is not increased
+        balance = principal.astype(np.float64).copy()
+        principal_part = np.zeros_like(payment)
+        interest = np.zeros_like(payment)
+        for col in range(width):
+            interest[:, col] = balance * safe_i[:, 0] * mask[:, col]
+            due = np.clip(payment[:, col] - interest[:, col], 0.0, balance)
+            principal_part[:, col] = np.where(last[:, col], balance, due * mask[:, col])
+            balance = balance - principal_part[:, col]
+        return principal_part, interest, mask
+
+    # Compound: balance_k = (1+i)^k * (P - sum_{j<=k} pay_j (1+i)^-j)
+    balance = (P - np.cumsum(payment * discount, axis=1)) / discount
+    balance = np.where(mask, balance, 0.0)
+    opening = np.concatenate([P, balance[:, :-1]], axis=1)
+    interest = opening * safe_i * mask
+    principal_part = (payment - interest) * mask
+    return principal_part, interest, mask
+
+
+def _due_dates(terms, width, holidays):
+    k = np.arange(1, width + 1)[None, :]
+    start = np.array([t.start for t in terms], dtype='datetime64[D]')[:, None]
+    monthly = np.array([t.frequency == 'MONTHLY' for t in terms])[:, None]
+    step_days = np.array([PERIOD_DAYS.get(t.frequency, 0) for t in terms])[:, None]
+    cycle = np.array([min(max(t.cycle_date, 1), 31) for t in terms])[:, None]
+
+    # Monthly: cycle_date of each following month, clipped to the month's length
+    months = start.astype('datetime64[M]') + k
+    month_start = months.astype('datetime64[D]')
+    month_len = ((months + 1).astype('datetime64[D]') - month_start).astype(np.int64)
+    monthly_due = month_start + (np.minimum(cycle, month_len) - 1)
+    periodic_due = start + k * step_days
+    due = np.where(monthly, monthly_due, periodic_due)
+
+    # Roll due dates that land on a tenant holiday forward to the next non-holiday
+    tenant_rows = defaultdict(list)
+    for row, t in enumerate(terms):
+        tenant_rows[t.tenant_id].append(row)
+    for tenant_id, rows in tenant_rows.items():
+        days = holidays.get(tenant_id)
+        if days is not None and len(days):
+            due[rows] = np.busday_offset(due[rows], 0, roll='forward', weekmask=ALL_DAYS, holidays=days)
+    return due
+
+
+def build_schedules(terms, holidays):
+    """
+    Returns {account pk: [(installment_no, due_date, principal, interest, closing_principal), ...]}
+    with Decimal amounts; principal always sums exactly to the account principal.
+    """
+    schedules = {}
+    groups = defaultdict(list)
+    for t in terms:
+        groups[(t.schedule_type, t.accrual_method)].append(t)
+
+    for (schedule_type, accrual_method), group in groups.items():
+        principal = np.array([int(t.principal * 100) for t in group], dtype=np.float64)
+        per_year = np.array([PERIODS_PER_YEAR[t.frequency] for t in group], dtype=np.int64)
+        rate = np.array([float(t.annual_rate) / 100 for t in group]) / per_year
+        periods = np.array([t.periods for t in group], dtype=np.int64)
+
+        principal_part, interest, mask = _amounts(schedule_type, accrual_method, principal, rate, periods, per_year)
+
+        # Round the installment and its interest to paise and derive the principal from them, so
+        # level installments stay level; the last installment absorbs the rounding so principal reconciles
+        interest_paise = np.rint(interest).astype(np.int64) * mask
+        principal_paise = (np.rint(principal_part + interest).astype(np.int64) - interest_paise) * mask
+        rows = np.arange(len(group))
+        principal_paise[rows, periods - 1] += principal.astype(np.int64) - principal_paise.sum(axis=1)
+        closing_paise = principal.astype(np.int64)[:, None] - np.cumsum(principal_paise, axis=1)
+
+        due = _due_dates(group, principal_paise.shape[1], holidays)
+
+        for row, t in enumerate(group):
+            n = periods[row]
+            schedules[t.account.pk] = [
+                (no + 1, due_date, Decimal(int(p)) / 100, Decimal(int(r)) / 100, Decimal(int(c)) / 100)
+                for no, (due_date, p, r, c) in enumerate(zip(
+                    due[row, :n].tolist(), principal_paise[row, :n], interest_paise[row, :n], closing_paise[row, :n],
+                ))
+            ]
+    return schedules
+
+
+# ------------------------------------------------------------------
+# 3. PERSISTENCE
+# ------------------------------------------------------------------
+
+def generate_schedules(accounts=None, tenant_id=None, regenerate=False, chunk_size=1000,
+                       repayment_config=None, interest_config=None, progress=None):
+    """
+    Builds and bulk-inserts schedules for accounts in keyset chunks.
+    Accounts that already have a schedule are skipped unless regenerate=True; schedules with
+    any payment posted against them are never replaced.
+    """
+    accounts = accounts if accounts is not None else LoanAccount.objects.all()
+    if tenant_id:
+        accounts = accounts.filter(loan_application__tenant_id=tenant_id)
+    has_schedule = Installment.objects.filter(loan_account=OuterRef('pk'))
+    has_payments = has_schedule.filter(
+        Q(principal_paid__gt=0) | Q(interest_paid__gt=0) | Q(fees_paid__gt=0)
+        | Q(charges_paid__gt=0) | Q(penalty_paid__gt=0)
+    )
+    accounts = (
+        accounts.select_related('loan_application__product')
+        .annotate(has_schedule=Exists(has_schedule), has_payments=Exists(has_payments))
+        .order_by('pk')
+    )
+
+    summary = {"accounts": 0, "installments": 0, "skipped_existing": 0, "skipped_paid": 0, "skipped_invalid": 0}
+    last_pk = 0
+    while True:
+        chunk = list(accounts.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+
+        todo = []
+        for account in chunk:
+            if account.has_payments:
+                summary["skipped_paid"] += 1
+            elif account.has_schedule and not regenerate:
+                summary["skipped_existing"] += 1
+            else:
+                todo.append(account)
+
+        terms, skipped = resolve_terms(todo, repayment_config, interest_config)
+        summary["skipped_invalid"] += len(skipped)
+        if terms:
+            schedules = build_schedules(terms, load_holidays({t.tenant_id for t in terms}))
+            _persist(terms, schedules, summary)
+        if progress:
+            progress(summary)
+    return summary
+
+
+@transaction.atomic
+def _persist(terms, schedules, summary):
+    account_ids = [t.account.pk for t in terms]
+    Installment.objects.filter(loan_account_id__in=account_ids).delete()
+    rows = [
+        Installment(
+            loan_account_id=account_id, installment_no=no, due_date=due_date,
+            principal_due=principal, interest_due=interest, closing_principal=closing,
+        )
+        for account_id, schedule in schedules.items()
+        for no, due_date, principal, interest, closing in schedule
+    ]
+    Installment.objects.bulk_create(rows, batch_size=5000)
+
+    # Backfill emi_amount from the first installment where it was never set
+    missing_emi = []
+    for t in terms:
+        if t.account.emi_amount is None:
+            _, _, principal, interest, _ = schedules[t.account.pk][0]
+            t.account.emi_amount = principal + interest
+            missing_emi.append(t.account)
+    if missing_emi:
+        LoanAccount.objects.bulk_update(missing_emi, ['emi_amount'], batch_size=1000)
+
+    summary["accounts"] += len(schedules)
+    summary["installments"] += len(rows)
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tenants.models import Tenant, RepaymentConfig, InterestConfig
+from lms.logic.schedule import generate_schedules
+
+
+class Command(BaseCommand):
+    help = "Generate repayment schedules (installment tables) for loan accounts in bulk"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenant", help="tenant_id (UUID) to process; defaults to all tenants")
+        parser.add_argument("--regenerate", action="store_true", help="replace existing unpaid schedules")
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--repayment-config", type=int, help="RepaymentConfig id to apply to every account")
+        parser.add_argument("--interest-config", type=int, help="InterestConfig id to apply to every account")
+
+    def handle(self, *args, **options):
+        tenant_id = None
+        if options["tenant"]:
+            tenant = Tenant.objects.filter(tenant_id=options["tenant"]).first()
+            if not tenant:
+                raise CommandError(f"Tenant {options['tenant']} not found")
+            tenant_id = tenant.pk
+
+        repayment_config = interest_config = None
+        if options["repayment_config"]:
+            repayment_config = RepaymentConfig.objects.filter(pk=options["repayment_config"]).first()
+            if not repayment_config:
+                raise CommandError(f"RepaymentConfig {options['repayment_config']} not found")
+        if options["interest_config"]:
+            interest_config = InterestConfig.objects.filter(pk=options["interest_config"]).first()
+            if not interest_config:
+                raise CommandError(f"InterestConfig {options['interest_config']} not found")
+
+        def progress(summary):
+            self.stdout.write(f"  {summary['accounts']} accounts, {summary['installments']} installments ...")
+
+        summary = generate_schedules(
+            tenant_id=tenant_id,
+            regenerate=options["regenerate"],
+            chunk_size=options["chunk_size"],
+            repayment_config=repayment_config,
+            interest_config=interest_config,
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {summary['installments']} installments for {summary['accounts']} accounts "
+            f"(skipped: {summary['skipped_existing']} existing, {summary['skipped_paid']} with payments, "
+            f"{summary['skipped_invalid']} missing terms)."
+        ))
@@ -0,0 +1,62 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tenants.models import Tenant
+from lms.logic.ingest import ingest, text_stream, detect_format, PARSERS
+
+
+class Command(BaseCommand):
+    help = "Stream a CSV or fixed-width NACH debit response file into repayments"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="repayment file to ingest")
+        parser.add_argument("--format", choices=sorted(PARSERS), help="defaults to the file extension")
+        parser.add_argument("--tenant", help="tenant_id (UUID); only that tenant's accounts are matched")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument("--rejects", help="write every rejected line to this CSV file")
+
+    def handle(self, *args, **options):
+        tenant_id = None
+        if options["tenant"]:
+            tenant = Tenant.objects.filter(tenant_id=options["tenant"]).first()
+            if not tenant:
+                raise CommandError(f"Tenant {options['tenant']} not found")
+            tenant_id = tenant.pk
+
+        file_format = options["format"] or detect_format(options["path"])
+        reject_file = writer = None
+        if options["rejects"]:
+            reject_file = open(options["rejects"], "w", newline="")
+            writer = csv.writer(reject_file)
+            writer.writerow(["line", "reason", "raw"])
+
+        def on_reject(item):
+            if writer:
+                writer.writerow([item.line_no, item.reason, item.raw])
+
+        def progress(summary):
+            self.stdout.write(
+                f"  {summary['rows']} rows: {summary['posted']} posted, {summary['rejected']} rejected ..."
+            )
+
+        try:
+            with open(options["path"], "rb") as handle:
+                summary = ingest(
+                    text_stream(handle),
+                    file_format=file_format,
+                    tenant_id=tenant_id,
+                    chunk_size=options["chunk_size"],
+                    on_reject=on_reject,
+                    progress=progress,
+                )
+        except FileNotFoundError:
+            raise CommandError(f"File {options['path']} not found")
+        finally:
+            if reject_file:
+                reject_file.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Posted {summary['posted']} repayments ({summary['amount']}) from {summary['rows']} rows; "
+            f"{summary['rejected']} rejected. Allocation: {summary['buckets']}"
+        ))
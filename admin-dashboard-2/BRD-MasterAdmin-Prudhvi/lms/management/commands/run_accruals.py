@@ -0,0 +1,49 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tenants.models import Tenant
+from lms.logic.accrual import run_accruals
+
+
+class Command(BaseCommand):
+    help = "End-of-day interest and penalty accrual for open loan accounts (safe to re-run for a date)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--date", help="business date YYYY-MM-DD; defaults to today")
+        parser.add_argument("--tenant", help="tenant_id (UUID) to process; defaults to all tenants")
+        parser.add_argument("--workers", type=int, default=1, help="processes to spread tenants over")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument("--dry-run", action="store_true", help="compute and report without writing")
+
+    def handle(self, *args, **options):
+        business_date = None
+        if options["date"]:
+            try:
+                business_date = datetime.date.fromisoformat(options["date"])
+            except ValueError:
+                raise CommandError(f"Invalid --date {options['date']}, expected YYYY-MM-DD")
+
+        tenant_ids = None
+        if options["tenant"]:
+            tenant = Tenant.objects.filter(tenant_id=options["tenant"]).first()
+            if not tenant:
+                raise CommandError(f"Tenant {options['tenant']} not found")
+            tenant_ids = [tenant.pk]
+
+        def progress(summary):
+            self.stdout.write(f"  {summary['tenants']} tenants, {summary['accounts']} accounts ...")
+
+        summary = run_accruals(
+            business_date=business_date,
+            tenant_ids=tenant_ids,
+            workers=options["workers"],
+            chunk_size=options["chunk_size"],
+            dry_run=options["dry_run"],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary['business_date']}: {summary['interest_entries']} interest entries ({summary['interest']}), "
+            f"{summary['penalty_entries']} penalty entries ({summary['penalty']}) over {summary['accounts']} accounts; "
+            f"{summary['already_accrued']} accounts already accrued."
+        ))
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0003_alter_collection_options_alter_repayment_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Installment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('installment_no', models.PositiveSmallIntegerField()),
+                ('due_date', models.DateField()),
+                ('principal_due', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('interest_due', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('principal_paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('interest_paid', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('closing_principal', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('loan_account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='installments', to='lms.loanaccount')),
+            ],
+            options={
+                'db_table': 'loan_installments',
+                'ordering': ['loan_account', 'installment_no'],
+                'indexes': [models.Index(fields=['due_date'], name='installment_due_date')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='installment',
+            constraint=models.UniqueConstraint(fields=('loan_account', 'installment_no'), name='uniq_installment_no'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:15
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0004_installment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='installment',
+            name='charges_due',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='installment',
+            name='charges_paid',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='installment',
+            name='fees_due',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='installment',
+            name='fees_paid',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='installment',
+            name='penalty_due',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='installment',
+            name='penalty_paid',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='repayment',
+            name='allocation',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AlterField(
+            model_name='repayment',
+            name='paid_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
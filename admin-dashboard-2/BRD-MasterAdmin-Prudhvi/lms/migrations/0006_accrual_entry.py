@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0005_waterfall_allocation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccrualEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('business_date', models.DateField()),
+                ('entry_type', models.CharField(choices=[('INTEREST', 'Interest'), ('PENALTY', 'Penalty')], max_length=20)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('base_amount', models.DecimalField(decimal_places=2, help_text='Balance the accrual was computed on', max_digits=14)),
+                ('rate', models.DecimalField(decimal_places=4, help_text='Annual % for interest, slab % for penalty', max_digits=7)),
+                ('dpd', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('installment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='accruals', to='lms.installment')),
+                ('loan_account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='accruals', to='lms.loanaccount')),
+            ],
+            options={
+                'db_table': 'loan_accruals',
+                'ordering': ['-business_date', 'loan_account'],
+                'indexes': [models.Index(fields=['business_date', 'entry_type'], name='accrual_date_type')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='accrualentry',
+            constraint=models.UniqueConstraint(fields=('loan_account', 'business_date', 'entry_type'), name='uniq_accrual_per_day'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0016_scorecard_updated_at'),
+        ('lms', '0006_accrual_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetClassSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asset_class', models.CharField(choices=[('STANDARD', 'Standard'), ('SMA_0', 'SMA-0 (1-30 days)'), ('SMA_1', 'SMA-1 (31-60 days)'), ('SMA_2', 'SMA-2 (61-90 days)'), ('NPA', 'NPA (> 90 days)')], max_length=10)),
+                ('accounts', models.IntegerField(default=0)),
+                ('outstanding', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('as_of_date', models.DateField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'loan_asset_class_summary',
+                'ordering': ['tenant', 'branch', 'asset_class'],
+            },
+        ),
+        migrations.AddField(
+            model_name='loanaccount',
+            name='asset_class',
+            field=models.CharField(choices=[('STANDARD', 'Standard'), ('SMA_0', 'SMA-0 (1-30 days)'), ('SMA_1', 'SMA-1 (31-60 days)'), ('SMA_2', 'SMA-2 (61-90 days)'), ('NPA', 'NPA (> 90 days)')], default='STANDARD', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='loanaccount',
+            name='asset_class_since',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='loanaccount',
+            name='dpd',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='loanaccount',
+            index=models.Index(fields=['asset_class', 'dpd'], name='loan_account_asset_class'),
+        ),
+        migrations.AddField(
+            model_name='assetclasssummary',
+            name='branch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='asset_class_summaries', to='tenants.branch'),
+        ),
+        migrations.AddField(
+            model_name='assetclasssummary',
+            name='tenant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='asset_class_summaries', to='tenants.tenant'),
+        ),
+        migrations.AddIndex(
+            model_name='assetclasssummary',
+            index=models.Index(fields=['tenant', 'asset_class'], name='asset_summary_tenant_class'),
+        ),
+    ]
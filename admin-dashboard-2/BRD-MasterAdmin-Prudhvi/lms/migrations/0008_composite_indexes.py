@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lms', '0007_asset_classification'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='repayment',
+            index=models.Index(fields=['loan_account', 'paid_at'], name='repayment_account_paid'),
+        ),
+        migrations.AddIndex(
+            model_name='repayment',
+            index=models.Index(fields=['paid_at'], name='repayment_paid_at'),
+        ),
+    ]
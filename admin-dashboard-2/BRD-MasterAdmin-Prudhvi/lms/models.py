@@ -1,9 +1,19 @@
 # lms/models.py
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 import uuid
 
 class LoanAccount(models.Model):
+    # RBI IRACP buckets by days past due (see lms/logic/classification.py)
+    ASSET_CLASSES = (
+        ('STANDARD', 'Standard'),
+        ('SMA_0', 'SMA-0 (1-30 days)'),
+        ('SMA_1', 'SMA-1 (31-60 days)'),
+        ('SMA_2', 'SMA-2 (61-90 days)'),
+        ('NPA', 'NPA (> 90 days)'),
+    )
+
     account_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     loan_application = models.OneToOneField('los.LoanApplication', on_delete=models.CASCADE, related_name='loan_account')
     outstanding_principal = models.DecimalField(max_digits=14, decimal_places=2, default=0)
@@ -13,9 +23,17 @@ class LoanAccount(models.Model):
     disbursed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Maintained by the classify_accounts batch, not by request handlers
+    dpd = models.IntegerField(default=0)
+    asset_class = models.CharField(max_length=10, choices=ASSET_CLASSES, default='STANDARD')
+    asset_class_since = models.DateField(null=True, blank=True)
+
     class Meta:
         db_table = 'loan_accounts'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['asset_class', 'dpd'], name='loan_account_asset_class'),
+        ]
 
     def __str__(self):
         return str(self.account_id)
@@ -23,12 +41,20 @@ class LoanAccount(models.Model):
 class Repayment(models.Model):
     loan_account = models.ForeignKey(LoanAccount, on_delete=models.CASCADE, related_name='repayments')
     amount = models.DecimalField(max_digits=12, decimal_places=2)
-    paid_at = models.DateTimeField(auto_now_add=True)
+    # Settable so statement imports keep the bank value date (see lms/logic/allocation.py)
+    paid_at = models.DateTimeField(default=timezone.now)
     transaction_reference = models.CharField(max_length=200, blank=True, null=True)
+    # Waterfall split, e.g. {"Penalties": "0.00", "Interest": "812.00", "Principal": "4188.00", "Excess": "0.00"}
+    allocation = models.JSONField(default=dict, blank=True)
 
     class Meta:
         db_table = 'repayments'
         ordering = ['-paid_at']
+        indexes = [
+            models.Index(fields=['loan_account', 'paid_at'], name='repayment_account_paid'),
+            # Date-window exports and the revenue series fallback
+            models.Index(fields=['paid_at'], name='repayment_paid_at'),
+        ]
 
     def __str__(self):
         return f"{self.loan_account} - {self.amount} - {self.paid_at}"
@@ -42,3 +68,88 @@ class Collection(models.Model):
     class Meta:
         db_table = 'collections'
         ordering = ['-collected_at']
+
+
+class Installment(models.Model):
+    """One row of a loan's repayment schedule (see lms/logic/schedule.py)."""
+    loan_account = models.ForeignKey(LoanAccount, on_delete=models.CASCADE, related_name='installments')
+    installment_no = models.PositiveSmallIntegerField()
+    due_date = models.DateField()
+    principal_due = models.DecimalField(max_digits=12, decimal_places=2)
+    interest_due = models.DecimalField(max_digits=12, decimal_places=2)
+    principal_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    interest_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    fees_due = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    fees_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    charges_due = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    charges_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    penalty_due = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    penalty_paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    closing_principal = models.DecimalField(max_digits=14, decimal_places=2)
+
+    class Meta:
+        db_table = 'loan_installments'
+        ordering = ['loan_account', 'installment_no']
+        constraints = [
+            models.UniqueConstraint(fields=['loan_account', 'installment_no'], name='uniq_installment_no'),
+        ]
+        indexes = [
+            models.Index(fields=['due_date'], name='installment_due_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.loan_account} #{self.installment_no} - {self.due_date}"
+
+    @property
+    def total_due(self):
+        return self.principal_due + self.interest_due + self.fees_due + self.charges_due + self.penalty_due
+
+
+class AccrualEntry(models.Model):
+    """Daily interest/penalty accrual posted by the end-of-day job (see lms/logic/accrual.py)."""
+    ENTRY_TYPES = (('INTEREST', 'Interest'), ('PENALTY', 'Penalty'))
+
+    loan_account = models.ForeignKey(LoanAccount, on_delete=models.CASCADE, related_name='accruals')
+    installment = models.ForeignKey(Installment, on_delete=models.SET_NULL, null=True, blank=True, related_name='accruals')
+    business_date = models.DateField()
+    entry_type = models.CharField(max_length=20, choices=ENTRY_TYPES)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    base_amount = models.DecimalField(max_digits=14, decimal_places=2, help_text="Balance the accrual was computed on")
+    rate = models.DecimalField(max_digits=7, decimal_places=4, help_text="Annual % for interest, slab % for penalty")
+    dpd = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'loan_accruals'
+        ordering = ['-business_date', 'loan_account']
+        constraints = [
+            # One entry per account, day and type: re-running a business date is a no-op
+            models.UniqueConstraint(fields=['loan_account', 'business_date', 'entry_type'], name='uniq_accrual_per_day'),
+        ]
+        indexes = [
+            models.Index(fields=['business_date', 'entry_type'], name='accrual_date_type'),
+        ]
+
+    def __str__(self):
+        return f"{self.loan_account} {self.entry_type} {self.business_date} - {self.amount}"
+
+
+class AssetClassSummary(models.Model):
+    """Per tenant/branch bucket totals written by each classification run; the NPA report reads these."""
+    tenant = models.ForeignKey('tenants.Tenant', on_delete=models.CASCADE, related_name='asset_class_summaries')
+    branch = models.ForeignKey('tenants.Branch', on_delete=models.CASCADE, null=True, blank=True, related_name='asset_class_summaries')
+    asset_class = models.CharField(max_length=10, choices=LoanAccount.ASSET_CLASSES)
+    accounts = models.IntegerField(default=0)
+    outstanding = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    as_of_date = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'loan_asset_class_summary'
+        ordering = ['tenant', 'branch', 'asset_class']
+        indexes = [
+            models.Index(fields=['tenant', 'asset_class'], name='asset_summary_tenant_class'),
+        ]
+
+    def __str__(self):
+        return f"{self.tenant_id}/{self.branch_id} {self.asset_class}: {self.accounts}"
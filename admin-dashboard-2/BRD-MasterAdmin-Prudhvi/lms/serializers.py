@@ -1,13 +1,13 @@
 # lms/serializers.py
 from rest_framework import serializers
-from .models import LoanAccount, Repayment, Collection
+from .models import LoanAccount, Repayment, Collection, Installment
 from los.serializers import LoanApplicationSerializer  # optional nested representation if needed
 
 class RepaymentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Repayment
-        fields = ['id', 'loan_account', 'amount', 'paid_at', 'transaction_reference']
-        read_only_fields = ['id', 'paid_at', 'transaction_reference']
+        fields = ['id', 'loan_account', 'amount', 'paid_at', 'transaction_reference', 'allocation']
+        read_only_fields = ['id', 'paid_at', 'transaction_reference', 'allocation']
 
 class CollectionSerializer(serializers.ModelSerializer):
     class Meta:
@@ -15,6 +15,18 @@ class CollectionSerializer(serializers.ModelSerializer):
         fields = ['id', 'loan_account', 'collector', 'amount', 'collected_at']
         read_only_fields = ['id', 'collected_at']
 
+class InstallmentSerializer(serializers.ModelSerializer):
+    total_due = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = Installment
+        fields = [
+            'id', 'installment_no', 'due_date', 'principal_due', 'interest_due',
+            'fees_due', 'charges_due', 'penalty_due', 'total_due',
+            'principal_paid', 'interest_paid', 'fees_paid', 'charges_paid', 'penalty_paid', 'closing_principal',
+        ]
+        read_only_fields = fields
+
 class LoanAccountSerializer(serializers.ModelSerializer):
     repayments = RepaymentSerializer(many=True, read_only=True)
     collections = CollectionSerializer(many=True, read_only=True)
@@ -23,6 +35,7 @@ class LoanAccountSerializer(serializers.ModelSerializer):
         model = LoanAccount
         fields = [
             'id', 'loan_application', 'account_id', 'emi_amount', 'interest_rate',
-            'outstanding_principal', 'disbursed_at', 'tenor_months', 'repayments', 'collections'
+            'outstanding_principal', 'disbursed_at', 'tenor_months', 'dpd', 'asset_class', 'asset_class_since',
+            'repayments', 'collections'
         ]
-        read_only_fields = ['id', 'disbursed_at', 'outstanding_principal']
+        read_only_fields = ['id', 'disbursed_at', 'outstanding_principal', 'dpd', 'asset_class', 'asset_class_since']
@@ -1,3 +1,211 @@
-from django.test import TestCase
+import datetime
+import io
+from decimal import Decimal
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from crm.models import Customer
+from los.models import LoanApplication
+from tenants.models import ChargeConfig, InterestConfig, Tenant
+from .logic.accrual import accrue_tenant
+from .logic.allocation import allocate_payment
+from .logic.ingest import ingest
+from .logic.schedule import AccountTerms, build_schedules
+from .models import AccrualEntry, Installment, LoanAccount, Repayment
+
+D = Decimal
+
+
+def schedule(schedule_type='EMI', accrual_method='SIMPLE', principal=100000, annual_rate=12, tenor=12):
+    terms = AccountTerms(
+        account=SimpleNamespace(pk=1), tenant_id=1, principal=D(principal), annual_rate=D(annual_rate),
+        tenor_months=tenor, start=datetime.date(2024, 1, 10),
+        schedule_type=schedule_type, accrual_method=accrual_method,
+    )
+    return build_schedules([terms], {})[1]
+
+
+def installments(rows):
+    return [principal + interest for _, _, principal, interest, _ in rows]
+
+
+class ScheduleTests(SimpleTestCase):
+
+    def test_emi_golden_values(self):
+        rows = schedule('EMI')
+        self.assertEqual(rows[0], (1, datetime.date(2024, 2, 5), D('7884.88'), D('1000.00'), D('92115.12')))
+        self.assertEqual(rows[-1], (12, datetime.date(2025, 1, 5), D('8796.88'), D('87.97'), D('0.00')))
+        self.assertEqual(set(installments(rows[:-1])), {D('8884.88')})
+        self.assertEqual(sum(row[3] for row in rows), D('6618.53'))
+        # Installments always cover the period's interest, so SIMPLE and COMPOUND agree
+        self.assertEqual(rows, schedule('EMI', 'COMPOUND'))
+
+    def test_step_up_golden_values(self):
+        rows = schedule('STEP_UP', tenor=24)
+        amounts = installments(rows)
+        self.assertEqual(set(amounts[:12]), {D('4495.95')})
+        self.assertEqual(set(amounts[12:23]), {D('4945.55')})
+        self.assertEqual(rows[-1], (24, datetime.date(2026, 1, 5), D('4896.67'), D('48.97'), D('0.00')))
+        self.assertEqual(sum(row[2] for row in rows), D('100000.00'))
+
+    def test_bullet_golden_values(self):
+        rows = schedule('BULLET')
+        self.assertEqual(installments(rows[:-1]), [D('1000.00')] * 11)
+        self.assertEqual(rows[-1], (12, datetime.date(2025, 1, 5), D('100000.00'), D('1000.00'), D('0.00')))
+
+    def test_flat_rate_is_opt_in(self):
+        flat = schedule('EMI', 'FLAT')
+        self.assertEqual(set(row[3] for row in flat), {D('1000.00')})
+        self.assertEqual(flat[0][2], D('8333.33'))
+        self.assertLess(sum(row[3] for row in schedule('EMI')), sum(row[3] for row in flat))
+
+    def test_simple_interest_is_never_capitalised(self):
+        # Early step-up installments below the period's interest: COMPOUND grows the balance, SIMPLE does not
+        simple = schedule('STEP_UP', 'SIMPLE', annual_rate=36, tenor=240)
+        compound = schedule('STEP_UP', 'COMPOUND', annual_rate=36, tenor=240)
+        self.assertGreater(max(row[4] for row in compound), D('100000.00'))
+        self.assertEqual(max(row[4] for row in simple), D('100000.00'))
+        self.assertEqual(simple[0][2:], (D('0.00'), D('3000.00'), D('100000.00')))
+        self.assertEqual(sum(row[2] for row in simple), D('100000.00'))
+
+
+def loan_account(tenant, outstanding=100000, interest_rate=None):
+    app = LoanApplication.objects.create(
+        tenant=tenant, customer=Customer.objects.create(name="Borrower", tenant=tenant),
+        first_name="Test", last_name="User", mobile_no="9999999999", email="test@example.com",
+        dob=datetime.date(1990, 1, 1), pan_number="ABCDE1234F", gender="M",
+        res_address_line1="Line 1", res_city="Pune", res_state="MH", res_pincode="411001",
+        requested_amount=D(outstanding),
+    )
+    return LoanAccount.objects.create(
+        loan_application=app, outstanding_principal=D(outstanding), interest_rate=interest_rate, tenor_months=12,
+        disbursed_at=timezone.make_aware(datetime.datetime(2023, 12, 1)),
+    )
+
+
+class AccrualTests(TestCase):
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        self.account = loan_account(self.tenant, interest_rate=D('0'))
+        # Due 2024-01-05: with the default 3 grace days the first penalised day is DPD 4 (01-09)
+        self.installment = Installment.objects.create(
+            loan_account=self.account, installment_no=1, due_date=datetime.date(2024, 1, 5),
+            principal_due=D('10000'), interest_due=D('1000'), closing_principal=D('90000'),
+        )
+
+    def penalty(self, **fields):
+        ChargeConfig.objects.create(tenant=self.tenant, name="Late fee", category='PENALTY', frequency='ONE_TIME', **fields)
+
+    def accrue(self, day):
+        return accrue_tenant(self.tenant.pk, datetime.date(2024, 1, day))
+
+    def penalties(self):
+        return list(AccrualEntry.objects.filter(entry_type='PENALTY').order_by('business_date').values_list('dpd', 'amount'))
+
+    def test_one_time_penalty_survives_a_missed_threshold_day(self):
+        self.penalty(basis='FIXED', value=D('500'))
+        self.accrue(8)
+        self.assertEqual(self.penalties(), [])
+        # The run for 01-09 never happened: the next run still charges, and only once
+        self.accrue(10)
+        self.accrue(11)
+        self.assertEqual(self.penalties(), [(5, D('500.00'))])
+        self.installment.refresh_from_db()
+        self.assertEqual(self.installment.penalty_due, D('500.00'))
+
+    def test_one_time_slab_penalty_is_charged_once_per_slab(self):
+        self.penalty(basis='SLAB', slab_config={'1-30 days': '2%', '31-60 days': '4%'})
+        for day in (10, 12, 31):
+            self.accrue(day)
+        self.assertEqual(self.penalties(), [(5, D('220.00'))])
+        accrue_tenant(self.tenant.pk, datetime.date(2024, 2, 10))
+        self.assertEqual(self.penalties(), [(5, D('220.00')), (36, D('440.00'))])
+
+    def test_flat_accrual_is_opt_in(self):
+        account = loan_account(self.tenant, outstanding=50000)
+        Installment.objects.create(
+            loan_account=account, installment_no=1, due_date=datetime.date(2024, 6, 5),
+            principal_due=D('100000'), interest_due=D('0'), closing_principal=D('0'),
+        )
+        config = InterestConfig.objects.create(tenant=self.tenant, name="Standard", base_rate=D('36.50'))
+        self.accrue(10)
+        # SIMPLE accrues on the 50,000 outstanding at 0.1% a day
+        self.assertEqual(AccrualEntry.objects.get(loan_account=account).amount, D('50.00'))
+
+        config.accrual_method = 'FLAT'
+        config.save()
+        self.accrue(11)
+        entry = AccrualEntry.objects.get(loan_account=account, business_date=datetime.date(2024, 1, 11))
+        self.assertEqual((entry.base_amount, entry.amount), (D('100000.00'), D('100.00')))
+
+
+class AllocationTests(TestCase):
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        self.account = loan_account(self.tenant, outstanding=20000)
+        for no, due_date in enumerate((datetime.date(2024, 1, 5), datetime.date(2024, 2, 5)), start=1):
+            Installment.objects.create(
+                loan_account=self.account, installment_no=no, due_date=due_date,
+                principal_due=D('10000'), interest_due=D('200'), closing_principal=D(20000 - 10000 * no),
+            )
+
+    def pay(self, amount, day):
+        with self.captureOnCommitCallbacks(execute=True):
+            repayment = allocate_payment(self.account.pk, D(amount), datetime.datetime(2024, 1, day, 12))
+        return {name: D(value) for name, value in repayment.allocation.items() if D(value)}
+
+    def paid(self):
+        return list(Installment.objects.filter(loan_account=self.account).values_list('interest_paid', 'principal_paid'))
+
+    def outstanding(self):
+        self.account.refresh_from_db()
+        return self.account.outstanding_principal
+
+    def test_early_payment_settles_the_next_installment(self):
+        self.assertEqual(self.pay('10200', 1), {'Interest': D('200'), 'Principal': D('10000')})
+        self.assertEqual(self.paid(), [(D('200'), D('10000')), (D('0'), D('0'))])
+        self.assertEqual(self.outstanding(), D('10000.00'))
+
+    def test_partial_payment_follows_the_waterfall(self):
+        self.assertEqual(self.pay('500', 10), {'Interest': D('200'), 'Principal': D('300')})
+        self.assertEqual(self.paid(), [(D('200'), D('300')), (D('0'), D('0'))])
+        self.assertEqual(self.outstanding(), D('19700.00'))
+
+    def test_overpayment_advances_the_schedule_and_keeps_the_rest_as_credit(self):
+        self.assertEqual(self.pay('15000', 10), {'Interest': D('400'), 'Principal': D('14600')})
+        # The overdue installment is cleared first, the rest settles the next one in order
+        self.assertEqual(self.paid(), [(D('200'), D('10000')), (D('200'), D('4600'))])
+        self.assertEqual(self.pay('6000', 11), {'Principal': D('5400'), 'Excess': D('600')})
+        self.assertEqual(self.outstanding(), D('0.00'))
+
+
+class IngestTests(TestCase):
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        self.account = loan_account(self.tenant)
+
+    def ingest(self, *rows):
+        lines = ["account_id,amount,paid_at,utr"] + [f"{self.account.account_id},{row}" for row in rows]
+        with self.captureOnCommitCallbacks(execute=True):
+            return ingest(io.StringIO("\n".join(lines) + "\n"), tenant_id=self.tenant.pk)
+
+    def test_reupload_is_idempotent_with_and_without_references(self):
+        rows = ("1000,2024-01-05,", "1000,2024-01-05,", "2500,2024-01-05,UTR123")
+        summary = self.ingest(*rows)
+        # Two identical reference-less rows are two payments, not a duplicate
+        self.assertEqual((summary["posted"], summary["rejected"]), (3, 0))
+
+        summary = self.ingest(*rows)
+        self.assertEqual((summary["posted"], summary["rejected"]), (0, 3))
+        self.assertEqual(Repayment.objects.count(), 3)
+
+        # A third identical payment in a later file still posts
+        summary = self.ingest(*rows[:1] * 3)
+        self.assertEqual((summary["posted"], summary["rejected"]), (1, 2))
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.outstanding_principal, D('94500.00'))
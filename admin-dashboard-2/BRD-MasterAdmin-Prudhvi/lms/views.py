@@ -5,10 +5,18 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
+from rest_framework.parsers import MultiPartParser
 
 from .models import LoanAccount, Repayment, Collection
-from .serializers import LoanAccountSerializer, RepaymentSerializer, CollectionSerializer
+from .serializers import LoanAccountSerializer, RepaymentSerializer, CollectionSerializer, InstallmentSerializer
+from .logic.schedule import generate_schedules
+from .logic.allocation import Payment, PaymentError, allocate_bulk, allocate_payment
+from .logic.ingest import ingest as ingest_repayments, text_stream, detect_format, PARSERS
+from django.utils.dateparse import parse_datetime
 from .permissions import IsTenantMember
+from brd_platform.pagination import (
+    CreatedAtCursorPagination, PaidAtCursorPagination, CollectedAtCursorPagination,
+)
 
 class LoanAccountViewSet(viewsets.ModelViewSet):
     queryset = LoanAccount.objects.all().select_related('loan_application')
@@ -17,7 +25,9 @@ class LoanAccountViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['loan_application', 'account_id']
     search_fields = ['account_id', 'loan_application__application_id']
-    ordering = ['-disbursed_at']
+    # disbursed_at is nullable, so keyset pagination runs on (created_at, id)
+    ordering = ['-created_at', '-id']
+    pagination_class = CreatedAtCursorPagination
 
     @action(detail=True, methods=['post'], url_path='disburse')
     def disburse(self, request, pk=None):
@@ -33,6 +43,20 @@ class LoanAccountViewSet(viewsets.ModelViewSet):
         la.save()
         return Response(self.get_serializer(la).data)
 
+    @action(detail=True, methods=['get'], url_path='schedule')
+    def schedule(self, request, pk=None):
+        la = self.get_object()
+        return Response(InstallmentSerializer(la.installments.all(), many=True).data)
+
+    @action(detail=True, methods=['post'], url_path='generate-schedule')
+    def generate_schedule(self, request, pk=None):
+        la = self.get_object()
+        regenerate = str(request.data.get('regenerate', '')).lower() in ('1', 'true')
+        summary = generate_schedules(LoanAccount.objects.filter(pk=la.pk), regenerate=regenerate)
+        if not summary['accounts']:
+            return Response({'detail': 'Schedule not generated', **summary}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(InstallmentSerializer(la.installments.all(), many=True).data)
+
 class RepaymentViewSet(viewsets.ModelViewSet):
     queryset = Repayment.objects.all().select_related('loan_account')
     serializer_class = RepaymentSerializer
@@ -40,22 +64,79 @@ class RepaymentViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['loan_account']
     ordering = ['-paid_at']
+    pagination_class = PaidAtCursorPagination
 
     def create(self, request, *args, **kwargs):
-        # create repayment and optionally update outstanding principal on LoanAccount
-        resp = super().create(request, *args, **kwargs)
-        # optionally: adjust outstanding
+        # Allocate through the waterfall engine; it also moves outstanding_principal
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        loan_account = serializer.validated_data['loan_account']
+        self.check_object_permissions(request, loan_account)
+        try:
+            repayment = allocate_payment(loan_account.pk, serializer.validated_data['amount'])
+        except PaymentError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(repayment).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='bulk-allocate')
+    def bulk_allocate(self, request):
+        """
+        Allocates a batch of payments in one transaction.
+        Body: {"payments": [{"loan_account": 1, "amount": "5000.00", "paid_at": "...", "transaction_reference": "..."}]}
+        """
+        rows = request.data.get('payments')
+        if not isinstance(rows, list) or not rows:
+            return Response({'detail': 'payments must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
         try:
-            loan_account_id = resp.data.get('loan_account')
-            amount = float(resp.data.get('amount', 0))
-            if loan_account_id:
-                la = LoanAccount.objects.get(id=loan_account_id)
-                if la.outstanding_principal is not None:
-                    la.outstanding_principal = la.outstanding_principal - amount
-                    la.save()
-        except Exception:
-            pass
-        return resp
+            payments = [
+                Payment(
+                    loan_account_id=int(row['loan_account']),
+                    amount=row['amount'],
+                    paid_at=parse_datetime(row['paid_at']) if row.get('paid_at') else None,
+                    reference=row.get('transaction_reference'),
+                )
+                for row in rows
+            ]
+        except (KeyError, TypeError, ValueError, ArithmeticError) as exc:
+            return Response({'detail': f'Invalid payment row: {exc}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not request.user.is_superuser:
+            account_ids = {p.loan_account_id for p in payments}
+            allowed = set(
+                LoanAccount.objects.filter(pk__in=account_ids, loan_application__tenant_id=request.user.tenant_id)
+                .values_list('pk', flat=True)
+            )
+            if account_ids - allowed:
+                return Response(
+                    {'detail': 'Loan accounts outside your tenant', 'loan_accounts': sorted(account_ids - allowed)},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+
+        try:
+            summary = allocate_bulk(payments)
+        except PaymentError as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        summary['repayments'] = [r.pk for r in summary['repayments']]
+        return Response(summary, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='ingest', parser_classes=[MultiPartParser])
+    def ingest(self, request):
+        """
+        Streams an uploaded CSV / NACH response file into repayments.
+        Form fields: file, format (csv|nach, optional - taken from the extension).
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'detail': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = request.data.get('format') or detect_format(upload.name)
+        if file_format not in PARSERS:
+            return Response({'detail': f'format must be one of {sorted(PARSERS)}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        tenant_id = None if request.user.is_superuser else request.user.tenant_id
+        if not request.user.is_superuser and not tenant_id:
+            return Response({'detail': 'User is not linked to a tenant'}, status=status.HTTP_403_FORBIDDEN)
+        summary = ingest_repayments(text_stream(upload.file), file_format=file_format, tenant_id=tenant_id)
+        return Response(summary, status=status.HTTP_201_CREATED)
 
 class CollectionViewSet(viewsets.ModelViewSet):
     queryset = Collection.objects.all().select_related('loan_account', 'collector')
@@ -64,3 +145,4 @@ class CollectionViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['loan_account', 'collector']
     ordering = ['-collected_at']
+    pagination_class = CollectedAtCursorPagination
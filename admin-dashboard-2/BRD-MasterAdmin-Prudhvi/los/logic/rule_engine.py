@@ -1,35 +1,82 @@
-from decimal import Decimal
-
-class RuleEngine:
-    def __init__(self, application):
-        self.app = application
-        self.product_config = application.product.configuration if application.product else {}
-        self.constraints = self.product_config.get('constraints', {})
-        self.interest_config = self.product_config.get('interest_config', {})
-
-    def execute_knockout_checks(self):
-        results = { "is_eligible": True, "rejection_reason": None, "flags": {} }
-
-        # Age Check
-        if self.app.dob:
-            age = (self.app.created_at.date() - self.app.dob).days // 365
-            min_age = self.constraints.get('min_age', 21)
-            max_age = self.constraints.get('max_age', 60)
-            if not (min_age <= age <= max_age):
-                results['is_eligible'] = False
-                results['rejection_reason'] = f"Age {age} Invalid"
-
-        self.app.is_geo_limit_passed = True # Mocking Geo Pass
-        self.app.save()
-        return results
-
-    def calculate_underwriting_metrics(self):
-        # Mock Logic for Phase 5
-        self.app.net_cash_flow = self.app.monthly_income * Decimal('0.40')
-        self.app.foir_percentage = Decimal('45.00')
-        self.app.save()
-        return {
-            "net_cash_flow": self.app.net_cash_flow,
-            "foir": self.app.foir_percentage,
-            "system_decision": "APPROVE"
-        }
\ No newline at end of file
+from decimal import Decimal, ROUND_HALF_UP
+
+from tenants.models import RiskRule
+
+# Shared with los/logic/batch_underwriting.py: both engines take their limits from
+# latest_risk_rules() and word rejections with rejection_message()
+DEFAULT_MIN_AGE = 21
+DEFAULT_MAX_AGE = 60
+CASH_FLOW_RATIO = Decimal('0.40')   # share of monthly income treated as net cash flow
+DEFAULT_FOIR = Decimal('45.00')     # mock FOIR until bureau obligations are wired in
+PAISE = Decimal('0.01')
+
+
+def latest_risk_rules(tenant_ids):
+    """{tenant_id: RiskRule}: the most recent rule of each tenant is the one that applies."""
+    rules = {}
+    for rule in RiskRule.objects.filter(tenant_id__in=tenant_ids).order_by('tenant_id', '-created_at', '-id'):
+        rules.setdefault(rule.tenant_id, rule)
+    return rules
+
+
+def net_cash_flow(monthly_income):
+    return ((monthly_income or Decimal('0')) * CASH_FLOW_RATIO).quantize(PAISE, rounding=ROUND_HALF_UP)
+
+
+def rejection_message(code, app, age=None):
+    return {
+        'age': f"Age {age} Invalid",
+        'income_type': f"Income type {app.income_type} not allowed",
+        'min_salary': "Monthly income below minimum",
+        'min_cash_flow': "Net cash flow below minimum",
+        'max_foir': f"FOIR {DEFAULT_FOIR} above maximum",
+    }[code]
+
+
+class RuleEngine:
+    def __init__(self, application):
+        self.app = application
+        self.rule = latest_risk_rules([application.tenant_id]).get(application.tenant_id)
+
+    def execute_knockout_checks(self):
+        results = { "is_eligible": True, "rejection_reason": None, "flags": {} }
+
+        # Age Check
+        if self.app.dob:
+            age = (self.app.created_at.date() - self.app.dob).days // 365
+            min_age = self.rule.min_age if self.rule else DEFAULT_MIN_AGE
+            max_age = self.rule.max_age if self.rule else DEFAULT_MAX_AGE
+            if not (min_age <= age <= max_age):
+                results['is_eligible'] = False
+                results['rejection_reason'] = rejection_message('age', self.app, age)
+
+        # Income Type Check
+        allowed = self.rule.allowed_income_types if self.rule else None
+        if results['is_eligible'] and allowed and (self.app.income_type or '') not in allowed:
+            results['is_eligible'] = False
+            results['rejection_reason'] = rejection_message('income_type', self.app)
+
+        self.app.is_geo_limit_passed = True # Mocking Geo Pass
+        self.app.save()
+        return results
+
+    def calculate_underwriting_metrics(self):
+        # Mock Logic for Phase 5
+        self.app.net_cash_flow = net_cash_flow(self.app.monthly_income)
+        self.app.foir_percentage = DEFAULT_FOIR
+        self.app.save()
+
+        failed = None
+        if self.rule:
+            if (self.app.monthly_income or 0) < self.rule.min_salary:
+                failed = 'min_salary'
+            elif self.app.net_cash_flow < self.rule.min_cash_flow:
+                failed = 'min_cash_flow'
+            elif self.app.foir_percentage > self.rule.max_foir:
+                failed = 'max_foir'
+        return {
+            "net_cash_flow": self.app.net_cash_flow,
+            "foir": self.app.foir_percentage,
+            "system_decision": "REJECT" if failed else "APPROVE",
+            "rejection_reason": rejection_message(failed, self.app) if failed else None,
+        }
@@ -0,0 +1,291 @@
+# los/logic/scorecard.py
+import operator
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+
+# rules_config entry: {"criterion": "CIBIL", "condition": ">750", "impact": "Positive", "weight": "High"}
+
+# Criterion name (case-insensitive) -> feature key produced by application_features()
+CRITERIA = {
+    'CIBIL': 'cibil_score',
+    'CIBIL_SCORE': 'cibil_score',
+    'CREDIT_SCORE': 'cibil_score',
+    'AGE': 'age',
+    'INCOME': 'monthly_income',
+    'MONTHLY_INCOME': 'monthly_income',
+    'SALARY': 'monthly_income',
+    'FOIR': 'foir_percentage',
+    'CASH_FLOW': 'net_cash_flow',
+    'NET_CASH_FLOW': 'net_cash_flow',
+    'AMOUNT': 'requested_amount',
+    'LOAN_AMOUNT': 'requested_amount',
+    'TENURE': 'requested_tenure',
+    'INCOME_TYPE': 'income_type',
+    'EMPLOYMENT': 'income_type',
+}
+NUMERIC_FEATURES = (
+    'cibil_score', 'age', 'monthly_income', 'foir_percentage', 'net_cash_flow',
+    'requested_amount', 'requested_tenure',
+)
+TEXT_FEATURES = ('income_type',)
+
+IMPACTS = {'POSITIVE': 1, 'NEGATIVE': -1, 'NEUTRAL': 0}
+WEIGHTS = {'HIGH': 3, 'MEDIUM': 2, 'LOW': 1}
+
+COMPARATORS = {
+    '>=': (operator.ge, np.greater_equal),
+    '<=': (operator.le, np.less_equal),
+    '!=': (operator.ne, np.not_equal),
+    '==': (operator.eq, np.equal),
+    '>': (operator.gt, np.greater),
+    '<': (operator.lt, np.less),
+    '=': (operator.eq, np.equal),
+}
+COMPARISON_RE = re.compile(r'^\s*(>=|<=|!=|==|>|<|=)\s*(-?\d+(?:\.\d+)?)\s*%?\s*$')
+RANGE_RE = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*(?:-|to)\s*(-?\d+(?:\.\d+)?)\s*%?\s*$', re.IGNORECASE)
+
+
+class ScoreCardConfigError(ValueError):
+    pass
+
+
+class CompiledRule:
+    """One rules_config entry reduced to (feature, predicate, points)."""
+    __slots__ = ('index', 'feature', 'label', 'points', 'test', 'vector_test')
+
+    def __init__(self, index, feature, label, points, test, vector_test):
+        self.index = index
+        self.feature = feature
+        self.label = label
+        self.points = points
+        self.test = test
+        self.vector_test = vector_test
+
+
+def _points(rule):
+    impact = str(rule.get('impact', 'Positive')).strip().upper()
+    if impact not in IMPACTS:
+        raise ScoreCardConfigError(f"Unknown impact '{rule.get('impact')}'")
+    weight = rule.get('weight', 'Medium')
+    if isinstance(weight, (int, float)):
+        weight_value = float(weight)
+    elif str(weight).strip().upper() in WEIGHTS:
+        weight_value = WEIGHTS[str(weight).strip().upper()]
+    else:
+        try:
+            weight_value = float(weight)
+        except (TypeError, ValueError):
+            raise ScoreCardConfigError(f"Unknown weight '{weight}'")
+    return float(IMPACTS[impact] * weight_value)
+
+
+def compile_rule(index, rule):
+    if not isinstance(rule, dict):
+        raise ScoreCardConfigError(f"Rule {index + 1} must be an object")
+    criterion = str(rule.get('criterion', '')).strip()
+    feature = CRITERIA.get(criterion.upper().replace(' ', '_'))
+    if feature is None:
+        raise ScoreCardConfigError(f"Rule {index + 1}: unknown criterion '{criterion}'")
+    condition = str(rule.get('condition', '')).strip()
+    label = f"{criterion} {condition}"
+    points = _points(rule)
+
+    if feature in TEXT_FEATURES:
+        negate = condition.startswith('!=')
+        values = condition.removeprefix('!=') if negate else condition.removeprefix('==').removeprefix('=')
+        wanted = {v.strip().lower() for v in values.split(',') if v.strip()}
+        if not wanted:
+            raise ScoreCardConfigError(f"Rule {index + 1}: empty condition")
+
+        def test(value):
+            return (str(value or '').lower() in wanted) != negate
+
+        def vector_test(column):
+            return np.isin(np.char.lower(column.astype(str)), list(wanted)) != negate
+
+        return CompiledRule(index, feature, label, points, test, vector_test)
+
+    match = COMPARISON_RE.match(condition)
+    if match:
+        scalar_op, vector_op = COMPARATORS[match.group(1)]
+        threshold = float(match.group(2))
+
+        def test(value):
+            return value is not None and scalar_op(value, threshold)
+
+        def vector_test(column):
+            # NaN (missing value) never satisfies a comparison; != is guarded explicitly
+            return vector_op(column, threshold) & ~np.isnan(column)
+
+        return CompiledRule(index, feature, label, points, test, vector_test)
+
+    match = RANGE_RE.match(condition)
+    if match:
+        low, high = sorted((float(match.group(1)), float(match.group(2))))
+
+        def test(value):
+            return value is not None and low <= value <= high
+
+        def vector_test(column):
+            return (column >= low) & (column <= high)
+
+        return CompiledRule(index, feature, label, points, test, vector_test)
+
+    raise ScoreCardConfigError(f"Rule {index + 1}: cannot parse condition '{condition}'")
+
+
+class CompiledScoreCard:
+    """
+    Predicate/weight table for one ScoreCard version.
+    score() handles a single feature dict; score_columns() scores a batch column-wise.
+    """
+
+    def __init__(self, scorecard_id, version, rules_config):
+        self.scorecard_id = scorecard_id
+        self.version = version
+        self.rules = tuple(compile_rule(i, rule) for i, rule in enumerate(rules_config or []))
+        self.features = tuple(sorted({rule.feature for rule in self.rules}))
+        self.max_score = sum(rule.points for rule in self.rules if rule.points > 0)
+        self.min_score = sum(rule.points for rule in self.rules if rule.points < 0)
+
+    def score(self, features):
+        total = 0.0
+        matched = []
+        for rule in self.rules:
+            if rule.test(features.get(rule.feature)):
+                total += rule.points
+                matched.append(rule.label)
+        return {
+            "score": total,
+            "max_score": self.max_score,
+            "min_score": self.min_score,
+            "matched": matched,
+        }
+
+    def score_columns(self, columns, size):
+        """columns: feature -> numpy array (float64 with NaN for missing, object for text)."""
+        totals = np.zeros(size, dtype=np.float64)
+        for rule in self.rules:
+            totals += rule.points * rule.vector_test(columns[rule.feature])
+        return totals
+
+
+def compile_rules_config(rules_config):
+    """Validates a rules_config payload; raises ScoreCardConfigError on the first bad rule."""
+    return CompiledScoreCard(None, None, rules_config)
+
+
+# --- Process-local LRU cache keyed by scorecard id, invalidated by updated_at ---
+
+CACHE_SIZE = getattr(settings, 'SCORECARD_CACHE_SIZE', 256)
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_compiled(scorecard):
+    version = scorecard.updated_at
+    with _lock:
+        entry = _cache.get(scorecard.pk)
+        if entry is not None and entry.version == version:
+            _cache.move_to_end(scorecard.pk)
+            return entry
+    compiled = CompiledScoreCard(scorecard.pk, version, scorecard.rules_config)
+    with _lock:
+        _cache[scorecard.pk] = compiled
+        _cache.move_to_end(scorecard.pk)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def clear_cache():
+    with _lock:
+        _cache.clear()
+
+
+# --- Feature extraction ---
+
+def _number(value):
+    return float(value) if value is not None else None
+
+
+def application_features(application):
+    """Feature dict for one LoanApplication (credit_assessment should be select_related)."""
+    assessment = getattr(application, 'credit_assessment', None)
+    age = None
+    if application.dob and application.created_at:
+        age = (application.created_at.date() - application.dob).days // 365
+    return {
+        'cibil_score': _number(assessment.cibil_score) if assessment else None,
+        'age': age,
+        'monthly_income': _number(application.monthly_income),
+        'foir_percentage': _number(application.foir_percentage),
+        'net_cash_flow': _number(application.net_cash_flow),
+        'requested_amount': _number(application.requested_amount),
+        'requested_tenure': _number(application.requested_tenure),
+        'income_type': application.income_type,
+    }
+
+
+def queryset_columns(queryset):
+    """Reads the scoring features for a queryset in one query, as numpy columns."""
+    rows = list(queryset.values_list(
+        'id', 'credit_assessment__cibil_score', 'dob', 'created_at', 'monthly_income',
+        'foir_percentage', 'net_cash_flow', 'requested_amount', 'requested_tenure', 'income_type',
+    ))
+    size = len(rows)
+    if not size:
+        return [], {}, 0
+    ids, cibil, dob, created, income, foir, cash_flow, amount, tenure, income_type = zip(*rows)
+
+    def numeric(values):
+        return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+
+    has_dob = np.array([d is not None for d in dob])
+    dob_days = np.array([d or c.date() for d, c in zip(dob, created)], dtype='datetime64[D]')
+    created_days = np.array([c.date() for c in created], dtype='datetime64[D]')
+    age = ((created_days - dob_days).astype(np.int64) // 365).astype(np.float64)
+    age[~has_dob] = np.nan
+
+    columns = {
+        'cibil_score': numeric(cibil),
+        'age': age,
+        'monthly_income': numeric(income),
+        'foir_percentage': numeric(foir),
+        'net_cash_flow': numeric(cash_flow),
+        'requested_amount': numeric(amount),
+        'requested_tenure': numeric(tenure),
+        'income_type': np.array([v or '' for v in income_type], dtype=object),
+    }
+    return list(ids), columns, size
+
+
+def score_application(scorecard, application):
+    return get_compiled(scorecard).score(application_features(application))
+
+
+def score_queryset(scorecard, queryset):
+    """Returns {application pk: score} for every application in the queryset."""
+    ids, columns, size = queryset_columns(queryset)
+    if not size:
+        return {}
+    totals = get_compiled(scorecard).score_columns(columns, size)
+    return dict(zip(ids, totals.tolist()))
+
+
+def pick_scorecard(application, scorecard_id=None):
+    """Explicit id, else the tenant scorecard whose template matches the income type, else the latest."""
+    from tenants.models import ScoreCard
+
+    scorecards = ScoreCard.objects.filter(tenant_id=application.tenant_id)
+    if scorecard_id:
+        return scorecards.filter(pk=scorecard_id).first()
+    template = 'BUSINESS' if application.income_type == 'Self-Employed' else 'SALARIED'
+    return (
+        scorecards.filter(template_type=template).order_by('-updated_at').first()
+        or scorecards.order_by('-updated_at').first()
+    )
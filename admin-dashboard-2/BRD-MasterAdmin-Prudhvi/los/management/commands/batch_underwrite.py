@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tenants.models import Tenant
+from los.logic.batch_underwriting import BatchUnderwritingEngine
+
+
+class Command(BaseCommand):
+    help = "Re-underwrite loan applications in bulk (age, income type, salary, cash flow and FOIR checks)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenant", help="tenant_id (UUID) to process; defaults to all tenants")
+        parser.add_argument("--status", default="KNOCKOUT_PENDING", help="application status to pick up")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument("--limit", type=int, help="stop after this many applications")
+        parser.add_argument("--dry-run", action="store_true", help="evaluate without writing")
+
+    def handle(self, *args, **options):
+        tenant_id = None
+        if options["tenant"]:
+            tenant = Tenant.objects.filter(tenant_id=options["tenant"]).first()
+            if not tenant:
+                raise CommandError(f"Tenant {options['tenant']} not found")
+            tenant_id = tenant.pk
+
+        engine = BatchUnderwritingEngine(
+            tenant_id=tenant_id,
+            status=options["status"],
+            chunk_size=options["chunk_size"],
+            dry_run=options["dry_run"],
+        )
+
+        def progress(summary):
+            self.stdout.write(f"  processed {summary['processed']} ...")
+
+        summary = engine.run(limit=options["limit"], progress=progress)
+        prefix = "[dry-run] " if options["dry_run"] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Processed {summary['processed']} applications: "
+            f"{summary['underwriting']} to underwriting, {summary['rejected']} rejected {summary['reasons']}"
+        ))
@@ -0,0 +1,82 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from tenants.models import ScoreCard
+from los.models import LoanApplication
+from los.logic.scorecard import get_compiled, score_queryset
+
+DEFAULT_RULES = [
+    {"criterion": "CIBIL", "condition": ">750", "impact": "Positive", "weight": "High"},
+    {"criterion": "CIBIL", "condition": "<650", "impact": "Negative", "weight": "High"},
+    {"criterion": "FOIR", "condition": ">50", "impact": "Negative", "weight": "Medium"},
+    {"criterion": "Income", "condition": ">=50000", "impact": "Positive", "weight": "Medium"},
+    {"criterion": "Age", "condition": "25-45", "impact": "Positive", "weight": "Low"},
+    {"criterion": "Income Type", "condition": "Salaried", "impact": "Positive", "weight": "Low"},
+]
+
+
+class Command(BaseCommand):
+    help = "Measure scorecard evaluation throughput (single-threaded, i.e. per core)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scorecard", type=int, help="ScoreCard id; defaults to a built-in sample config")
+        parser.add_argument("--rows", type=int, default=100000, help="synthetic applications to score")
+        parser.add_argument("--db", action="store_true", help="also score the real loan applications table")
+
+    def handle(self, *args, **options):
+        if options["scorecard"]:
+            scorecard = ScoreCard.objects.filter(pk=options["scorecard"]).first()
+            if not scorecard:
+                raise CommandError(f"ScoreCard {options['scorecard']} not found")
+        else:
+            scorecard = ScoreCard(pk=0, name="benchmark", rules_config=DEFAULT_RULES)
+
+        started = time.perf_counter()
+        compiled = get_compiled(scorecard)
+        compile_us = (time.perf_counter() - started) * 1e6
+        self.stdout.write(f"Compiled {len(compiled.rules)} rules in {compile_us:.1f} us")
+
+        rows = options["rows"]
+        rng = np.random.default_rng(7)
+        columns = {
+            'cibil_score': rng.integers(300, 900, rows).astype(np.float64),
+            'age': rng.integers(21, 60, rows).astype(np.float64),
+            'monthly_income': rng.integers(10000, 200000, rows).astype(np.float64),
+            'foir_percentage': rng.uniform(10, 70, rows),
+            'net_cash_flow': rng.uniform(4000, 80000, rows),
+            'requested_amount': rng.integers(10000, 2000000, rows).astype(np.float64),
+            'requested_tenure': rng.integers(6, 60, rows).astype(np.float64),
+            'income_type': rng.choice(np.array(['Salaried', 'Self-Employed'], dtype=object), rows),
+        }
+
+        # Single-application path: dict in, score out
+        sample = min(rows, 20000)
+        feature_rows = [{key: column[i] for key, column in columns.items()} for i in range(sample)]
+        started = time.perf_counter()
+        for features in feature_rows:
+            compiled.score(features)
+        single = time.perf_counter() - started
+        self.stdout.write(
+            f"Single: {single / sample * 1e6:.2f} us/application ({sample / single:,.0f} applications/s per core)"
+        )
+
+        # Batch path: column-wise over the whole array
+        started = time.perf_counter()
+        compiled.score_columns(columns, rows)
+        batch = time.perf_counter() - started
+        self.stdout.write(
+            f"Batch:  {batch / rows * 1e6:.3f} us/application ({rows / batch:,.0f} applications/s per core)"
+        )
+
+        if options["db"]:
+            queryset = LoanApplication.objects.all()
+            if scorecard.tenant_id:
+                queryset = queryset.filter(tenant_id=scorecard.tenant_id)
+            started = time.perf_counter()
+            scores = score_queryset(scorecard, queryset)
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"DB:     {len(scores)} applications in {elapsed * 1000:.1f} ms (including the query)")
+
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('los', '0005_rename_approved_limit_creditassessment_approved_amount_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['tenant', 'status', 'updated_at'], name='loan_app_tenant_status_upd'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['tenant', '-created_at'], name='loan_app_tenant_created'),
+        ),
+        migrations.AddIndex(
+            model_name='loanapplication',
+            index=models.Index(fields=['branch', 'status'], name='loan_app_branch_status'),
+        ),
+    ]
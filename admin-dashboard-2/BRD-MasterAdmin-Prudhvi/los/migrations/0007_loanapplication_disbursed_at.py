@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:01
+
+from django.db import migrations, models
+
+
+def backfill_disbursed_at(apps, schema_editor):
+    # Best record available for rows disbursed before the field existed
+    LoanApplication = apps.get_model('los', 'LoanApplication')
+    LoanApplication.objects.filter(status='DISBURSED', disbursed_at__isnull=True).update(
+        disbursed_at=models.F('updated_at'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('los', '0006_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loanapplication',
+            name='disbursed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_disbursed_at, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 import uuid
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 # Ensure this import is correct. If you are using TenantLoanProduct, change this import.
 from adminpanel.models import LoanProduct 
 
@@ -93,6 +94,8 @@ class LoanApplication(models.Model):
     is_agreement_signed = models.BooleanField(default=False)
 
     status = models.CharField(max_length=30, choices=STATUS_CHOICES, default='NEW')
+    # Set when status becomes DISBURSED (see save); reports date disbursements by it
+    disbursed_at = models.DateTimeField(null=True, blank=True)
     remarks = models.TextField(null=True, blank=True) 
     
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='applications')
@@ -102,6 +105,24 @@ class LoanApplication(models.Model):
     class Meta:
         db_table = 'loan_applications'
         ordering = ['-created_at']
+        indexes = [
+            # Reports/rollups: disbursed (or any status) per tenant in a date window
+            models.Index(fields=['tenant', 'status', 'updated_at'], name='loan_app_tenant_status_upd'),
+            # Tenant-scoped application lists (default ordering)
+            models.Index(fields=['tenant', '-created_at'], name='loan_app_tenant_created'),
+            models.Index(fields=['branch', 'status'], name='loan_app_branch_status'),
+        ]
+
+    def save(self, *args, **kwargs):
+        disbursed_at = self.disbursed_at
+        if self.status == 'DISBURSED' and self.disbursed_at is None:
+            self.disbursed_at = timezone.now()
+        elif self.status != 'DISBURSED':
+            self.disbursed_at = None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and self.disbursed_at != disbursed_at:
+            kwargs['update_fields'] = {*update_fields, 'disbursed_at'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.application_id} - {self.first_name} {self.last_name}"
@@ -1,17 +1,57 @@
+import re
+
 from rest_framework import serializers
 from .models import LoanApplication, KYCDetail, CreditAssessment
+from brd_platform.serializers import SparseFieldsMixin
+from tenants.logic.rule_config import rules_for
+
+PAN_RE = re.compile(r'^[A-Z]{5}[0-9]{4}[A-Z]$')
+AADHAAR_RE = re.compile(r'^[2-9][0-9]{11}$')
+
+
+def check_identity(rules, pan=None, aadhaar=None):
+    """Format errors for the identity numbers the tenant's validation rules cover."""
+    errors = {}
+    if pan and rules.validation.pan_format and not PAN_RE.match(pan.upper()):
+        errors['pan'] = "Invalid PAN format"
+    if aadhaar and rules.validation.aadhaar_format and not AADHAAR_RE.match(aadhaar):
+        errors['aadhaar'] = "Invalid Aadhaar number"
+    return errors
+
 
 class KYCDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = KYCDetail
         fields = '__all__'
 
+    def validate(self, attrs):
+        application = attrs.get('loan_application') or getattr(self.instance, 'loan_application', None)
+        if application is None:
+            return attrs
+        rules = rules_for(application.tenant_id)
+
+        document = attrs.get('document_file')
+        if document and document.size > rules.upload_limit_bytes:
+            raise serializers.ValidationError(
+                {'document_file': f"File exceeds the {rules.workflow.upload_limit_mb} MB upload limit"})
+
+        number = attrs.get('document_number')
+        kyc_type = attrs.get('kyc_type') or getattr(self.instance, 'kyc_type', None)
+        errors = check_identity(
+            rules,
+            pan=number if kyc_type == 'PAN' else None,
+            aadhaar=number if kyc_type == 'AADHAAR' else None,
+        )
+        if errors:
+            raise serializers.ValidationError({'document_number': next(iter(errors.values()))})
+        return attrs
+
 class CreditAssessmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = CreditAssessment
         fields = '__all__'
 
-class LoanApplicationSerializer(serializers.ModelSerializer):
+class LoanApplicationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     # Read-only fields for UI display
     tenant_name = serializers.CharField(source='tenant.name', read_only=True)
     customer_name = serializers.CharField(source='customer.first_name', read_only=True)
@@ -27,4 +67,65 @@ class LoanApplicationSerializer(serializers.ModelSerializer):
         read_only_fields = [
             'application_id', 'created_at', 'updated_at', 'created_by', 'tenant', 
             'foir_percentage', 'net_cash_flow', 'is_geo_limit_passed'
-        ]
\ No newline at end of file
+        ]
+
+    def validate(self, attrs):
+        tenant_id = getattr(self.instance, 'tenant_id', None)
+        if tenant_id is None and 'request' in self.context:
+            tenant_id = getattr(self.context['request'].user, 'tenant_id', None)
+        rules = rules_for(tenant_id)
+
+        errors = {}
+        identity = check_identity(rules, pan=attrs.get('pan_number'), aadhaar=attrs.get('aadhaar_number'))
+        if 'pan' in identity:
+            errors['pan_number'] = identity['pan']
+        if 'aadhaar' in identity:
+            errors['aadhaar_number'] = identity['aadhaar']
+        mobile = attrs.get('mobile_no')
+        if mobile and rules.validation.phone_10_digits and not (mobile.isdigit() and len(mobile) == 10):
+            errors['mobile_no'] = "Mobile number must be 10 digits"
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
+
+
+# --- List (summary) representation ---
+# Expects the queryset from LoanApplicationViewSet.get_queryset(): kyc_details prefetched
+# and credit_assessment joined, so a page costs a fixed number of queries.
+
+class KYCSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = KYCDetail
+        fields = ['id', 'kyc_type', 'status']
+
+
+class CreditAssessmentSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = CreditAssessment
+        fields = ['cibil_score', 'risk_score', 'status', 'approved_amount']
+
+
+class LoanApplicationListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    tenant_name = serializers.CharField(source='tenant.name', read_only=True)
+    branch_name = serializers.CharField(source='branch.name', read_only=True, default=None)
+    customer_name = serializers.CharField(source='customer.first_name', read_only=True)
+    product_name = serializers.CharField(source='product.name', read_only=True, default=None)
+
+    kyc_details = KYCSummarySerializer(many=True, read_only=True)
+    credit_assessment = serializers.SerializerMethodField()
+
+    class Meta:
+        model = LoanApplication
+        fields = [
+            'id', 'application_id', 'tenant', 'tenant_name', 'branch', 'branch_name',
+            'customer', 'customer_name', 'product', 'product_name',
+            'first_name', 'last_name', 'mobile_no', 'requested_amount', 'requested_tenure',
+            'status', 'is_video_kyc_verified', 'kyc_details', 'credit_assessment',
+            'created_at', 'updated_at',
+        ]
+        read_only_fields = fields
+
+    def get_credit_assessment(self, obj):
+        # Reverse one-to-one: the missing case is cached by select_related, no extra query
+        assessment = getattr(obj, 'credit_assessment', None)
+        return CreditAssessmentSummarySerializer(assessment).data if assessment else None
@@ -1,3 +1,205 @@
+import datetime
+from decimal import Decimal
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from tenants.models import Tenant, Branch, RiskRule, ScoreCard
+from crm.models import Customer
+from users.models import User
+from .logic import scorecard as scorecards
+from .logic.batch_underwriting import BatchUnderwritingEngine
+from .models import LoanApplication, KYCDetail, CreditAssessment
+
+
+class LoanApplicationListQueryTests(TestCase):
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        self.branch = Branch.objects.create(tenant=self.tenant, branch_code="BR001", name="Main")
+        self.customer = Customer.objects.create(name="Borrower", tenant=self.tenant)
+        self.user = User.objects.create_user(email="admin@acme.test", password="pw", role="ADMIN", tenant=self.tenant)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def add_applications(self, count):
+        for _ in range(count):
+            app = LoanApplication.objects.create(
+                tenant=self.tenant, branch=self.branch, customer=self.customer,
+                first_name="Test", last_name="User", mobile_no="9999999999",
+                email="test@example.com", dob=datetime.date(1990, 1, 1),
+                pan_number="ABCDE1234F", gender="M",
+                res_address_line1="Line 1", res_city="Pune", res_state="MH", res_pincode="411001",
+                requested_amount=Decimal("100000"),
+            )
+            KYCDetail.objects.create(loan_application=app, kyc_type="PAN")
+            KYCDetail.objects.create(loan_application=app, kyc_type="AADHAAR")
+            CreditAssessment.objects.create(application=app, cibil_score=750)
+
+    def list_queries(self, url="/api/v1/los/loan-applications/?page_size=100"):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.data["results"]
+
+    def test_query_count_is_constant_in_page_size(self):
+        self.add_applications(2)
+        small_count, small_rows = self.list_queries()
+
+        self.add_applications(20)
+        large_count, large_rows = self.list_queries()
+
+        self.assertEqual(len(small_rows), 2)
+        self.assertEqual(len(large_rows), 22)
+        self.assertEqual(small_count, large_count)
+        self.assertEqual(len(large_rows[0]["kyc_details"]), 2)
+        self.assertEqual(large_rows[0]["credit_assessment"]["cibil_score"], 750)
+
+    def test_sparse_fields_skip_nested_queries(self):
+        self.add_applications(3)
+        full_count, _ = self.list_queries()
+        sparse_count, rows = self.list_queries("/api/v1/los/loan-applications/?fields=id,status")
+
+        self.assertEqual(set(rows[0]), {"id", "status"})
+        self.assertLess(sparse_count, full_count)
+
+    def test_sparse_fields_do_not_apply_to_writes(self):
+        self.add_applications(1)
+        app = LoanApplication.objects.get()
+        response = self.client.patch(
+            f"/api/v1/los/loan-applications/{app.pk}/?fields=id", {"first_name": "Renamed"}, format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["first_name"], "Renamed")
+        app.refresh_from_db()
+        self.assertEqual(app.first_name, "Renamed")
+
+
+class UnderwritingParityTests(TestCase):
+    """run-underwriting (RuleEngine) and BatchUnderwritingEngine must reach the same decisions."""
+
+    def setUp(self):
+        strict = Tenant.objects.create(name="Strict Finance", tenant_type="NBFC", email="ops@strict.test")
+        tight_foir = Tenant.objects.create(name="Tight Finance", tenant_type="NBFC", email="ops@tight.test")
+        lenient = Tenant.objects.create(name="Lenient Finance", tenant_type="NBFC", email="ops@lenient.test")
+        RiskRule.objects.create(
+            tenant=strict, name="Strict", min_age=25, max_age=55, allowed_income_types=["Salaried"],
+            min_salary=Decimal("30000"), min_cash_flow=Decimal("15000"), max_foir=Decimal("60"),
+        )
+        RiskRule.objects.create(tenant=tight_foir, name="Tight FOIR", max_foir=Decimal("40"))
+        cases = [
+            (strict, datetime.date(2005, 1, 1), "Salaried", "50000"),       # age
+            (strict, datetime.date(1990, 1, 1), "Self-Employed", "50000"),  # income type
+            (strict, datetime.date(1990, 1, 1), "Salaried", "20000"),       # min salary
+            (strict, datetime.date(1990, 1, 1), "Salaried", "35000"),       # min cash flow
+            (strict, datetime.date(1990, 1, 1), "Salaried", "50000.05"),    # passes
+            (tight_foir, datetime.date(1990, 1, 1), "Salaried", "50000"),   # max FOIR
+            (lenient, datetime.date(1990, 1, 1), "Self-Employed", "100"),   # defaults only
+        ]
+        for tenant, dob, income_type, income in cases:
+            LoanApplication.objects.create(
+                tenant=tenant, customer=Customer.objects.create(name="Borrower", tenant=tenant),
+                first_name="Test", last_name="User", mobile_no="9999999999", email="test@example.com",
+                dob=dob, pan_number="ABCDE1234F", gender="M",
+                res_address_line1="Line 1", res_city="Pune", res_state="MH", res_pincode="411001",
+                requested_amount=Decimal("100000"), income_type=income_type, monthly_income=Decimal(income),
+                status="KNOCKOUT_PENDING",
+            )
+
+    def test_both_engines_decide_identically(self):
+        engine = BatchUnderwritingEngine(dry_run=True)
+        apps = list(engine.queryset)
+        passed, knockout_ok, net_cash_flow, reasons = engine.evaluate(apps)
+        batch = {
+            app.pk: (
+                "UNDERWRITING" if passed[i] else "REJECTED",
+                None if passed[i] else reasons[i][1],
+                Decimal(int(net_cash_flow[i])) / 100 if knockout_ok[i] else None,
+            )
+            for i, app in enumerate(apps)
+        }
+        self.assertEqual(
+            sorted(code for code, _ in filter(None, reasons)),
+            ["age", "income_type", "max_foir", "min_cash_flow", "min_salary"],
+        )
+
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(email="root@platform.test", password="pw", role="MASTER_ADMIN"))
+        scalar = {}
+        for app in apps:
+            response = client.post(f"/api/v1/los/loan-applications/{app.pk}/run-underwriting/")
+            self.assertEqual(response.status_code, 200)
+            app.refresh_from_db()
+            scalar[app.pk] = (
+                app.status,
+                app.remarks if app.status == "REJECTED" else None,
+                app.net_cash_flow,
+            )
+        self.assertEqual(scalar, batch)
+
+
+class ScoreCardTests(TestCase):
+
+    def setUp(self):
+        scorecards.clear_cache()
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        self.scorecard = ScoreCard.objects.create(tenant=self.tenant, name="Retail", rules_config=[
+            {"criterion": "CIBIL", "condition": ">=750", "impact": "Positive", "weight": "High"},
+            {"criterion": "CIBIL", "condition": "< 600", "impact": "Negative", "weight": "High"},
+            {"criterion": "Income", "condition": "30000-80000", "impact": "Positive", "weight": "Medium"},
+            {"criterion": "FOIR", "condition": ">50%", "impact": "Negative", "weight": "Low"},
+            {"criterion": "Income Type", "condition": "!=Self-Employed", "impact": "Positive", "weight": 1.5},
+            {"criterion": "Age", "condition": "25 to 45", "impact": "Positive", "weight": "Low"},
+        ])
+        customer = Customer.objects.create(name="Borrower", tenant=self.tenant)
+        cases = [
+            ("Salaried", "50000", Decimal("40"), datetime.date(1990, 1, 1), 780),
+            ("Self-Employed", "90000", Decimal("55"), datetime.date(1960, 1, 1), 580),
+            ("Salaried", "30000", None, datetime.date(2001, 1, 1), None),
+        ]
+        for income_type, income, foir, dob, cibil in cases:
+            app = LoanApplication.objects.create(
+                tenant=self.tenant, customer=customer, first_name="Test", last_name="User",
+                mobile_no="9999999999", email="test@example.com", dob=dob, pan_number="ABCDE1234F", gender="M",
+                res_address_line1="Line 1", res_city="Pune", res_state="MH", res_pincode="411001",
+                requested_amount=Decimal("100000"), income_type=income_type, monthly_income=Decimal(income),
+                foir_percentage=foir,
+            )
+            if cibil is not None:
+                CreditAssessment.objects.create(application=app, cibil_score=cibil)
+
+    def test_scalar_and_vectorised_scores_agree(self):
+        queryset = LoanApplication.objects.select_related("credit_assessment")
+        vectorised = scorecards.score_queryset(self.scorecard, queryset)
+        scalar = {app.pk: scorecards.score_application(self.scorecard, app)["score"] for app in queryset}
+        self.assertEqual(scalar, vectorised)
+        self.assertEqual(sorted(scalar.values()), [-4.0, 4.5, 7.5])
+
+    def test_text_conditions_keep_their_values(self):
+        compiled = scorecards.compile_rules_config([
+            {"criterion": "Income Type", "condition": "=Salaried", "impact": "Positive", "weight": "Low"},
+            {"criterion": "Income Type", "condition": "!=!Other", "impact": "Positive", "weight": "Low"},
+        ])
+        self.assertEqual(compiled.score({"income_type": "Salaried"})["score"], 2.0)
+        self.assertEqual(compiled.score({"income_type": "!Other"})["score"], 0.0)
+
+    def test_cache_is_bounded(self):
+        original, scorecards.CACHE_SIZE = scorecards.CACHE_SIZE, 2
+        try:
+            for number in range(4):
+                extra = ScoreCard.objects.create(tenant=self.tenant, name=f"Card {number}", rules_config=[])
+                scorecards.get_compiled(extra)
+            self.assertEqual(len(scorecards._cache), 2)
+        finally:
+            scorecards.CACHE_SIZE = original
 
-# Create your tests here.
+    def test_non_numeric_scorecard_id_is_a_bad_request(self):
+        app = LoanApplication.objects.first()
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(email="root@platform.test", password="pw", role="MASTER_ADMIN"))
+        response = client.get(f"/api/v1/los/loan-applications/{app.pk}/score/?scorecard=abc")
+        self.assertEqual(response.status_code, 400)
+        response = client.get(f"/api/v1/los/loan-applications/{app.pk}/score/?scorecard={self.scorecard.pk}")
+        self.assertEqual(response.status_code, 200)
@@ -4,18 +4,50 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
+from django.db.models import Prefetch
+
+from brd_platform.pagination import CreatedAtCursorPagination, UploadedAtCursorPagination
+from brd_platform.serializers import requested_fields
 
 from .models import LoanApplication, KYCDetail, CreditAssessment
-from .serializers import LoanApplicationSerializer, KYCDetailSerializer, CreditAssessmentSerializer
+from .serializers import (
+    LoanApplicationSerializer, LoanApplicationListSerializer, KYCDetailSerializer, CreditAssessmentSerializer,
+)
 # Ensure these files exist (see Step 2 below)
 from .logic.rule_engine import RuleEngine 
 from .logic.integrations import SmartVerificationService
+from .logic.batch_underwriting import BatchUnderwritingEngine
+from .logic.scorecard import score_application, pick_scorecard, ScoreCardConfigError
+from reporting.logic.filters import resolve_report_tenant
+from users.permissions import HasRolePermission, has_role_permission
+from users.logic.audit import AuditMixin
 # from .permissions import IsTenantMember # Uncomment if you are using tenant permissions
 
-class LoanApplicationViewSet(viewsets.ModelViewSet):
+class LoanApplicationViewSet(AuditMixin, viewsets.ModelViewSet):
     queryset = LoanApplication.objects.all().select_related('tenant', 'branch', 'customer', 'product')
     serializer_class = LoanApplicationSerializer
-    permission_classes = [IsAuthenticated]
+    permission_classes = [IsAuthenticated, HasRolePermission]
+    # RoleMaster permission codes per action (see users.permissions.HasRolePermission)
+    required_permissions = {
+        'generate_sanction': 'loan_approve',
+        'batch_underwriting': 'loan_approve',
+        'disburse_loan': 'loan_disburse',
+    }
+    # change-status targets that need more than access to the application
+    status_permissions = {
+        'APPROVED': 'loan_approve',
+        'SANCTIONED': 'loan_approve',
+        'REJECTED': 'loan_reject',
+        'DISBURSED': 'loan_disburse',
+    }
+    audit_actions = {
+        'verify_video': 'UPDATE',
+        'run_underwriting': 'UPDATE',
+        'batch_underwriting': 'UPDATE',
+        'generate_sanction': 'APPROVE',
+        'disburse_loan': 'UPDATE',
+        'change_status': 'UPDATE',
+    }
     
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'tenant', 'branch', 'product', 'income_type']
@@ -23,7 +55,34 @@ class LoanApplicationViewSet(viewsets.ModelViewSet):
     
     # Matches your model field name 'requested_amount'
     ordering_fields = ['created_at', 'requested_amount', 'status']
-    ordering = ['-created_at']
+    ordering = ['-created_at', '-id']
+    pagination_class = CreatedAtCursorPagination
+    max_page_size = 100  # rows carry nested KYC + credit assessment
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in ('list', 'retrieve'):
+            return queryset
+
+        fields = requested_fields(self.request)
+        if fields is None or 'credit_assessment' in fields:
+            queryset = queryset.select_related('credit_assessment')
+        if fields is None or 'kyc_details' in fields:
+            kyc = KYCDetail.objects.all()
+            if self.action == 'list':
+                kyc = kyc.only('id', 'loan_application_id', 'kyc_type', 'status')
+            queryset = queryset.prefetch_related(Prefetch('kyc_details', queryset=kyc))
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return LoanApplicationListSerializer
+        return super().get_serializer_class()
+
+    def get_audit_action_type(self, request, response):
+        if self.action == 'change_status' and request.data.get('status') in ('APPROVED', 'SANCTIONED'):
+            return 'APPROVE'
+        return super().get_audit_action_type(request, response)
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -80,7 +139,11 @@ class LoanApplicationViewSet(viewsets.ModelViewSet):
         metrics = engine.calculate_underwriting_metrics()
         
         # Update Application Status
-        app.status = 'UNDERWRITING'
+        if metrics['system_decision'] == 'REJECT':
+            app.status = 'REJECTED'
+            app.remarks = metrics['rejection_reason']
+        else:
+            app.status = 'UNDERWRITING'
         app.save()
 
         return Response({
@@ -89,6 +152,49 @@ class LoanApplicationViewSet(viewsets.ModelViewSet):
             "metrics": metrics
         })
 
+    # ------------------------------------------------------------
+    # ACTION: Batch Underwriting (Phase 5, whole queue)
+    # ------------------------------------------------------------
+    @action(detail=False, methods=['post'], url_path='batch-underwriting')
+    def batch_underwriting(self, request):
+        """
+        Runs knock-out + underwriting over a status queue (default KNOCKOUT_PENDING)
+        for the caller's tenant. Large overnight runs should use `manage.py batch_underwrite`.
+        """
+        tenant_id = resolve_report_tenant(request)
+        try:
+            limit = int(request.data.get('limit', 5000))
+        except (TypeError, ValueError):
+            return Response({'detail': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+        engine = BatchUnderwritingEngine(
+            tenant_id=tenant_id,
+            status=request.data.get('status', 'KNOCKOUT_PENDING'),
+            dry_run=str(request.data.get('dry_run', '')).lower() in ('1', 'true'),
+        )
+        return Response(engine.run(limit=limit))
+
+    # ------------------------------------------------------------
+    # ACTION: Scorecard Evaluation
+    # ------------------------------------------------------------
+    @action(detail=True, methods=['get'], url_path='score')
+    def score(self, request, pk=None):
+        app = self.get_object()
+        scorecard_id = request.query_params.get('scorecard')
+        if scorecard_id:
+            try:
+                scorecard_id = int(scorecard_id)
+            except ValueError:
+                return Response({'detail': 'scorecard must be an integer id'}, status=status.HTTP_400_BAD_REQUEST)
+        scorecard = pick_scorecard(app, scorecard_id)
+        if scorecard is None:
+            return Response({'detail': 'No scorecard configured for this tenant'}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            result = score_application(scorecard, app)
+        except ScoreCardConfigError as exc:
+            return Response({'detail': f'Invalid scorecard: {exc}'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'scorecard': scorecard.pk, 'scorecard_name': scorecard.name, **result})
+
     # ------------------------------------------------------------
     # ACTION: Generate Sanction Letter (Phase 6)
     # ------------------------------------------------------------
@@ -148,6 +254,10 @@ class LoanApplicationViewSet(viewsets.ModelViewSet):
 
         if not new_status:
             return Response({'detail': 'status is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        code = self.status_permissions.get(new_status)
+        if code and not has_role_permission(request.user, code):
+            return Response({'detail': HasRolePermission.message}, status=status.HTTP_403_FORBIDDEN)
         
         if new_status == 'DISBURSED' and str(app.product) == 'Personal Loan' and not app.is_video_kyc_verified:
              return Response({'detail': 'Cannot disburse Personal Loan without Video Verification'}, status=status.HTTP_400_BAD_REQUEST)
@@ -159,16 +269,18 @@ class LoanApplicationViewSet(viewsets.ModelViewSet):
         return Response(self.get_serializer(app).data)
 
 
-class KYCDetailViewSet(viewsets.ModelViewSet):
+class KYCDetailViewSet(AuditMixin, viewsets.ModelViewSet):
     queryset = KYCDetail.objects.all().select_related('loan_application')
     serializer_class = KYCDetailSerializer
     permission_classes = [IsAuthenticated]
     filterset_fields = ['loan_application', 'kyc_type']
+    pagination_class = UploadedAtCursorPagination
 
-class CreditAssessmentViewSet(viewsets.ModelViewSet):
+class CreditAssessmentViewSet(AuditMixin, viewsets.ModelViewSet):
     queryset = CreditAssessment.objects.all().select_related('application')
     serializer_class = CreditAssessmentSerializer
     permission_classes = [IsAuthenticated]
+    audit_actions = {'update_score': 'UPDATE'}
 
     @action(detail=True, methods=['post'], url_path='update-score')
     def update_score(self, request, pk=None):
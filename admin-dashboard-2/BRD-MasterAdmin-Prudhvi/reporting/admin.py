@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Report, Analytics
+from .models import Report, Analytics, DailyMetric
 
 
 @admin.register(Report)
@@ -15,3 +15,10 @@ class AnalyticsAdmin(admin.ModelAdmin):
     list_display = ('metric', 'tenant', 'value', 'as_of_date')
     list_filter = ('tenant', 'as_of_date')
     search_fields = ('metric',)
+
+
+@admin.register(DailyMetric)
+class DailyMetricAdmin(admin.ModelAdmin):
+    list_display = ('metric', 'tenant', 'value', 'as_of_date', 'updated_at')
+    list_filter = ('tenant', 'as_of_date')
+    search_fields = ('metric',)
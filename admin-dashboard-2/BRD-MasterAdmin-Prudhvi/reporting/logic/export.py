@@ -0,0 +1,323 @@
+# reporting/logic/export.py
+import csv
+import datetime
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+try:
+    from openpyxl import Workbook
+except ImportError:
+    Workbook = None
+
+from brd_platform.db_router import read_database, replica_reads
+from los.models import LoanApplication
+from lms.models import LoanAccount, Repayment
+from crm.models import Customer
+from .branch_performance import BranchPerformanceEngine
+from .user_activity import annotated_users
+
+CHUNK_SIZE = getattr(settings, 'REPORT_EXPORT_CHUNK_SIZE', 2000)
+# Exports above this many rows are generated in the background and stored on a Report row
+ASYNC_ROWS = getattr(settings, 'REPORT_EXPORT_ASYNC_ROWS', 50000)
+
+# Text cells starting with one of these are read as formulas by spreadsheet apps; they are
+# written with a leading apostrophe so user-entered names and remarks stay plain text
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+CONTENT_TYPES = {
+    'CSV': 'text/csv; charset=utf-8',
+    'XLSX': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+# ------------------------------------------------------------------
+# 1. DATASETS: report type -> (headers, row source)
+# A row source returns a values_list queryset (streamed with .iterator) or a plain list,
+# plus an optional per-row transform.
+# ------------------------------------------------------------------
+
+DATASETS = {}
+
+
+def dataset(*report_types, headers):
+    def register(func):
+        for report_type in report_types:
+            DATASETS[report_type] = (headers, func)
+        return func
+    return register
+
+
+def _dates(queryset, field, filters):
+    if filters.get('start_date'):
+        queryset = queryset.filter(**{f"{field}__date__gte": filters['start_date']})
+    if filters.get('end_date'):
+        queryset = queryset.filter(**{f"{field}__date__lte": filters['end_date']})
+    return queryset
+
+
+def _branch(queryset, field, filters):
+    branch = filters.get('branch')
+    if branch and branch != 'all':
+        queryset = queryset.filter(**{field: branch})
+    return queryset
+
+
+@dataset('DISBURSEMENT', headers=[
+    'Application ID', 'Disbursed On', 'Branch', 'First Name', 'Last Name', 'Product', 'Amount', 'Tenure (Months)',
+])
+def _disbursements(tenant_id, filters):
+    queryset = LoanApplication.objects.filter(status='DISBURSED')
+    if tenant_id:
+        queryset = queryset.filter(tenant_id=tenant_id)
+    queryset = _branch(_dates(queryset, 'disbursed_at', filters), 'branch_id', filters)
+    return queryset.order_by('-disbursed_at', '-id').values_list(
+        'application_id', 'disbursed_at', 'branch__name', 'first_name', 'last_name',
+        'product__name', 'requested_amount', 'requested_tenure',
+    ), None
+
+
+@dataset('LOAN_APPROVAL', headers=[
+    'Application ID', 'Applied On', 'Branch', 'First Name', 'Last Name', 'Requested Amount', 'Status', 'Remarks',
+])
+def _applications(tenant_id, filters):
+    queryset = LoanApplication.objects.all()
+    if tenant_id:
+        queryset = queryset.filter(tenant_id=tenant_id)
+    queryset = _branch(_dates(queryset, 'created_at', filters), 'branch_id', filters)
+    return queryset.order_by('-created_at', '-id').values_list(
+        'application_id', 'created_at', 'branch__name', 'first_name', 'last_name',
+        'requested_amount', 'status', 'remarks',
+    ), None
+
+
+PORTFOLIO_FIELDS = (
+    'account_id', 'loan_application__application_id', 'loan_application__branch__name',
+    'loan_application__first_name', 'loan_application__last_name', 'disbursed_at', 'interest_rate',
+    'tenor_months', 'emi_amount', 'outstanding_principal', 'dpd', 'asset_class', 'asset_class_since',
+)
+PORTFOLIO_HEADERS = [
+    'Account ID', 'Application ID', 'Branch', 'First Name', 'Last Name', 'Disbursed At', 'Interest Rate',
+    'Tenor (Months)', 'EMI', 'Outstanding Principal', 'DPD', 'Asset Class', 'Asset Class Since',
+]
+
+
+def _accounts(tenant_id, filters):
+    queryset = LoanAccount.objects.all()
+    if tenant_id:
+        queryset = queryset.filter(loan_application__tenant_id=tenant_id)
+    return _branch(queryset, 'loan_application__branch_id', filters)
+
+
+@dataset('NPA', 'RISK', headers=PORTFOLIO_HEADERS)
+def _overdue_accounts(tenant_id, filters):
+    queryset = _accounts(tenant_id, filters).filter(outstanding_principal__gt=0).exclude(asset_class='STANDARD')
+    return queryset.order_by('-dpd', 'id').values_list(*PORTFOLIO_FIELDS), None
+
+
+@dataset('PORTFOLIO', headers=PORTFOLIO_HEADERS)
+def _portfolio(tenant_id, filters):
+    queryset = _dates(_accounts(tenant_id, filters), 'created_at', filters)
+    return queryset.order_by('id').values_list(*PORTFOLIO_FIELDS), None
+
+
+@dataset('REVENUE', 'COLLECTION', headers=[
+    'Paid At', 'Account ID', 'Branch', 'Amount', 'Transaction Reference',
+    'Penalties', 'Charges', 'Fees', 'Interest', 'Principal', 'Excess',
+])
+def _repayments(tenant_id, filters):
+    queryset = Repayment.objects.all()
+    if tenant_id:
+        queryset = queryset.filter(loan_account__loan_application__tenant_id=tenant_id)
+    queryset = _branch(_dates(queryset, 'paid_at', filters), 'loan_account__loan_application__branch_id', filters)
+    buckets = ('Penalties', 'Charges', 'Fees', 'Interest', 'Principal', 'Excess')
+
+    def transform(row):
+        *head, allocation = row
+        return (*head, *((allocation or {}).get(bucket, '') for bucket in buckets))
+
+    return queryset.order_by('-paid_at', '-id').values_list(
+        'paid_at', 'loan_account__account_id', 'loan_account__loan_application__branch__name',
+        'amount', 'transaction_reference', 'allocation',
+    ), transform
+
+
+@dataset('BORROWER', headers=['Name', 'Email', 'Phone', 'Company', 'KYC Status', 'Created At'])
+def _borrowers(tenant_id, filters):
+    queryset = Customer.objects.all()
+    if tenant_id:
+        queryset = queryset.filter(tenant_id=tenant_id)
+    queryset = _dates(queryset, 'created_at', filters)
+    return queryset.order_by('id').values_list('name', 'email', 'phone', 'company', 'kyc_status', 'created_at'), None
+
+
+@dataset('BRANCH_PERFORMANCE', headers=[
+    'Branch', 'Applications', 'Loans', 'Disbursed', 'Rejection Ratio %', 'Collections',
+])
+def _branch_performance(tenant_id, filters):
+    engine = BranchPerformanceEngine(tenant_id, filters.get('start_date'), filters.get('end_date'))
+    rows = [
+        (row['branch'], row['applications'], row['loans'], row['disbursed'], row['rejection_ratio'], row['collections'])
+        for row in engine.run()
+    ]
+    return rows, None
+
+
+@dataset('USER_ACTIVITY', headers=[
+    'Email', 'First Name', 'Last Name', 'Role', 'Logins', 'Applications', 'Actions', 'Approvals', 'Last Active',
+])
+def _user_activity(tenant_id, filters):
+    def transform(row):
+        *head, last_seen, last_login = row
+        return (*head, last_seen or last_login)
+
+    return annotated_users(tenant_id).order_by('id').values_list(
+        'email', 'first_name', 'last_name', 'role', 'logins_count', 'applications_count',
+        'actions_count', 'approvals_count', 'last_seen', 'last_login',
+    ), transform
+
+
+def get_dataset(report_type, tenant_id=None, filters=None):
+    """Returns (headers, source, transform); source is a queryset or a list."""
+    if report_type not in DATASETS:
+        raise ExportError(f"Unknown report type '{report_type}'")
+    headers, build = DATASETS[report_type]
+    with replica_reads():
+        source, transform = build(tenant_id, _parse_filters(filters or {}))
+    if hasattr(source, 'using'):
+        # Querysets are evaluated later (while streaming), outside the block
+        source = source.using(read_database())
+    return headers, source, transform
+
+
+def _parse_filters(filters):
+    parsed = dict(filters)
+    for key in ('start_date', 'end_date'):
+        if isinstance(parsed.get(key), str):
+            parsed[key] = datetime.date.fromisoformat(parsed[key])
+    return parsed
+
+
+def count_rows(source):
+    return source.count() if hasattr(source, 'count') and not isinstance(source, list) else len(source)
+
+
+def iter_rows(source, transform=None):
+    rows = source.iterator(chunk_size=CHUNK_SIZE) if hasattr(source, 'iterator') else iter(source)
+    for row in rows:
+        yield tuple(_cell(value) for value in (transform(row) if transform else row))
+
+
+def _cell(value):
+    if isinstance(value, datetime.datetime):
+        # openpyxl rejects tz-aware datetimes; show local time in both formats
+        value = timezone.localtime(value).replace(tzinfo=None) if timezone.is_aware(value) else value
+        return value.replace(microsecond=0)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+# ------------------------------------------------------------------
+# 2. WRITERS
+# ------------------------------------------------------------------
+
+class _Echo:
+    """File-like object whose write() hands the CSV line back instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(headers, rows):
+    writer = csv.writer(_Echo())
+    yield '\ufeff' + writer.writerow(headers)  # BOM so Excel opens the file as UTF-8
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def write_xlsx(headers, rows, fileobj, title='Report'):
+    if Workbook is None:
+        raise ExportError("XLSX export requires openpyxl (pip install openpyxl)")
+    workbook = Workbook(write_only=True)  # rows are flushed to disk, not kept in memory
+    sheet = workbook.create_sheet(title=title[:31])
+    sheet.append(headers)
+    count = 0
+    for row in rows:
+        sheet.append(row)
+        count += 1
+    workbook.save(fileobj)
+    return count
+
+
+def filename_for(report_type, file_format):
+    return f"{report_type.lower()}_{timezone.localdate():%Y%m%d}.{file_format.lower()}"
+
+
+def export_response(report_type, file_format='CSV', tenant_id=None, filters=None, prepared=None):
+    """Synchronous export: CSV is streamed row by row, XLSX goes through a spooled temp file."""
+    file_format = file_format.upper()
+    headers, source, transform = prepared or get_dataset(report_type, tenant_id, filters)
+    filename = filename_for(report_type, file_format)
+    if file_format == 'CSV':
+        response = StreamingHttpResponse(
+            iter_csv(headers, iter_rows(source, transform)), content_type=CONTENT_TYPES['CSV'],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    if file_format == 'XLSX':
+        spool = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+        write_xlsx(headers, iter_rows(source, transform), spool, title=report_type)
+        spool.seek(0)
+        return FileResponse(spool, as_attachment=True, filename=filename, content_type=CONTENT_TYPES['XLSX'])
+    raise ExportError(f"Unsupported format '{file_format}'")
+
+
+# ------------------------------------------------------------------
+# 3. BACKGROUND EXPORTS (run as Report jobs, output stored on Report.file)
+# ------------------------------------------------------------------
+
+def run_export(report):
+    """Writes the file for a Report job (status is handled by jobs.run_job)."""
+    headers, source, transform = get_dataset(report.report_type, report.tenant_id, report.filters_json)
+    rows = iter_rows(source, transform)
+    with tempfile.TemporaryFile() as tmp:
+        if report.file_format == 'XLSX':
+            count = write_xlsx(headers, rows, tmp, title=report.report_type)
+        else:
+            count = 0
+            for line in iter_csv(headers, rows):
+                tmp.write(line.encode('utf-8'))
+                count += 1
+            count -= 1  # header line
+        tmp.seek(0)
+        report.file.save(filename_for(report.report_type, report.file_format), File(tmp), save=False)
+    report.row_count = count
+    return report
+
+
+def start_export(report_type, file_format, tenant_id, filters, user=None, force_async=False):
+    """
+    Streams small exports straight back; anything over ASYNC_ROWS (or force_async) becomes
+    a Report job. Returns (response or None, report or None).
+    """
+    from .jobs import submit
+
+    file_format = file_format.upper()
+    if file_format not in CONTENT_TYPES:
+        raise ExportError(f"Unsupported format '{file_format}'")
+    prepared = get_dataset(report_type, tenant_id, filters)
+    if not force_async and count_rows(prepared[1]) <= ASYNC_ROWS:
+        return export_response(report_type, file_format, prepared=prepared), None
+    report, _ = submit(report_type, tenant_id, filters, file_format=file_format, user=user)
+    return None, report
@@ -0,0 +1,85 @@
+# reporting/logic/filters.py
+import uuid
+
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import PermissionDenied, ValidationError
+
+from brd_platform.tenant_context import is_platform_user, tenant_cache
+
+
+def resolve_report_tenant(request):
+    """
+    Returns the tenant primary key a report should be scoped to, or None for all tenants.
+    Platform users (MASTER_ADMIN / superuser) may pass ?tenant=<tenant_id>; everyone else is
+    pinned to their own tenant and refused when they have none.
+    """
+    user = request.user
+    if not is_platform_user(user):
+        if getattr(user, 'tenant_id', None):
+            return user.tenant_id
+        raise PermissionDenied("No tenant is assigned to this user")
+
+    tenant_param = request.query_params.get('tenant')
+    if not tenant_param or tenant_param == 'all':
+        return None
+
+    try:
+        tenant_uuid = uuid.UUID(str(tenant_param))
+    except ValueError:
+        raise ValidationError({"tenant": "Invalid tenant id"})
+
+    tenant = tenant_cache.get_by_uuid(tenant_uuid)
+    if tenant is None:
+        raise ValidationError({"tenant": "Tenant not found"})
+    return tenant.pk
+
+
+def parse_date_range(request):
+    """Reads ?start_date= / ?end_date= (YYYY-MM-DD) into date objects."""
+    dates = []
+    for key in ('start_date', 'end_date'):
+        raw = request.query_params.get(key)
+        if not raw:
+            dates.append(None)
+            continue
+        try:
+            value = parse_date(raw)
+        except ValueError:
+            value = None
+        if value is None:
+            raise ValidationError({key: "Use YYYY-MM-DD format"})
+        dates.append(value)
+
+    start_date, end_date = dates
+    if start_date and end_date and start_date > end_date:
+        raise ValidationError({"start_date": "start_date must be before end_date"})
+    return start_date, end_date
+
+
+def report_filters(request):
+    """Report filters from query params, JSON-safe so they can key caches and be stored in Report.filters_json."""
+    start_date, end_date = parse_date_range(request)
+    filters = {}
+    if start_date:
+        filters['start_date'] = start_date.isoformat()
+    if end_date:
+        filters['end_date'] = end_date.isoformat()
+    if request.query_params.get('branch'):
+        filters['branch'] = request.query_params['branch']
+    return filters
+
+
+TIMESERIES_PARAMS = ('series', 'granularity', 'compare', 'period', 'financial_year', 'reporting_period')
+
+
+def timeseries_filters(request):
+    """report_filters() plus the series options; values are checked by timeseries.build_series."""
+    filters = report_filters(request)
+    for key in TIMESERIES_PARAMS:
+        value = request.query_params.get(key)
+        if value:
+            filters[key] = value.lower() if key in ('series', 'granularity', 'compare', 'period') else value
+    for key in ('financial_year', 'reporting_period'):
+        if key in filters and not str(filters[key]).isdigit():
+            raise ValidationError({key: "Must be an id"})
+    return filters
@@ -0,0 +1,192 @@
+# reporting/logic/jobs.py
+import datetime
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from reporting.models import Report
+from . import export, report_cache, reports
+
+logger = logging.getLogger(__name__)
+
+ACTIVE = ('PENDING', 'RUNNING')
+WORKERS = getattr(settings, 'REPORT_JOB_WORKERS', 4)
+# A job still PENDING/RUNNING after this long is assumed lost (worker restart) and no longer dedups
+STALE_AFTER = datetime.timedelta(seconds=getattr(settings, 'REPORT_JOB_TIMEOUT', 1800))
+
+
+class JobError(ValueError):
+    pass
+
+
+# ------------------------------------------------------------------
+# 1. BACKENDS
+# ------------------------------------------------------------------
+
+class LocalBackend:
+    """In-process thread pool; each job opens (and closes) its own DB connection."""
+
+    def __init__(self, workers=WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='report-job')
+
+    def submit(self, report_id):
+        self.executor.submit(_run_in_thread, report_id)
+
+
+class CeleryBackend:
+    """Hands the job id to a Celery worker (REPORT_JOB_BACKEND = "celery", app in brd_platform/celery.py)."""
+
+    def submit(self, report_id):
+        from reporting.tasks import run_report_job
+
+        run_report_job.delay(report_id)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                name = getattr(settings, 'REPORT_JOB_BACKEND', 'local')
+                if name == 'celery':
+                    from brd_platform import celery_app
+
+                    if celery_app is None:
+                        logger.warning("REPORT_JOB_BACKEND is 'celery' but celery is not installed; using local workers")
+                    elif not getattr(settings, 'CELERY_BROKER_URL', ''):
+                        logger.warning("REPORT_JOB_BACKEND is 'celery' but CELERY_BROKER_URL is not set; using local workers")
+                    else:
+                        _backend = CeleryBackend()
+                if _backend is None:
+                    _backend = LocalBackend()
+    return _backend
+
+
+def _run_in_thread(report_id):
+    close_old_connections()
+    try:
+        run_job(report_id)
+    except Exception:
+        logger.exception("Report job %s crashed", report_id)
+    finally:
+        close_old_connections()
+
+
+# ------------------------------------------------------------------
+# 2. SUBMISSION (dedup of identical in-flight requests)
+# ------------------------------------------------------------------
+
+def _report_name(report_type):
+    return dict(Report._meta.get_field('report_type').choices).get(report_type, report_type)
+
+
+def submit(report_type, tenant_id=None, filters=None, file_format='JSON', user=None, name=None):
+    """
+    Queues a report job and returns (report, created). An identical request
+    (tenant, report type, format, filters) that is still queued or running is returned
+    instead of starting a second one.
+    """
+    file_format = file_format.upper()
+    if file_format == 'JSON' and report_type not in reports.REPORTS:
+        raise JobError(f"Report type '{report_type}' has no JSON form")
+    if file_format != 'JSON' and report_type not in export.DATASETS:
+        raise JobError(f"Report type '{report_type}' cannot be exported")
+    filters = filters or {}
+    digest = report_cache.filters_hash(filters)
+    in_flight = Report.objects.filter(
+        tenant_id=tenant_id, report_type=report_type, file_format=file_format,
+        filters_hash=digest, status__in=ACTIVE,
+    )
+
+    # Jobs lost with a restarted worker must not block new requests forever
+    in_flight.filter(generated_at__lt=timezone.now() - STALE_AFTER).update(
+        status='FAILED', error="Timed out", completed_at=timezone.now(),
+    )
+    existing = in_flight.order_by('-id').first()
+    if existing:
+        return existing, False
+
+    try:
+        with transaction.atomic():
+            report = Report.objects.create(
+                tenant_id=tenant_id,
+                name=name or f"{_report_name(report_type)} ({file_format})",
+                report_type=report_type,
+                filters_json=filters,
+                filters_hash=digest,
+                file_format=file_format,
+                requested_by_id=getattr(user, 'pk', None),
+            )
+    except IntegrityError:
+        # Lost the race to an identical request
+        existing = in_flight.order_by('-id').first()
+        if existing:
+            return existing, False
+        raise
+    enqueue(report)
+    return report, True
+
+
+def enqueue(report):
+    """Dispatches once the creating transaction commits, so the worker can see the row."""
+    report_id = report.pk
+    transaction.on_commit(lambda: get_backend().submit(report_id))
+
+
+# ------------------------------------------------------------------
+# 3. EXECUTION
+# ------------------------------------------------------------------
+
+def run_job(report_id):
+    """Runs one queued job; a job already claimed by another worker is left alone."""
+    claimed = Report.objects.filter(pk=report_id, status='PENDING').update(status='RUNNING', started_at=timezone.now())
+    if not claimed:
+        return None
+    report = Report.objects.get(pk=report_id)
+    try:
+        if report.file_format == 'JSON':
+            # Key taken before computing: data written meanwhile invalidates this result
+            key = report_cache.result_key(report.report_type, report.tenant_id, report.filters_json)
+            report.result_json = reports.compute(report.report_type, report.tenant_id, report.filters_json)
+            report_cache.store(key, report.result_json)
+        else:
+            export.run_export(report)
+        report.status = 'COMPLETED'
+        report.error = ''
+    except Exception as exc:
+        logger.exception("Report job %s failed", report_id)
+        report.status = 'FAILED'
+        report.error = str(exc)
+    report.completed_at = timezone.now()
+    report.save(update_fields=['result_json', 'file', 'row_count', 'status', 'error', 'completed_at'])
+    return report
+
+
+def job_status(report):
+    """Polling payload for GET /reports/{id}/status/."""
+    data = {
+        "id": report.pk,
+        "report_type": report.report_type,
+        "file_format": report.file_format,
+        "status": report.status,
+        "generated_at": report.generated_at,
+        "started_at": report.started_at,
+        "completed_at": report.completed_at,
+        "error": report.error or None,
+    }
+    if report.status == 'COMPLETED':
+        if report.file_format == 'JSON':
+            data["result"] = report.result_json
+        else:
+            data["row_count"] = report.row_count
+            data["download"] = reverse('report-download', args=[report.pk])
+    return data
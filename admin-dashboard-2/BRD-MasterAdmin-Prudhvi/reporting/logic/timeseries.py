@@ -0,0 +1,337 @@
+# reporting/logic/timeseries.py
+import datetime
+from decimal import Decimal
+
+from django.db.models import Case, Count, DateField, F, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from tenants.models import FinancialYear, ReportingPeriod
+from los.models import LoanApplication
+from lms.models import Repayment
+from reporting.models import DailyMetric
+from . import rollup
+
+# Bucketed series over the DailyMetric rollup: one grouped query per series covers the
+# window and its comparison window, gaps are zero-filled in Python. Branch-filtered
+# requests fall back to the source tables, since the rollup is per tenant only.
+
+GRANULARITIES = ('day', 'week', 'month', 'quarter')
+COMPARISONS = ('previous', 'year')
+MAX_POINTS = 1000
+DEFAULT_FY_START_MONTH = 4  # April, when the tenant has no FinancialYear configured
+
+# Buckets a "year" comparison steps back by (364 days / 52 weeks keep weekdays aligned)
+YEAR_STEPS = {'day': 364, 'week': 52, 'month': 12, 'quarter': 4}
+
+
+# ------------------------------------------------------------------
+# 1. SERIES: name -> (value metric, count metric, raw source)
+# ------------------------------------------------------------------
+
+def _repayments(tenant_id, branch_id):
+    queryset = Repayment.objects.all()
+    if tenant_id:
+        queryset = queryset.filter(loan_account__loan_application__tenant_id=tenant_id)
+    if branch_id:
+        queryset = queryset.filter(loan_account__loan_application__branch_id=branch_id)
+    return queryset, 'paid_at'
+
+
+def _disbursed(tenant_id, branch_id):
+    # Same convention as rollup.rebuild: a disbursement is dated by the application's disbursed_at
+    queryset = LoanApplication.objects.filter(status='DISBURSED')
+    if tenant_id:
+        queryset = queryset.filter(tenant_id=tenant_id)
+    if branch_id:
+        queryset = queryset.filter(branch_id=branch_id)
+    return queryset, 'disbursed_at'
+
+
+def _applications(tenant_id, branch_id):
+    queryset = LoanApplication.objects.all()
+    if tenant_id:
+        queryset = queryset.filter(tenant_id=tenant_id)
+    if branch_id:
+        queryset = queryset.filter(branch_id=branch_id)
+    return queryset, 'created_at'
+
+
+SERIES = {
+    'collections': (rollup.COLLECTIONS_AMOUNT, rollup.REPAYMENTS_COUNT, _repayments, Sum('amount')),
+    'repayments': (rollup.REPAYMENTS_COUNT, None, _repayments, Count('id')),
+    'disbursements': (rollup.DISBURSED_AMOUNT, rollup.DISBURSED_COUNT, _disbursed, Sum('requested_amount')),
+    'applications': (rollup.APPLICATIONS_CREATED, None, _applications, Count('id')),
+}
+
+
+# ------------------------------------------------------------------
+# 2. CALENDAR
+# ------------------------------------------------------------------
+
+def add_months(day, months):
+    month = day.month - 1 + months
+    year, month = day.year + month // 12, month % 12 + 1
+    last = (datetime.date(year + month // 12, month % 12 + 1, 1) - datetime.timedelta(days=1)).day
+    return day.replace(year=year, month=month, day=min(day.day, last))
+
+
+def bucket_start(day, granularity, fy_start_month=DEFAULT_FY_START_MONTH):
+    if granularity == 'day':
+        return day
+    if granularity == 'week':
+        return day - datetime.timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    # Fiscal quarters are counted from the financial year's first month
+    offset = (day.month - fy_start_month) % 3
+    return add_months(day.replace(day=1), -offset)
+
+
+def shift(day, granularity, steps):
+    if granularity == 'day':
+        return day + datetime.timedelta(days=steps)
+    if granularity == 'week':
+        return day + datetime.timedelta(weeks=steps)
+    return add_months(day, steps * (3 if granularity == 'quarter' else 1))
+
+
+def buckets(start, end, granularity, fy_start_month=DEFAULT_FY_START_MONTH):
+    current = bucket_start(start, granularity, fy_start_month)
+    result = []
+    while current <= end:
+        result.append(current)
+        current = shift(current, granularity, 1)
+    return result
+
+
+def label(day, granularity, fy_start_month=DEFAULT_FY_START_MONTH):
+    if granularity == 'day':
+        return day.strftime('%d %b %Y')
+    if granularity == 'week':
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    if granularity == 'month':
+        return day.strftime('%b %Y')
+    fy_start_year = day.year if day.month >= fy_start_month else day.year - 1
+    quarter = (day.month - fy_start_month) % 12 // 3 + 1
+    if fy_start_month == 1:
+        return f"Q{quarter} {fy_start_year}"
+    return f"Q{quarter} FY{fy_start_year % 100:02d}-{(fy_start_year + 1) % 100:02d}"
+
+
+def _date(filters, key):
+    value = filters.get(key)
+    return datetime.date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _financial_years(tenant_id):
+    years = FinancialYear.objects.all()
+    return years.filter(tenant_id=tenant_id) if tenant_id else years
+
+
+def fy_start_month(tenant_id, on=None):
+    """First month of the tenant's financial year (the one covering `on`, else the latest active)."""
+    on = on or timezone.localdate()
+    years = _financial_years(tenant_id).filter(is_active=True)
+    year = years.filter(start__lte=on, end__gte=on).first() or years.first()
+    return year.start.month if year else DEFAULT_FY_START_MONTH
+
+
+def resolve_window(tenant_id, filters, granularity):
+    """
+    Returns (start, end, period) from, in order: financial_year / reporting_period ids,
+    period="fy" (the financial year covering today), start_date / end_date, or a default
+    span that ends today.
+    """
+    today = timezone.localdate()
+    if filters.get('financial_year'):
+        year = _financial_years(tenant_id).filter(pk=filters['financial_year']).first()
+        if year is None:
+            raise ValidationError({"financial_year": "Financial year not found"})
+        return year.start, year.end, {"type": "financial_year", "id": year.pk, "name": year.name}
+    if filters.get('reporting_period'):
+        periods = ReportingPeriod.objects.filter(pk=filters['reporting_period'])
+        if tenant_id:
+            periods = periods.filter(tenant_id=tenant_id)
+        period = periods.first()
+        if period is None:
+            raise ValidationError({"reporting_period": "Reporting period not found"})
+        return period.start, period.end, {"type": "reporting_period", "id": period.pk, "name": period.name}
+    if filters.get('period') == 'fy':
+        year = _financial_years(tenant_id).filter(is_active=True, start__lte=today, end__gte=today).first()
+        if year:
+            return year.start, year.end, {"type": "financial_year", "id": year.pk, "name": year.name}
+        start_month = fy_start_month(tenant_id, today)
+        start = datetime.date(today.year if today.month >= start_month else today.year - 1, start_month, 1)
+        return start, add_months(start, 12) - datetime.timedelta(days=1), {"type": "financial_year", "id": None, "name": None}
+
+    end = _date(filters, 'end_date') or today
+    start = _date(filters, 'start_date')
+    if start is None:
+        spans = {'day': 29, 'week': 11, 'month': 11, 'quarter': 7}
+        start = shift(bucket_start(end, granularity, fy_start_month(tenant_id, end)), granularity, -spans[granularity])
+    return start, end, {"type": "range", "id": None, "name": None}
+
+
+# ------------------------------------------------------------------
+# 3. AGGREGATION
+# ------------------------------------------------------------------
+
+def _trunc(field, granularity, is_date=False):
+    if granularity == 'day':
+        return F(field) if is_date else TruncDate(field)
+    if granularity == 'week':
+        return TruncWeek(field, output_field=DateField())
+    # Quarters are folded from months in Python so they follow the financial year, not the calendar
+    return TruncMonth(field, output_field=DateField())
+
+
+def _window(lookup, ranges):
+    """0 for rows in the requested range, 1 for rows in the comparison range."""
+    start, end = ranges[0]
+    return Case(
+        When(**{f"{lookup}__gte": start, f"{lookup}__lte": end}, then=Value(0)),
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+
+
+def _in_ranges(lookup, ranges):
+    condition = Q()
+    for start, end in ranges:
+        condition |= Q(**{f"{lookup}__gte": start, f"{lookup}__lte": end})
+    return condition
+
+
+def _grouped(series, tenant_id, branch_id, ranges, granularity):
+    """Yields (window, bucket date, value, count) for every range in a single grouped query."""
+    value_metric, count_metric, source, aggregate = SERIES[series]
+    if branch_id:
+        queryset, field = source(tenant_id, branch_id)
+        rows = (
+            queryset.filter(_in_ranges(f"{field}__date", ranges))
+            .annotate(window=_window(f"{field}__date", ranges), bucket=_trunc(field, granularity))
+            .values('window', 'bucket')
+            .annotate(value=aggregate, count=Count('id'))
+            .order_by()
+        )
+        for row in rows:
+            yield row['window'], row['bucket'], row['value'] or 0, row['count']
+        return
+
+    metrics = DailyMetric.objects.filter(metric__in=[m for m in (value_metric, count_metric) if m])
+    if tenant_id:
+        metrics = metrics.filter(tenant_id=tenant_id)
+    rows = (
+        metrics.filter(_in_ranges('as_of_date', ranges))
+        .annotate(window=_window('as_of_date', ranges), bucket=_trunc('as_of_date', granularity, is_date=True))
+        .values('window', 'bucket', 'metric')
+        .annotate(total=Sum('value'))
+        .order_by()
+    )
+    for row in rows:
+        total = row['total'] or 0
+        if row['metric'] == value_metric:
+            yield row['window'], row['bucket'], total, total if count_metric is None else 0
+        else:
+            yield row['window'], row['bucket'], 0, total
+
+
+def _number(value):
+    return float(round(Decimal(value), 2))
+
+
+def _change(current, previous):
+    if not previous:
+        return None
+    return round(float((current - previous) / previous * 100), 1)
+
+
+def build_series(tenant_id=None, filters=None):
+    """
+    filters: series, granularity, compare ("previous" | "year"), financial_year,
+    reporting_period, period ("fy"), start_date, end_date, branch.
+    """
+    filters = filters or {}
+    series = filters.get('series') or 'collections'
+    granularity = filters.get('granularity') or 'month'
+    compare = filters.get('compare') or None
+    if series not in SERIES:
+        raise ValidationError({"series": f"Choose one of {', '.join(SERIES)}"})
+    if granularity not in GRANULARITIES:
+        raise ValidationError({"granularity": f"Choose one of {', '.join(GRANULARITIES)}"})
+    if compare and compare not in COMPARISONS:
+        raise ValidationError({"compare": f"Choose one of {', '.join(COMPARISONS)}"})
+    branch_id = filters.get('branch') if filters.get('branch') not in (None, '', 'all') else None
+
+    start, end, period = resolve_window(tenant_id, filters, granularity)
+    if start > end:
+        raise ValidationError({"start_date": "start_date must be before end_date"})
+    start_month = fy_start_month(tenant_id, start)
+    points = buckets(start, end, granularity, start_month)
+    if len(points) > MAX_POINTS:
+        raise ValidationError({"granularity": f"Too many points ({len(points)}); use a coarser granularity"})
+
+    if compare == 'year' and len(points) > YEAR_STEPS[granularity]:
+        # A longer window would overlap its own comparison and count the same rows in both series
+        raise ValidationError({"compare": f"A year comparison covers at most {YEAR_STEPS[granularity]} {granularity}s"})
+
+    ranges = [(start, end)]
+    steps = 0
+    if compare:
+        steps = len(points) if compare == 'previous' else YEAR_STEPS[granularity]
+        # The end is shifted as an exclusive bound so month ends stay month ends (30 Jun -> 31 Mar)
+        one_day = datetime.timedelta(days=1)
+        ranges.append((shift(start, granularity, -steps), shift(end + one_day, granularity, -steps) - one_day))
+
+    current = {point: [Decimal(0), 0] for point in points}
+    previous = {point: [Decimal(0), 0] for point in points}
+    for window, day, value, count in _grouped(series, tenant_id, branch_id, ranges, granularity):
+        if window == 0:
+            target = current.get(bucket_start(day, granularity, start_month))
+        else:
+            # Comparison buckets line up with the requested ones `steps` buckets later
+            target = previous.get(shift(bucket_start(day, granularity, start_month), granularity, steps))
+        if target is not None:
+            target[0] += Decimal(value)
+            target[1] += int(count)
+
+    rows = []
+    for point in points:
+        value, count = current[point]
+        row = {
+            "period": point.isoformat(),
+            "label": label(point, granularity, start_month),
+            "value": _number(value),
+            "count": count,
+        }
+        if compare:
+            prev_value, prev_count = previous[point]
+            row.update({
+                "previous_period": shift(point, granularity, -steps).isoformat(),
+                "previous_value": _number(prev_value),
+                "previous_count": prev_count,
+                "change_pct": _change(value, prev_value),
+            })
+        rows.append(row)
+
+    total = sum((current[p][0] for p in points), Decimal(0))
+    totals = {"value": _number(total), "count": sum(current[p][1] for p in points)}
+    if compare:
+        prev_total = sum((previous[p][0] for p in points), Decimal(0))
+        totals.update({"previous_value": _number(prev_total), "change_pct": _change(total, prev_total)})
+
+    return {
+        "series": series,
+        "granularity": granularity,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "period": period,
+        "compare": compare,
+        "comparison_start": ranges[1][0].isoformat() if compare else None,
+        "comparison_end": ranges[1][1].isoformat() if compare else None,
+        "points": rows,
+        "totals": totals,
+    }
@@ -0,0 +1,44 @@
+# reporting/logic/user_activity.py
+from django.contrib.auth import get_user_model
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from los.models import LoanApplication
+from crm.models import LeadActivity
+from users.models import AuditLog, LoginActivity
+
+User = get_user_model()
+
+
+def _per_user_count(queryset, user_field):
+    """Correlated COUNT subquery so every per-user counter rides on the single user query."""
+    counts = (
+        queryset.filter(**{user_field: OuterRef('pk')})
+        .order_by()
+        .values(user_field)
+        .annotate(total=Count('pk'))
+        .values('total')[:1]
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def annotated_users(tenant_id=None):
+    """Users with their login/application/action/approval counters and last successful login."""
+    users = User.objects.all()
+    if tenant_id:
+        users = users.filter(tenant_id=tenant_id)
+    last_login = (
+        LoginActivity.objects.filter(user=OuterRef('pk'), successful=True)
+        .order_by('-timestamp')
+        .values('timestamp')[:1]
+    )
+    return (
+        users.only('id', 'email', 'first_name', 'last_name', 'role', 'last_login', 'created_at')
+        .annotate(
+            applications_count=_per_user_count(LoanApplication.objects.all(), 'created_by'),
+            actions_count=_per_user_count(LeadActivity.objects.all(), 'user'),
+            approvals_count=_per_user_count(AuditLog.objects.filter(action_type='APPROVE'), 'user'),
+            logins_count=_per_user_count(LoginActivity.objects.filter(successful=True), 'user'),
+            last_seen=Subquery(last_login),
+        )
+    )
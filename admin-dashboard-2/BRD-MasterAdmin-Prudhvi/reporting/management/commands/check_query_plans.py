@@ -0,0 +1,97 @@
+import datetime
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from los.models import LoanApplication
+from lms.models import Installment, LoanAccount, Repayment
+from crm.models import Lead
+from users.models import AuditLog, LoginActivity
+from reporting.models import DailyMetric
+from reporting.logic import export, rollup
+from reporting.logic.user_activity import annotated_users
+
+# Placeholder ids: plans depend on the predicates, not on whether the rows exist
+TENANT, BRANCH, ACCOUNT, USER = 1, 1, 1, 1
+
+
+def known_queries():
+    """(name, queryset) for the tenant-scoped list and report queries that must stay index-backed."""
+    today = timezone.localdate()
+    since = timezone.now() - datetime.timedelta(days=30)
+    window = {'start_date': today - datetime.timedelta(days=30), 'end_date': today}
+    queries = [
+        ("applications list", LoanApplication.objects.filter(tenant_id=TENANT).order_by('-created_at')),
+        ("disbursed in window", LoanApplication.objects.filter(
+            tenant_id=TENANT, status='DISBURSED', updated_at__gte=since)),
+        ("branch pipeline", LoanApplication.objects.filter(branch_id=BRANCH, status='APPROVED')),
+        ("account repayments", Repayment.objects.filter(loan_account_id=ACCOUNT).order_by('-paid_at')),
+        ("repayments in window", Repayment.objects.filter(paid_at__gte=since)),
+        ("leads list", Lead.objects.filter(tenant_id=TENANT).order_by('-created_at')),
+        ("audit log", AuditLog.objects.filter(tenant_id=TENANT).order_by('-timestamp')),
+        ("last login", LoginActivity.objects.filter(user_id=USER, successful=True).order_by('-timestamp')[:1]),
+        ("daily metric series", DailyMetric.objects.filter(
+            tenant_id=TENANT, metric__in=[rollup.COLLECTIONS_AMOUNT, rollup.REPAYMENTS_COUNT],
+            as_of_date__gte=window['start_date'], as_of_date__lte=window['end_date'])),
+        ("overdue installments", Installment.objects.filter(due_date__lt=today, principal_paid=0)),
+        ("npa accounts", LoanAccount.objects.filter(asset_class='NPA', dpd__gte=91)),
+        ("user activity", annotated_users(TENANT)),
+    ]
+    for report_type in ('DISBURSEMENT', 'LOAN_APPROVAL', 'BORROWER', 'USER_ACTIVITY'):
+        source = export.get_dataset(report_type, TENANT, window)[1]
+        queries.append((f"{report_type.lower()} export", source))
+    return queries
+
+
+# ------------------------------------------------------------------
+# Plan inspection per backend: returns the full-scan lines of a plan
+# ------------------------------------------------------------------
+
+def _sqlite_scans(plan):
+    # "SCAN t" is a table scan; "SCAN t USING [COVERING] INDEX i" walks an index
+    return [line for line in plan.splitlines() if re.search(r'\bSCAN \w+\s*$', line.strip())]
+
+
+def _postgres_scans(plan):
+    return [line for line in plan.splitlines() if 'Seq Scan' in line]
+
+
+def explain(queryset):
+    if connection.vendor == 'postgresql':
+        # Tiny dev tables make a seq scan "cheapest"; disabling it shows whether an index exists at all
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+        return plan, _postgres_scans(plan)
+    if connection.vendor == 'sqlite':
+        plan = queryset.explain()
+        return plan, _sqlite_scans(plan)
+    raise CommandError(f"Plan checks are not implemented for {connection.vendor}")
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the known report and list queries and fail if any of them falls back to a full table scan"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--only", help="Run only queries whose name contains this text")
+
+    def handle(self, *args, **options):
+        failures = []
+        for name, queryset in known_queries():
+            if options["only"] and options["only"] not in name:
+                continue
+            plan, scans = explain(queryset)
+            if options["verbosity"] > 1:
+                self.stdout.write(f"-- {name}\n{plan}\n")
+            if scans:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"FULL SCAN  {name}: {'; '.join(s.strip() for s in scans)}"))
+            else:
+                self.stdout.write(f"ok         {name}")
+
+        if failures:
+            raise CommandError(f"{len(failures)} queries fall back to a full scan: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("All query plans use indexes."))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tenants.models import Tenant
+from reporting.logic import rollup
+
+
+class Command(BaseCommand):
+    help = "Recompute the DailyMetric rollup table from loan applications and repayments"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tenant", help="tenant_id (UUID) to rebuild; defaults to all tenants")
+
+    def handle(self, *args, **options):
+        tenant_id = None
+        if options["tenant"]:
+            tenant = Tenant.objects.filter(tenant_id=options["tenant"]).first()
+            if not tenant:
+                raise CommandError(f"Tenant {options['tenant']} not found")
+            tenant_id = tenant.pk
+
+        rows = rollup.rebuild(tenant_id=tenant_id)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} daily metric rows."))
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0015_chargeconfig_interestconfig_repaymentconfig_riskrule_and_more'),
+        ('reporting', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=100)),
+                ('value', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('as_of_date', models.DateField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('tenant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='tenants.tenant')),
+            ],
+            options={
+                'db_table': 'daily_metrics',
+                'ordering': ['-as_of_date'],
+                'indexes': [models.Index(fields=['metric', 'as_of_date'], name='daily_metric_metric_date')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailymetric',
+            constraint=models.UniqueConstraint(fields=('tenant', 'metric', 'as_of_date'), name='uniq_daily_metric'),
+        ),
+    ]
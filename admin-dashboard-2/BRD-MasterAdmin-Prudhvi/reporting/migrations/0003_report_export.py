@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('reporting', '0002_dailymetric'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='file',
+            field=models.FileField(blank=True, null=True, upload_to='reports/%Y/%m/'),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='file_format',
+            field=models.CharField(choices=[('CSV', 'CSV'), ('XLSX', 'Excel (XLSX)')], default='CSV', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='requested_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='row_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='report_type',
+            field=models.CharField(choices=[('RISK', 'Risk Report'), ('PORTFOLIO', 'Portfolio Report'), ('COLLECTION', 'Collection Report'), ('BORROWER', 'Borrower Summary'), ('DISBURSEMENT', 'Daily Disbursement'), ('BRANCH_PERFORMANCE', 'Branch Performance'), ('LOAN_APPROVAL', 'Loan Approval'), ('NPA', 'NPA Report'), ('REVENUE', 'Revenue Report'), ('USER_ACTIVITY', 'User Activity')], max_length=30),
+        ),
+    ]
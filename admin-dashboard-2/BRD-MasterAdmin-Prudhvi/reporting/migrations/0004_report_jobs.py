@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0003_report_export'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='report',
+            name='filters_hash',
+            field=models.CharField(blank=True, max_length=40),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='result_json',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='report',
+            name='file_format',
+            field=models.CharField(choices=[('JSON', 'JSON (API result)'), ('CSV', 'CSV'), ('XLSX', 'Excel (XLSX)')], default='CSV', max_length=10),
+        ),
+        migrations.AddConstraint(
+            model_name='report',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['PENDING', 'RUNNING']), models.Q(('filters_hash', ''), _negated=True)), fields=('tenant', 'report_type', 'file_format', 'filters_hash'), name='uniq_report_job_in_flight'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0004_report_jobs'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='report',
+            name='report_type',
+            field=models.CharField(choices=[('RISK', 'Risk Report'), ('PORTFOLIO', 'Portfolio Report'), ('COLLECTION', 'Collection Report'), ('BORROWER', 'Borrower Summary'), ('DISBURSEMENT', 'Daily Disbursement'), ('BRANCH_PERFORMANCE', 'Branch Performance'), ('LOAN_APPROVAL', 'Loan Approval'), ('NPA', 'NPA Report'), ('REVENUE', 'Revenue Report'), ('USER_ACTIVITY', 'User Activity'), ('TIMESERIES', 'Time Series')], max_length=30),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:20
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def merge_platform_duplicates(apps, schema_editor):
+    # The old constraint let tenant-less rows repeat; fold each group into its oldest row
+    DailyMetric = apps.get_model('reporting', 'DailyMetric')
+    duplicates = (
+        DailyMetric.objects.filter(tenant__isnull=True)
+        .values('metric', 'as_of_date')
+        .annotate(rows=Count('id'), total=Sum('value'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for group in duplicates:
+        rows = DailyMetric.objects.filter(
+            tenant__isnull=True, metric=group['metric'], as_of_date=group['as_of_date'],
+        ).order_by('id')
+        keep = rows.first()
+        rows.exclude(pk=keep.pk).delete()
+        DailyMetric.objects.filter(pk=keep.pk).update(value=group['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0005_timeseries_report_type'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_platform_duplicates, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='dailymetric',
+            name='uniq_daily_metric',
+        ),
+        migrations.AddConstraint(
+            model_name='dailymetric',
+            constraint=models.UniqueConstraint(condition=models.Q(('tenant__isnull', False)), fields=('tenant', 'metric', 'as_of_date'), name='uniq_daily_metric'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailymetric',
+            constraint=models.UniqueConstraint(condition=models.Q(('tenant__isnull', True)), fields=('metric', 'as_of_date'), name='uniq_daily_metric_platform'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:05
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+from django.utils import timezone
+
+
+def fail_duplicate_platform_jobs(apps, schema_editor):
+    # Keep the newest in-flight platform job per request; the rest could never be picked up again
+    Report = apps.get_model('reporting', 'Report')
+    in_flight = Report.objects.filter(tenant__isnull=True, status__in=['PENDING', 'RUNNING']).exclude(filters_hash='')
+    duplicates = (
+        in_flight.values('report_type', 'file_format', 'filters_hash')
+        .annotate(jobs=Count('id'), newest=Max('id'))
+        .filter(jobs__gt=1)
+        .order_by()
+    )
+    for group in duplicates:
+        in_flight.filter(
+            report_type=group['report_type'], file_format=group['file_format'], filters_hash=group['filters_hash'],
+        ).exclude(pk=group['newest']).update(status='FAILED', error="Duplicate job", completed_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0006_daily_metric_platform_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_platform_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='report',
+            constraint=models.UniqueConstraint(condition=models.Q(('tenant__isnull', True), ('status__in', ['PENDING', 'RUNNING']), models.Q(('filters_hash', ''), _negated=True)), fields=('report_type', 'file_format', 'filters_hash'), name='uniq_platform_report_job_in_flight'),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from tenants.models import Tenant
 
@@ -7,6 +8,26 @@ REPORT_TYPE_CHOICES = [
     ('PORTFOLIO', 'Portfolio Report'),
     ('COLLECTION', 'Collection Report'),
     ('BORROWER', 'Borrower Summary'),
+    ('DISBURSEMENT', 'Daily Disbursement'),
+    ('BRANCH_PERFORMANCE', 'Branch Performance'),
+    ('LOAN_APPROVAL', 'Loan Approval'),
+    ('NPA', 'NPA Report'),
+    ('REVENUE', 'Revenue Report'),
+    ('USER_ACTIVITY', 'User Activity'),
+    ('TIMESERIES', 'Time Series'),
+]
+
+FILE_FORMAT_CHOICES = [
+    ('JSON', 'JSON (API result)'),
+    ('CSV', 'CSV'),
+    ('XLSX', 'Excel (XLSX)'),
+]
+
+REPORT_STATUS_CHOICES = [
+    ('PENDING', 'Pending'),
+    ('RUNNING', 'Running'),
+    ('COMPLETED', 'Completed'),
+    ('FAILED', 'Failed'),
 ]
 
 
@@ -17,9 +38,40 @@ class Report(models.Model):
     filters_json = models.JSONField(default=dict, blank=True)  # to store dynamic filters
     generated_at = models.DateTimeField(auto_now_add=True)
 
+    # Export output (see reporting/logic/export.py)
+    file_format = models.CharField(max_length=10, choices=FILE_FORMAT_CHOICES, default='CSV')
+    status = models.CharField(max_length=20, choices=REPORT_STATUS_CHOICES, default='PENDING')
+    file = models.FileField(upload_to='reports/%Y/%m/', null=True, blank=True)
+    row_count = models.IntegerField(default=0)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    # Job runner (see reporting/logic/jobs.py)
+    filters_hash = models.CharField(max_length=40, blank=True)
+    result_json = models.JSONField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         db_table = 'reports'
         ordering = ['-generated_at']
+        constraints = [
+            # At most one queued/running job per identical request (rows from before the runner have no hash)
+            models.UniqueConstraint(
+                fields=['tenant', 'report_type', 'file_format', 'filters_hash'],
+                condition=models.Q(status__in=['PENDING', 'RUNNING']) & ~models.Q(filters_hash=''),
+                name='uniq_report_job_in_flight',
+            ),
+            # Same rule for platform-wide jobs: NULL tenants never collide under the constraint above
+            models.UniqueConstraint(
+                fields=['report_type', 'file_format', 'filters_hash'],
+                condition=(
+                    models.Q(tenant__isnull=True) & models.Q(status__in=['PENDING', 'RUNNING'])
+                    & ~models.Q(filters_hash='')
+                ),
+                name='uniq_platform_report_job_in_flight',
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -37,3 +89,36 @@ class Analytics(models.Model):
 
     def __str__(self):
         return f"{self.metric} - {self.as_of_date}"
+
+
+class DailyMetric(models.Model):
+    """
+    Pre-aggregated per-tenant, per-day counters (same metric/value/as_of_date shape as Analytics).
+    Rows are maintained incrementally by reporting.signals and reporting.logic.rollup.
+    """
+    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE, null=True, blank=True)
+    metric = models.CharField(max_length=100)
+    value = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    as_of_date = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'daily_metrics'
+        ordering = ['-as_of_date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tenant', 'metric', 'as_of_date'], condition=models.Q(tenant__isnull=False),
+                name='uniq_daily_metric',
+            ),
+            # NULLs never compare equal, so platform-wide rows (tenant NULL) need their own constraint
+            models.UniqueConstraint(
+                fields=['metric', 'as_of_date'], condition=models.Q(tenant__isnull=True),
+                name='uniq_daily_metric_platform',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['metric', 'as_of_date'], name='daily_metric_metric_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.metric} - {self.as_of_date}"
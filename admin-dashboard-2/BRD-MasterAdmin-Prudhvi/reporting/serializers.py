@@ -5,6 +5,8 @@ class ReportSerializer(serializers.ModelSerializer):
     class Meta:
         model = Report
         fields = '__all__'
+        # Filled in by the export worker (reporting/logic/export.py)
+        read_only_fields = ['tenant', 'status', 'file', 'row_count', 'error', 'requested_by', 'completed_at']
 
 class AnalyticsSerializer(serializers.ModelSerializer):
     class Meta:
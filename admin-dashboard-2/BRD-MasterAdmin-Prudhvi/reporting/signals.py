@@ -0,0 +1,77 @@
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from los.models import LoanApplication
+from lms.models import LoanAccount, Repayment
+from .logic import rollup
+
+
+def _created_day(instance):
+    # Created and status counters are filed under the application's created_at date (as
+    # rollup.rebuild does); deleted rows only have the post_init snapshot left.
+    created_at = instance.__dict__.get('created_at') or instance._rollup_created_at
+    return timezone.localdate(created_at) if created_at else None
+
+
+def _disbursed_day(instance):
+    # Disbursements are filed under the day the application was disbursed (as rollup.rebuild
+    # does); on reversal save() has already cleared disbursed_at, so fall back to the snapshot.
+    disbursed_at = instance.__dict__.get('disbursed_at') or instance._rollup_disbursed_at
+    return timezone.localdate(disbursed_at) if disbursed_at else None
+
+
+@receiver(post_init, sender=LoanApplication)
+def remember_application_status(sender, instance, **kwargs):
+    # Snapshot of the persisted values so post_save can compute deltas without a query.
+    # Deferred fields are left out of __dict__; reading them here would cost a query per row.
+    instance._rollup_status = instance.__dict__.get('status') if instance.pk else None
+    instance._rollup_amount = instance.__dict__.get('requested_amount') if instance.pk else None
+    instance._rollup_disbursed_at = instance.__dict__.get('disbursed_at') if instance.pk else None
+    instance._rollup_created_at = instance.__dict__.get('created_at') if instance.pk else None
+    instance._rollup_tracked = not instance.pk or 'status' in instance.__dict__
+
+
+@receiver(post_save, sender=LoanApplication)
+def rollup_application_saved(sender, instance, created, **kwargs):
+    if not (created or instance._rollup_tracked):
+        return
+    old_status = None if created else instance._rollup_status
+    entries = rollup.status_change_entries(
+        instance.tenant_id, old_status, instance.status, instance.requested_amount,
+        day=_created_day(instance), disbursed_day=_disbursed_day(instance),
+    )
+    if (
+        not created and old_status == instance.status == 'DISBURSED'
+        and instance._rollup_amount != instance.requested_amount
+    ):
+        delta = (instance.requested_amount or 0) - (instance._rollup_amount or 0)
+        entries.append((instance.tenant_id, rollup.DISBURSED_AMOUNT, _disbursed_day(instance), delta))
+    rollup.bump_many(entries)
+
+    instance._rollup_status = instance.status
+    instance._rollup_amount = instance.requested_amount
+    instance._rollup_disbursed_at = instance.disbursed_at
+    instance._rollup_tracked = True
+
+
+@receiver(post_delete, sender=LoanApplication)
+def rollup_application_deleted(sender, instance, **kwargs):
+    if not instance._rollup_tracked:
+        return
+    rollup.bump_many(rollup.status_change_entries(
+        instance.tenant_id, instance._rollup_status, None, instance._rollup_amount,
+        day=_created_day(instance), disbursed_day=_disbursed_day(instance),
+    ))
+
+
+@receiver(post_save, sender=Repayment)
+def rollup_repayment_posted(sender, instance, created, **kwargs):
+    if not created:
+        return
+    tenant_id = (
+        LoanAccount.objects.filter(pk=instance.loan_account_id)
+        .values_list('loan_application__tenant_id', flat=True)
+        .first()
+    )
+    rollup.record_repayments([(tenant_id, instance.amount, timezone.localdate(instance.paid_at))])
@@ -0,0 +1,10 @@
+# reporting/tasks.py
+# Registered on the brd_platform Celery app; used when REPORT_JOB_BACKEND = "celery" (see reporting/logic/jobs.py)
+from celery import shared_task
+
+from .logic import jobs
+
+
+@shared_task(name='reporting.run_report_job', ignore_result=True)
+def run_report_job(report_id):
+    jobs.run_job(report_id)
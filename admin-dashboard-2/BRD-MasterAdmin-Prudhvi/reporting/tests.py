@@ -1,3 +1,548 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import tempfile
+from decimal import Decimal
+from unittest import skipUnless
+from unittest.mock import patch
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import IntegrityError, connection, connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+
+from brd_platform import celery_app
+from tenants.models import Tenant, Branch, FinancialYear
+from crm.models import Customer, Lead, LeadActivity
+from los.models import LoanApplication
+from lms.models import LoanAccount, Repayment, Installment
+from lms.logic.classification import classify_accounts
+from .models import DailyMetric, Report
+from users.models import AuditLog, LoginActivity, User
+from .logic.branch_performance import BranchPerformanceEngine
+from .logic.npa import build_npa_report
+from .logic import export, jobs, report_cache, reports, rollup
+from .logic.timeseries import build_series
+
+
+def make_application(tenant, branch, customer, status='NEW', amount='100000'):
+    return LoanApplication.objects.create(
+        tenant=tenant, branch=branch, customer=customer,
+        first_name="Test", last_name="User", mobile_no="9999999999",
+        email="test@example.com", dob=datetime.date(1990, 1, 1),
+        pan_number="ABCDE1234F", gender="M",
+        res_address_line1="Line 1", res_city="Pune", res_state="MH", res_pincode="411001",
+        requested_amount=Decimal(amount), status=status,
+    )
+
+
+class BranchPerformanceEngineTests(TestCase):
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        self.customer = Customer.objects.create(name="Borrower", tenant=self.tenant)
+
+    def add_branches(self, count):
+        start = Branch.objects.count()
+        for i in range(start, start + count):
+            branch = Branch.objects.create(tenant=self.tenant, branch_code=f"BR{i:03d}", name=f"Branch {i:03d}")
+            disbursed = make_application(self.tenant, branch, self.customer, status='DISBURSED', amount='50000')
+            make_application(self.tenant, branch, self.customer, status='REJECTED')
+            account = LoanAccount.objects.create(loan_application=disbursed, outstanding_principal=Decimal('50000'))
+            Repayment.objects.create(loan_account=account, amount=Decimal('1500'))
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            rows = BranchPerformanceEngine(tenant_id=self.tenant.pk).run()
+        return len(ctx.captured_queries), rows
+
+    def test_query_count_is_constant_in_branch_count(self):
+        self.add_branches(2)
+        small_count, small_rows = self.count_queries()
+
+        self.add_branches(10)
+        large_count, large_rows = self.count_queries()
+
+        self.assertEqual(len(small_rows), 2)
+        self.assertEqual(len(large_rows), 12)
+        self.assertEqual(small_count, large_count)
+        self.assertGreater(small_count, 0)
+        self.assertLessEqual(large_count, 3)
+
+    def test_branch_totals(self):
+        self.add_branches(1)
+        row = BranchPerformanceEngine(tenant_id=self.tenant.pk).run()[0]
+
+        self.assertEqual(row['applications'], 2)
+        self.assertEqual(row['loans'], 1)
+        self.assertEqual(row['disbursed'], Decimal('50000'))
+        self.assertEqual(row['rejection_ratio'], 50.0)
+        self.assertEqual(row['collections'], Decimal('1500'))
+
+    def test_filters_by_tenant_and_date(self):
+        self.add_branches(1)
+        other = Tenant.objects.create(name="Other Bank", tenant_type="BANK", email="ops@other.test")
+        Branch.objects.create(tenant=other, branch_code="OT001", name="Other Branch")
+
+        self.assertEqual(len(BranchPerformanceEngine(tenant_id=self.tenant.pk).run()), 1)
+        self.assertEqual(len(BranchPerformanceEngine().run()), 2)
+
+        tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+        row = BranchPerformanceEngine(tenant_id=self.tenant.pk, start_date=tomorrow).run()[0]
+        self.assertEqual(row['applications'], 0)
+        self.assertEqual(row['collections'], Decimal('0'))
+
+
+class NPAClassificationTests(TestCase):
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        self.customer = Customer.objects.create(name="Borrower", tenant=self.tenant)
+        self.branch = Branch.objects.create(tenant=self.tenant, branch_code="BR001", name="Pune")
+        self.as_of = datetime.date(2026, 6, 30)
+
+    def add_account(self, days_overdue, paid=False):
+        application = make_application(self.tenant, self.branch, self.customer, status='DISBURSED')
+        account = LoanAccount.objects.create(loan_application=application, outstanding_principal=Decimal('100000'))
+        due = Decimal('5000') if paid else Decimal('0')
+        Installment.objects.create(
+            loan_account=account, installment_no=1, due_date=self.as_of - datetime.timedelta(days=days_overdue),
+            principal_due=Decimal('4000'), interest_due=Decimal('1000'),
+            principal_paid=min(due, Decimal('4000')), interest_paid=max(due - 4000, Decimal('0')),
+            closing_principal=Decimal('96000'),
+        )
+        return account
+
+    def test_dpd_buckets(self):
+        accounts = {days: self.add_account(days) for days in (0, 15, 45, 75, 120)}
+        summary = classify_accounts(tenant_id=self.tenant.pk, as_of=self.as_of)
+
+        classes = {days: LoanAccount.objects.get(pk=a.pk).asset_class for days, a in accounts.items()}
+        self.assertEqual(classes, {0: 'STANDARD', 15: 'SMA_0', 45: 'SMA_1', 75: 'SMA_2', 120: 'NPA'})
+        self.assertEqual(LoanAccount.objects.get(pk=accounts[120].pk).dpd, 120)
+        self.assertEqual(summary['updated'], 4)
+
+        # A second run only rewrites accounts whose DPD moved
+        summary = classify_accounts(tenant_id=self.tenant.pk, as_of=self.as_of)
+        self.assertEqual(summary['updated'], 0)
+
+    def test_paid_installments_are_not_overdue(self):
+        account = self.add_account(200, paid=True)
+        classify_accounts(tenant_id=self.tenant.pk, as_of=self.as_of)
+        self.assertEqual(LoanAccount.objects.get(pk=account.pk).asset_class, 'STANDARD')
+
+    def test_report_reads_bucket_totals(self):
+        self.add_account(120)
+        self.add_account(10)
+        self.add_account(0)
+        classify_accounts(tenant_id=self.tenant.pk, as_of=self.as_of)
+
+        with CaptureQueriesContext(connection) as ctx:
+            data = build_npa_report(self.tenant.pk)
+        self.assertLessEqual(len(ctx.captured_queries), 3)
+
+        self.assertEqual(data['kpi']['count'], 1)
+        self.assertEqual(data['kpi']['ratio'], "33.33%")
+        self.assertEqual(data['npaByBranch'][0]['branch'], "Pune")
+        self.assertEqual(data['npaByBranch'][0]['rate'], "33.33%")
+        categories = {row['category']: row['count'] for row in data['npaByCategory']}
+        self.assertEqual(categories, {'SMA-0': 1, 'SMA-1': 0, 'SMA-2': 0, 'NPA': 1})
+        self.assertEqual(data['asOf'], "2026-06-30")
+
+
+class ReportJobTests(TestCase):
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        customer = Customer.objects.create(name="Borrower", tenant=self.tenant)
+        branch = Branch.objects.create(tenant=self.tenant, branch_code="BR001", name="Pune")
+        application = make_application(self.tenant, branch, customer, status='DISBURSED')
+        self.account = LoanAccount.objects.create(loan_application=application, outstanding_principal=Decimal('100000'))
+
+    def test_identical_requests_share_one_job(self):
+        first, created = jobs.submit('REVENUE', self.tenant.pk, {'start_date': '2026-01-01'})
+        second, created_again = jobs.submit('REVENUE', self.tenant.pk, {'start_date': '2026-01-01'})
+        other, _ = jobs.submit('REVENUE', self.tenant.pk, {'start_date': '2026-02-01'})
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(first.pk, second.pk)
+        self.assertNotEqual(first.pk, other.pk)
+
+        jobs.run_job(first.pk)
+        first.refresh_from_db()
+        self.assertEqual(first.status, 'COMPLETED')
+        self.assertIsNotNone(report_cache.get('REVENUE', self.tenant.pk, {'start_date': '2026-01-01'}))
+        # A finished job no longer absorbs new requests
+        self.assertTrue(jobs.submit('REVENUE', self.tenant.pk, {'start_date': '2026-01-01'})[1])
+
+    def test_platform_jobs_are_deduplicated_too(self):
+        first, _ = jobs.submit('REVENUE', None, {'start_date': '2026-01-01'})
+        self.assertEqual(jobs.submit('REVENUE', None, {'start_date': '2026-01-01'})[0].pk, first.pk)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Report.objects.create(
+                name="Copy", report_type='REVENUE', file_format='JSON', filters_hash=first.filters_hash, status='PENDING',
+            )
+
+    def test_repayment_invalidates_cached_result(self):
+        compute = lambda: reports.compute('REVENUE', self.tenant.pk, {})
+        report_cache.get_or_compute('REVENUE', self.tenant.pk, {}, compute)
+        self.assertTrue(report_cache.get_or_compute('REVENUE', self.tenant.pk, {}, compute)[1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Repayment.objects.create(loan_account=self.account, amount=Decimal('2500'))
+        data, cached = report_cache.get_or_compute('REVENUE', self.tenant.pk, {}, compute)
+        self.assertFalse(cached)
+        self.assertEqual(data['summary']['total'], "₹2,500")
+
+
+class ReportJobBackendTests(TestCase):
+
+    def setUp(self):
+        self.addCleanup(setattr, jobs, '_backend', None)
+        jobs._backend = None
+
+    @override_settings(REPORT_JOB_BACKEND='celery', CELERY_BROKER_URL='')
+    def test_celery_without_broker_falls_back_to_local_workers(self):
+        self.assertIsInstance(jobs.get_backend(), jobs.LocalBackend)
+
+    @skipUnless(celery_app, "celery is not installed")
+    @override_settings(REPORT_JOB_BACKEND='celery', CELERY_BROKER_URL='memory://')
+    def test_celery_backend_runs_jobs_through_the_project_app(self):
+        from reporting.tasks import run_report_job
+
+        self.assertIs(run_report_job.app, celery_app)
+        self.assertIsInstance(jobs.get_backend(), jobs.CeleryBackend)
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, 'task_always_eager', False)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            report, _ = jobs.submit('REVENUE', None, {})
+        report.refresh_from_db()
+        self.assertEqual(report.status, 'COMPLETED')
+
+
+class ExportTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        customer = Customer.objects.create(name="Borrower", tenant=self.tenant)
+        make_application(self.tenant, None, customer, status='REJECTED')
+        LoanApplication.objects.update(first_name='=HYPERLINK("http://evil.test")', remarks="@SUM(A1:A2)")
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create_user(email="admin@acme.test", password="pw", tenant=self.tenant, role="ADMIN")
+        )
+
+    def export(self, file_format, **params):
+        return self.client.get('/api/v1/reports/export/', {'type': 'LOAN_APPROVAL', 'file_format': file_format, **params})
+
+    def test_csv_is_streamed_with_bom_and_escaped_cells(self):
+        response = self.export('csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        body = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(body.startswith('\ufeffApplication ID,Applied On,'))
+        header, row = list(csv.reader(io.StringIO(body.lstrip('\ufeff'))))
+        self.assertEqual(row[header.index('First Name')], '\'=HYPERLINK("http://evil.test")')
+        self.assertEqual(row[header.index('Remarks')], "'@SUM(A1:A2)")
+        self.assertEqual(row[header.index('Status')], 'REJECTED')
+
+    def test_xlsx_is_written_with_escaped_cells(self):
+        response = self.export('xlsx')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], export.CONTENT_TYPES['XLSX'])
+        sheet = load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True).active
+        header, row = [list(values) for values in sheet.iter_rows(values_only=True)]
+        self.assertEqual(row[header.index('First Name')], '\'=HYPERLINK("http://evil.test")')
+        self.assertEqual(row[header.index('Remarks')], "'@SUM(A1:A2)")
+
+    def test_large_exports_become_jobs_served_from_download(self):
+        with patch.object(export, 'ASYNC_ROWS', 0):
+            response = self.export('csv')
+        self.assertEqual(response.status_code, 202)
+        report_id = response.data['id']
+        self.assertEqual(self.client.get(f'/api/v1/reports/{report_id}/download/').status_code, 409)
+
+        jobs.run_job(report_id)
+        status = self.client.get(f'/api/v1/reports/{report_id}/status/').data
+        self.assertEqual((status['status'], status['row_count']), ('COMPLETED', 1))
+        download = self.client.get(status['download'])
+        self.assertEqual(download.status_code, 200)
+        body = b''.join(download.streaming_content).decode('utf-8')
+        self.assertTrue(body.startswith('\ufeffApplication ID,'))
+        self.assertIn("'@SUM(A1:A2)", body)
+
+
+class TimeSeriesTests(TestCase):
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        customer = Customer.objects.create(name="Borrower", tenant=self.tenant)
+        self.branch = Branch.objects.create(tenant=self.tenant, branch_code="BR001", name="Pune")
+        application = make_application(self.tenant, self.branch, customer, status='DISBURSED')
+        account = LoanAccount.objects.create(loan_application=application, outstanding_principal=Decimal('100000'))
+        for day, amount in [((2025, 5, 10), 100), ((2026, 1, 15), 60), ((2026, 5, 3), 150), ((2026, 7, 20), 40)]:
+            paid_at = timezone.make_aware(datetime.datetime(*day, 12))
+            Repayment.objects.create(loan_account=account, amount=Decimal(amount), paid_at=paid_at)
+        self.year = FinancialYear.objects.create(
+            tenant=self.tenant, name="FY 2026-27", start=datetime.date(2026, 4, 1), end=datetime.date(2027, 3, 31),
+        )
+
+    def test_fiscal_quarters_with_year_comparison(self):
+        data = build_series(self.tenant.pk, {'financial_year': self.year.pk, 'granularity': 'quarter', 'compare': 'year'})
+        points = [(p['label'], p['value'], p['previous_value']) for p in data['points']]
+        self.assertEqual(points, [
+            ('Q1 FY26-27', 150.0, 100.0),
+            ('Q2 FY26-27', 40.0, 0.0),
+            ('Q3 FY26-27', 0.0, 0.0),
+            ('Q4 FY26-27', 0.0, 60.0),
+        ])
+        self.assertEqual(data['totals']['change_pct'], 18.8)
+
+    def test_months_are_zero_filled_and_distinct_across_years(self):
+        data = build_series(self.tenant.pk, {'start_date': '2025-05-01', 'end_date': '2026-05-31'})
+        self.assertEqual(len(data['points']), 13)
+        self.assertEqual(data['points'][0]['label'], "May 2025")
+        self.assertEqual(data['points'][-1]['label'], "May 2026")
+        self.assertEqual([p['value'] for p in data['points'] if p['value']], [100.0, 60.0, 150.0])
+
+    def test_branch_filter_matches_rollup(self):
+        filters = {'financial_year': self.year.pk, 'granularity': 'month', 'compare': 'previous'}
+        from_rollup = build_series(self.tenant.pk, filters)
+        from_source = build_series(self.tenant.pk, {**filters, 'branch': str(self.branch.pk)})
+        self.assertEqual(from_rollup['points'], from_source['points'])
+
+    def test_year_comparison_rejects_overlapping_day_ranges(self):
+        filters = {'start_date': '2025-05-01', 'end_date': '2026-04-29', 'granularity': 'day', 'compare': 'year'}
+        data = build_series(self.tenant.pk, filters)
+        self.assertEqual((len(data['points']), data['comparison_end']), (364, '2025-04-30'))
+
+        # One more day and the comparison window (stepped back 364 days) would overlap the requested one
+        client = APIClient()
+        client.force_authenticate(
+            User.objects.create_user(email="admin@acme.test", password="pw", tenant=self.tenant, role="ADMIN")
+        )
+        response = client.get('/api/v1/reports/timeseries/', {**filters, 'end_date': '2026-04-30'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('compare', response.data)
+
+
+class RollupSignalTests(TestCase):
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        self.customer = Customer.objects.create(name="Borrower", tenant=self.tenant)
+        self.branch = Branch.objects.create(tenant=self.tenant, branch_code="BR001", name="Pune")
+        self.today = timezone.localdate()
+
+    def counters(self):
+        return {
+            (row.metric, row.as_of_date): row.value
+            for row in DailyMetric.objects.filter(tenant=self.tenant) if row.value
+        }
+
+    def test_create_and_status_change_move_counters(self):
+        application = make_application(self.tenant, self.branch, self.customer)
+        application.status = 'APPROVED'
+        application.save()
+        self.assertEqual(self.counters(), {
+            (rollup.APPLICATIONS_CREATED, self.today): 1,
+            (rollup.status_metric('APPROVED'), self.today): 1,
+        })
+
+    def test_disbursement_is_dated_by_disbursed_at(self):
+        application = make_application(self.tenant, self.branch, self.customer, status='APPROVED')
+        disbursed_on = self.today - datetime.timedelta(days=3)
+        application.status = 'DISBURSED'
+        application.disbursed_at = timezone.make_aware(datetime.datetime.combine(disbursed_on, datetime.time(12)))
+        application.save()
+
+        counters = self.counters()
+        self.assertEqual(counters[(rollup.DISBURSED_AMOUNT, disbursed_on)], Decimal('100000'))
+        self.assertEqual(counters[(rollup.DISBURSED_COUNT, disbursed_on)], 1)
+
+        # A later edit of the disbursed amount adjusts the same day, as rebuild() would
+        application = LoanApplication.objects.get(pk=application.pk)
+        application.requested_amount = Decimal('120000')
+        application.save()
+        self.assertEqual(self.counters()[(rollup.DISBURSED_AMOUNT, disbursed_on)], Decimal('120000'))
+
+        live = self.counters()
+        rollup.rebuild(self.tenant.pk)
+        self.assertEqual(self.counters(), live)
+
+    def test_reversal_and_delete_take_counters_back(self):
+        application = make_application(self.tenant, self.branch, self.customer, status='DISBURSED')
+        application = LoanApplication.objects.get(pk=application.pk)
+        application.status = 'APPROVED'
+        application.save()
+        self.assertIsNone(application.disbursed_at)
+        self.assertNotIn((rollup.DISBURSED_AMOUNT, self.today), self.counters())
+
+        application.delete()
+        self.assertEqual(self.counters(), {})
+
+    def test_status_changes_stay_on_the_created_day(self):
+        application = make_application(self.tenant, self.branch, self.customer)
+        created_on = self.today - datetime.timedelta(days=5)
+        LoanApplication.objects.filter(pk=application.pk).update(
+            created_at=timezone.make_aware(datetime.datetime.combine(created_on, datetime.time(12))),
+        )
+        rollup.rebuild(self.tenant.pk)
+
+        application = LoanApplication.objects.get(pk=application.pk)
+        application.status = 'APPROVED'
+        application.save()
+        live = self.counters()
+        self.assertEqual(live, {
+            (rollup.APPLICATIONS_CREATED, created_on): 1,
+            (rollup.status_metric('APPROVED'), created_on): 1,
+        })
+        rollup.rebuild(self.tenant.pk)
+        self.assertEqual(self.counters(), live)
+
+        application.delete()
+        self.assertEqual(self.counters(), {})
+
+    def test_monthly_labels_carry_the_year(self):
+        for day in (datetime.date(2025, 1, 10), datetime.date(2026, 1, 10)):
+            rollup.bump(self.tenant.pk, rollup.DISBURSED_AMOUNT, day, 1000)
+        chart = rollup.build_dashboard_stats(self.tenant.pk)["charts"]["monthlyDisbursement"]
+        self.assertEqual([point["month"] for point in chart], ["Jan 2025", "Jan 2026"])
+
+    def test_platform_rows_are_unique(self):
+        rollup.bump(None, rollup.APPLICATIONS_CREATED, self.today, 1)
+        rollup.bump(None, rollup.APPLICATIONS_CREATED, self.today, 2)
+        row = DailyMetric.objects.get(tenant__isnull=True, metric=rollup.APPLICATIONS_CREATED)
+        self.assertEqual(row.value, 3)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            DailyMetric.objects.create(tenant=None, metric=rollup.APPLICATIONS_CREATED, as_of_date=self.today, value=1)
+
+
+class ReportTenantScopeTests(TestCase):
+
+    def setUp(self):
+        self.acme = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        self.globex = Tenant.objects.create(name="Globex Credit", tenant_type="NBFC", email="ops@globex.test")
+        make_application(self.globex, None, Customer.objects.create(name="Borrower", tenant=self.globex),
+                         status='REJECTED')
+
+    def rejected(self, user, tenant):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get('/api/v1/reports/loan-approval/', {'tenant': str(tenant.tenant_id)})
+        return response.status_code, response.data.get('overall', {}).get('rejected')
+
+    def test_tenant_users_are_pinned_to_their_tenant(self):
+        user = User.objects.create_user(email="analyst@acme.test", password="pw", tenant=self.acme, role="STAFF")
+        self.assertEqual(self.rejected(user, self.globex), (200, 0))
+
+    def test_users_without_tenant_are_refused(self):
+        user = User.objects.create_user(email="drifter@example.test", password="pw", role="STAFF")
+        self.assertEqual(self.rejected(user, self.globex)[0], 403)
+
+    def test_platform_users_pick_the_tenant(self):
+        admin = User.objects.create_user(email="root@platform.test", password="pw", role="MASTER_ADMIN")
+        self.assertEqual(self.rejected(admin, self.globex), (200, 1))
+
+
+class UserActivityReportTests(TestCase):
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        self.customer = Customer.objects.create(name="Borrower", tenant=self.tenant)
+        self.lead = Lead.objects.create(name="Walk-in", tenant=self.tenant)
+        self.admin = User.objects.create_user(email="admin@acme.test", password="pw", tenant=self.tenant, role="ADMIN")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def add_users(self, count):
+        for _ in range(count):
+            user = User.objects.create_user(
+                email=f"officer{User.objects.count()}@acme.test", password="pw", tenant=self.tenant, role="LOAN_OFFICER",
+            )
+            application = make_application(self.tenant, None, self.customer)
+            application.created_by = user
+            application.save()
+            LeadActivity.objects.create(lead=self.lead, user=user, action="Called")
+            AuditLog.objects.create(user=user, tenant=self.tenant, action_type="APPROVE", module="LOS",
+                                    description="approve", ip_address="127.0.0.1")
+            LoginActivity.objects.bulk_create([LoginActivity(user=user), LoginActivity(user=user, successful=False)])
+
+    def report(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/v1/reports/user-activity/', params)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.data
+
+    def test_query_count_is_constant_in_user_count(self):
+        self.add_users(2)
+        small_count, small = self.report()
+        self.add_users(8)
+        large_count, large = self.report()
+        self.assertEqual(small_count, large_count)
+        self.assertEqual(len(large["users"]), 11)
+
+    def test_counters_per_user(self):
+        self.add_users(1)
+        _, data = self.report()
+        officer = next(row for row in data["users"] if row["role"] == "LOAN_OFFICER")
+        self.assertEqual(
+            {key: officer[key] for key in ("logins", "applications", "actions", "approvals")},
+            {"logins": 1, "applications": 1, "actions": 1, "approvals": 1},
+        )
+        self.assertEqual(officer["lastActive"], timezone.localdate().isoformat())
+        self.assertEqual(data["kpi"]["sessions"], 1)
+
+    def test_pages_follow_the_cursor(self):
+        self.add_users(4)
+        _, first = self.report(page_size=3)
+        self.assertEqual(len(first["users"]), 3)
+        self.assertIsNone(first["previous"])
+        second = self.client.get(first["next"]).data
+        emails = [row["email"] for row in first["users"] + second["users"]]
+        self.assertEqual(len(emails), 5)
+        self.assertEqual(len(set(emails)), 5)
+        self.assertIsNone(second["next"])
+
+
+class QueryPlanTests(TestCase):
+
+    def test_known_queries_use_indexes(self):
+        call_command('check_query_plans', stdout=io.StringIO())
+
+    def test_full_scan_is_detected(self):
+        from .management.commands.check_query_plans import explain
+        _, scans = explain(LoanApplication.objects.filter(first_name="Test"))
+        self.assertTrue(scans)
+
+
+@override_settings(REPORTING_READ_DATABASE='replica')
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        customer = Customer.objects.create(name="Borrower", tenant=self.tenant)
+        make_application(self.tenant, None, customer, status='REJECTED')
+
+    def test_report_reads_use_replica(self):
+        with CaptureQueriesContext(connections['replica']) as replica, CaptureQueriesContext(connection) as primary:
+            data = reports.compute('LOAN_APPROVAL', self.tenant.pk, {})
+        self.assertEqual(data['overall']['rejected'], 1)
+        self.assertTrue(replica.captured_queries)
+        self.assertFalse(primary.captured_queries)
+
+    def test_other_reads_and_writes_use_default(self):
+        with CaptureQueriesContext(connections['replica']) as replica:
+            Tenant.objects.get(pk=self.tenant.pk)
+            Tenant.objects.filter(pk=self.tenant.pk).update(name="Renamed")
+        self.assertFalse(replica.captured_queries)
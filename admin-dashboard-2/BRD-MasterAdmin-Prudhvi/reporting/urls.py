@@ -3,7 +3,8 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     ReportViewSet, AnalyticsViewSet, DashboardStatsView,
     DailyDisbursementReportView, BranchPerformanceReportView,
-    LoanApprovalReportView, NPAReportView, RevenueReportView, UserActivityReportView
+    LoanApprovalReportView, NPAReportView, RevenueReportView, UserActivityReportView,
+    TimeSeriesReportView,
 )
 
 router = DefaultRouter()
@@ -19,6 +20,7 @@ urlpatterns = [
     path('reports/loan-approval/', LoanApprovalReportView.as_view(), name='loan-approval'),
     path('reports/npa/', NPAReportView.as_view(), name='npa-report'),
     path('reports/revenue/', RevenueReportView.as_view(), name='revenue-report'),
+    path('reports/timeseries/', TimeSeriesReportView.as_view(), name='timeseries-report'),
     path('reports/user-activity/', UserActivityReportView.as_view(), name='user-activity'),
 
     # ✅ Generic Router URLs (ab ye bachi hui requests handle karega)
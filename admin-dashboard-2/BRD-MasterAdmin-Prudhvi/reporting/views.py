@@ -1,27 +1,143 @@
-from rest_framework import viewsets, permissions
+import os
+
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.db.models import Sum, Count, Q
-from django.db.models.functions import TruncMonth, TruncDate
-from django.utils import timezone
-import datetime
+from django.http import FileResponse
 
 from .models import Report, Analytics
 from .serializers import ReportSerializer, AnalyticsSerializer
 from users.permissions import DefaultPermission
-from tenants.models import Tenant, Branch
 from django.contrib.auth import get_user_model  # ✅ Use get_user_model
 from los.models import LoanApplication
-from lms.models import LoanAccount, Repayment
 from crm.models import LeadActivity
+from users.models import LoginActivity
+from users.authentication import ClaimsJWTAuthentication
+from brd_platform.pagination import CreatedAtCursorPagination
+from brd_platform.db_router import replica_reads
+from .logic.filters import resolve_report_tenant, report_filters, timeseries_filters
+from .logic.rollup import build_dashboard_stats
+from .logic.user_activity import annotated_users
+from .logic.export import ExportError, start_export
+from .logic import jobs, report_cache, reports
 
 User = get_user_model() # ✅ Correct way to get User model
 
+def _run_export(request, report_type, file_format):
+    """Shared by ReportViewSet.export and ?export= on the report views."""
+    try:
+        response, report = start_export(
+            report_type,
+            file_format or 'CSV',
+            resolve_report_tenant(request),
+            report_filters(request),
+            user=request.user,
+            force_async=request.query_params.get('async') in ('1', 'true'),
+        )
+    except (ExportError, jobs.JobError) as exc:
+        raise ValidationError({"export": str(exc)})
+    if report is not None:
+        return Response(jobs.job_status(report), status=status.HTTP_202_ACCEPTED)
+    return response
+
+
+class ReportViewMixin:
+    """
+    Report views answer from the result cache (keyed by tenant, type and filters, and
+    invalidated by disbursements/repayments). ?async=1 queues the computation as a job
+    and returns 202 with a status to poll; ?export=csv|xlsx returns the rows as a file.
+    """
+    report_type = None
+
+    def get_filters(self, request):
+        return report_filters(request)
+
+    def report_response(self, request):
+        if request.query_params.get('export'):
+            return _run_export(request, self.report_type, request.query_params.get('export'))
+        tenant_id = resolve_report_tenant(request)
+        filters = self.get_filters(request)
+        if request.query_params.get('async') in ('1', 'true'):
+            cached = report_cache.get(self.report_type, tenant_id, filters)
+            if cached is not None:
+                return Response(cached)
+            report, _ = jobs.submit(self.report_type, tenant_id, filters, user=request.user)
+            return Response(jobs.job_status(report), status=status.HTTP_202_ACCEPTED)
+        data, _ = report_cache.get_or_compute(
+            self.report_type, tenant_id, filters,
+            lambda: reports.compute(self.report_type, tenant_id, filters),
+        )
+        return Response(data)
+
+
 class ReportViewSet(viewsets.ModelViewSet):
     queryset = Report.objects.all()
     serializer_class = ReportSerializer
     permission_classes = [DefaultPermission]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        tenant_id = resolve_report_tenant(self.request)
+        if tenant_id:
+            queryset = queryset.filter(tenant_id=tenant_id)
+        return queryset
+
+    def perform_create(self, serializer):
+        # Creating a Report queues it as a job; poll /status/ and fetch files from /download/
+        data = serializer.validated_data
+        try:
+            serializer.instance, _ = jobs.submit(
+                data['report_type'],
+                resolve_report_tenant(self.request),
+                data.get('filters_json') or {},
+                file_format=data.get('file_format', 'CSV'),
+                user=self.request.user,
+                name=data.get('name'),
+            )
+        except jobs.JobError as exc:
+            raise ValidationError({"report_type": str(exc)})
+
+    @action(detail=True, methods=['get'], url_path='status')
+    def job_status(self, request, pk=None):
+        return Response(jobs.job_status(self.get_object()))
+
+    @action(detail=False, methods=['post'])
+    def run(self, request):
+        """POST /reports/run/ {"report_type": "NPA", "filters": {...}, "file_format": "JSON"}"""
+        report_type = str(request.data.get('report_type') or '').upper()
+        filters = request.data.get('filters') or {}
+        file_format = str(request.data.get('file_format') or 'JSON').upper()
+        if not isinstance(filters, dict):
+            raise ValidationError({"filters": "Must be an object"})
+        tenant_id = resolve_report_tenant(request)
+        if file_format == 'JSON':
+            cached = report_cache.get(report_type, tenant_id, filters)
+            if cached is not None:
+                return Response({"status": "COMPLETED", "cached": True, "result": cached})
+        try:
+            report, _ = jobs.submit(report_type, tenant_id, filters, file_format=file_format, user=request.user)
+        except jobs.JobError as exc:
+            raise ValidationError({"report_type": str(exc)})
+        return Response(jobs.job_status(report), status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        report = self.get_object()
+        if report.status != 'COMPLETED' or not report.file:
+            return Response(
+                {"status": report.status, "error": report.error or None},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return FileResponse(report.file.open('rb'), as_attachment=True, filename=os.path.basename(report.file.name))
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """GET /reports/export/?type=NPA&file_format=xlsx&start_date=...&branch=..."""
+        report_type = (request.query_params.get('type') or '').upper()
+        return _run_export(request, report_type, request.query_params.get('file_format'))
+
 class AnalyticsViewSet(viewsets.ModelViewSet):
     queryset = Analytics.objects.all()
     serializer_class = AnalyticsSerializer
@@ -29,52 +145,12 @@ class AnalyticsViewSet(viewsets.ModelViewSet):
 
 # --- 1. DASHBOARD ---
 class DashboardStatsView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        total_tenants = Tenant.objects.count()
-        total_branches = Branch.objects.count()
-        active_users = User.objects.filter(is_active=True).count()
-        total_loans = LoanApplication.objects.count()
-        
-        disbursed_agg = LoanApplication.objects.filter(status='DISBURSED').aggregate(Sum('amount'))
-        disbursed_amount = disbursed_agg['amount__sum'] or 0
-        
-        if disbursed_amount > 10000000:
-            disbursed_display = f"₹{disbursed_amount/10000000:.2f} Cr"
-        else:
-            disbursed_display = f"₹{disbursed_amount:,.0f}"
-
-        status_counts = LoanApplication.objects.values('status').annotate(count=Count('id'))
-        pie_data = [{"status": item['status'], "count": item['count']} for item in status_counts]
-
-        monthly_data = (
-            LoanApplication.objects.filter(status='DISBURSED')
-            .annotate(month=TruncMonth('updated_at'))
-            .values('month')
-            .annotate(amount=Sum('amount'))
-            .order_by('month')
-        )
-        line_chart_data = [
-            {"month": m['month'].strftime('%b'), "amount": m['amount']} 
-            for m in monthly_data
-        ]
-
-        recent_activities = LeadActivity.objects.select_related('lead').order_by('-created_at')[:5]
-        activity_feed = [
-            {
-                "title": action.action,
-                "subtitle": action.lead.name if action.lead else "System",
-                "time": action.created_at.strftime('%Y-%m-%d %H:%M')
-            }
-            for action in recent_activities
-        ]
-
-        branch_users = User.objects.values('branch__name').annotate(users=Count('id'))
-        users_per_branch_data = [
-            {"label": item['branch__name'] or "Head Office", "users": item['users']}
-            for item in branch_users
-        ]
+        with replica_reads():
+            data = build_dashboard_stats(resolve_report_tenant(request))
 
         alerts_data = [
             {"type": "Critical", "message": "High server load detected", "time": "10 mins ago"},
@@ -82,251 +158,121 @@ class DashboardStatsView(APIView):
             {"type": "Info", "message": "System backup completed successfully", "time": "5 hours ago"},
         ]
 
-        data = {
-            "kpis": {
-                "totalTenants": total_tenants,
-                "totalBranches": total_branches,
-                "activeUsers": active_users,
-                "totalLoans": total_loans,
-                "disbursedAmount": disbursed_display,
-                "apiStatus": "Online"
-            },
-            "charts": {
-                "monthlyDisbursement": line_chart_data,
-                "loanStatusDistribution": pie_data,
-                "recentActivity": activity_feed,
-                "usersPerBranch": users_per_branch_data
-            },
-            "alerts": alerts_data
-        }
+        data["alerts"] = alerts_data
         return Response(data)
 
 # --- 2. DAILY DISBURSEMENT ---
-class DailyDisbursementReportView(APIView):
+class DailyDisbursementReportView(ReportViewMixin, APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    report_type = 'DISBURSEMENT'
 
     def get(self, request):
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
-        branch_id = request.query_params.get('branch')
-
-        queryset = LoanApplication.objects.filter(status='DISBURSED')
-
-        if start_date:
-            queryset = queryset.filter(updated_at__date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(updated_at__date__lte=end_date)
-        if branch_id and branch_id != 'all':
-            queryset = queryset.filter(branch__id=branch_id)
-
-        report_data = (
-            queryset
-            .annotate(date=TruncDate('updated_at'))
-            .values('date', 'branch__name')
-            .annotate(
-                total_amount=Sum('amount'),
-                total_loans=Count('id')
-            )
-            .order_by('-date')
-        )
-
-        formatted_data = [
-            {
-                "date": item['date'].strftime('%Y-%m-%d'),
-                "branch": item['branch__name'] or "Head Office",
-                "amount": f"₹{item['total_amount']:,.0f}",
-                "loans": item['total_loans']
-            }
-            for item in report_data
-        ]
-        
-        return Response(formatted_data)
+        return self.report_response(request)
 
 # --- 3. BRANCH PERFORMANCE ---
-class BranchPerformanceReportView(APIView):
+class BranchPerformanceReportView(ReportViewMixin, APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    report_type = 'BRANCH_PERFORMANCE'
 
     def get(self, request):
-        branches = Branch.objects.all()
-        data = []
-        for branch in branches:
-            loans = LoanApplication.objects.filter(branch=branch)
-            disbursed_loans = loans.filter(status='DISBURSED')
-            total_disbursed = disbursed_loans.aggregate(Sum('amount'))['amount__sum'] or 0
-            count = disbursed_loans.count()
-            
-            npa_count = loans.filter(status='REJECTED').count()
-            npa_percent = round((npa_count / loans.count() * 100), 1) if loans.count() > 0 else 0
-
-            collections_agg = Repayment.objects.filter(loan_account__loan_application__branch=branch).aggregate(Sum('amount'))
-            total_collections = collections_agg['amount__sum'] or 0
-
-            data.append({
-                "branch": branch.name,
-                "loans": count,
-                "disbursed": f"₹{total_disbursed:,.0f}",
-                "collections": f"₹{total_collections:,.0f}",
-                "npa": f"{npa_percent}%",
-                "rating": "Excellent" if npa_percent < 5 else "Good"
-            })
-            
-        return Response(data)
+        return self.report_response(request)
 
 # --- 4. LOAN APPROVAL REPORT ---
-class LoanApprovalReportView(APIView):
+class LoanApprovalReportView(ReportViewMixin, APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    report_type = 'LOAN_APPROVAL'
 
     def get(self, request):
-        total_applied = LoanApplication.objects.count()
-        total_approved = LoanApplication.objects.filter(status__in=['APPROVED', 'DISBURSED']).count()
-        total_rejected = LoanApplication.objects.filter(status='REJECTED').count()
-        
-        approved_pct = f"{round((total_approved/total_applied)*100, 1)}%" if total_applied > 0 else "0%"
-        rejected_pct = f"{round((total_rejected/total_applied)*100, 1)}%" if total_applied > 0 else "0%"
-
-        status_data = []
-        status_data.append({
-            "loanType": "All Loans",
-            "applied": total_applied,
-            "approved": total_approved,
-            "rejected": total_rejected,
-            "approvalRate": approved_pct
-        })
-
-        rejection_reasons = [
-            {"reason": "Credit Policy Mismatch", "count": int(total_rejected * 0.4), "percentage": "40%"},
-            {"reason": "Low Income", "count": int(total_rejected * 0.3), "percentage": "30%"},
-            {"reason": "Document Issues", "count": int(total_rejected * 0.3), "percentage": "30%"},
-        ]
-
-        data = {
-            "statusData": status_data,
-            "rejectionReasons": rejection_reasons,
-            "overall": {
-                "total": total_applied,
-                "approved": total_approved,
-                "rejected": total_rejected,
-                "approved_pct": approved_pct,
-                "rejected_pct": rejected_pct
-            }
-        }
-        return Response(data)
+        return self.report_response(request)
 
 # --- 5. NPA REPORT ---
-class NPAReportView(APIView):
+class NPAReportView(ReportViewMixin, APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    report_type = 'NPA'
 
     def get(self, request):
-        three_months_ago = timezone.now() - datetime.timedelta(days=90)
-        
-        potential_npa_accounts = LoanAccount.objects.filter(
-            created_at__lte=three_months_ago, 
-            outstanding_principal__gt=0
-        )
-        
-        npa_count = potential_npa_accounts.count()
-        npa_amount_agg = potential_npa_accounts.aggregate(Sum('outstanding_principal'))
-        npa_total_amount = npa_amount_agg['outstanding_principal__sum'] or 0
-
-        npa_by_branch_qs = (
-            potential_npa_accounts
-            .values('loan_application__branch__name')
-            .annotate(count=Count('id'), amount=Sum('outstanding_principal'))
-        )
-
-        npa_by_branch = [
-            {
-                "branch": item['loan_application__branch__name'] or "Head Office",
-                "count": item['count'],
-                "amount": f"₹{item['amount']/100000:.2f} L",
-                "rate": "High"
-            }
-            for item in npa_by_branch_qs
-        ]
-
-        npa_by_category = [
-            {"category": "General NPA", "desc": ">90 days overdue", "count": npa_count, "amount": f"₹{npa_total_amount:,.0f}", "pct": "100%"},
-        ]
-
-        data = {
-            "npaByCategory": npa_by_category,
-            "npaByBranch": npa_by_branch,
-            "kpi": {
-                "count": npa_count,
-                "amount": f"₹{npa_total_amount:,.0f}",
-                "ratio": "Calculated based on old loans",
-                "recovery": "0%"
-            }
-        }
-        return Response(data)
+        return self.report_response(request)
 
 # --- 6. REVENUE REPORT ---
-class RevenueReportView(APIView):
+class RevenueReportView(ReportViewMixin, APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    report_type = 'REVENUE'
 
     def get(self, request):
-        total_collections = Repayment.objects.aggregate(Sum('amount'))['amount__sum'] or 0
-        
-        revenue_sources = [
-            {"source": "Loan Repayments", "amount": f"₹{total_collections:,.0f}", "pct": "100%", "growth": "Variable"},
-        ]
-        
-        monthly_revenue = (
-            Repayment.objects
-            .annotate(month=TruncMonth('paid_at'))
-            .values('month')
-            .annotate(revenue=Sum('amount'))
-            .order_by('month')
-        )
+        return self.report_response(request)
+
+# --- 6b. TIME SERIES ---
+class TimeSeriesReportView(ReportViewMixin, APIView):
+    """
+    GET /reports/timeseries/?series=collections&granularity=month&compare=year&period=fy
+    series: collections | repayments | disbursements | applications
+    granularity: day | week | month | quarter (quarters follow the tenant's financial year)
+    window: financial_year=<id> | reporting_period=<id> | period=fy | start_date/end_date
+    """
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    report_type = 'TIMESERIES'
 
-        monthly = [
-            {
-                "month": m['month'].strftime('%b'), 
-                "revenue": f"₹{m['revenue']:,.0f}", 
-                "target": "₹0", 
-                "achieved": "N/A"
-            } 
-            for m in monthly_revenue
-        ]
+    def get_filters(self, request):
+        return timeseries_filters(request)
 
-        data = {
-            "sources": revenue_sources,
-            "monthly": monthly,
-            "summary": {
-                "total": f"₹{total_collections:,.0f}",
-                "avg": "N/A",
-                "target": "N/A",
-                "growth": "N/A"
-            }
-        }
-        return Response(data)
+    def get(self, request):
+        return self.report_response(request)
 
-# --- 7. USER ACTIVITY REPORT (FIXED) ---
+# --- 7. USER ACTIVITY REPORT ---
 class UserActivityReportView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get(self, request):
+        # Paginated per request, so it is exported rather than cached
+        if request.query_params.get('export'):
+            return _run_export(request, 'USER_ACTIVITY', request.query_params.get('export'))
+        with replica_reads():
+            return self.activity(request)
+
+    def activity(self, request):
+        tenant_id = resolve_report_tenant(request)
+
         users = User.objects.all()
+        loans = LoanApplication.objects.all()
+        activities = LeadActivity.objects.all()
+        if tenant_id:
+            users = users.filter(tenant_id=tenant_id)
+            loans = loans.filter(tenant_id=tenant_id)
+            activities = activities.filter(lead__tenant_id=tenant_id)
+
+        annotated = annotated_users(tenant_id)
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(annotated, request, view=self)
+
         activity_data = []
-        
-        for u in users:
-            apps_count = LoanApplication.objects.filter(created_by=u).count()
-            actions_count = LeadActivity.objects.filter(user=u).count()
-            
-            # ✅ ERROR FIX: 'u.email' use kar rahe hain kyunki 'first_name' nahi hai
-            user_display_name = u.email 
-            
+        for u in page:
+            last_active = u.last_seen or u.last_login
             activity_data.append({
-                "user": user_display_name,
+                "user": f"{u.first_name} {u.last_name}".strip() or u.email,
+                "email": u.email,
                 "role": u.role,
-                "logins": "N/A",
-                "applications": apps_count,
-                "approvals": 0,
-                "lastActive": u.last_login.strftime('%Y-%m-%d') if u.last_login else "Never"
+                "logins": u.logins_count,
+                "applications": u.applications_count,
+                "actions": u.actions_count,
+                "approvals": u.approvals_count,
+                "lastActive": last_active.strftime('%Y-%m-%d') if last_active else "Never"
             })
 
-        total_loans = LoanApplication.objects.count()
-        total_activities = LeadActivity.objects.count()
+        logins = LoginActivity.objects.filter(successful=True)
+        if tenant_id:
+            logins = logins.filter(user__tenant_id=tenant_id)
+
+        total_loans = loans.count()
+        total_activities = activities.count()
 
         system_usage = [
             {"feature": "Loan Applications", "usage": total_loans, "trend": "Live"},
@@ -334,13 +280,15 @@ class UserActivityReportView(APIView):
         ]
 
         data = {
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
             "users": activity_data,
             "usage": system_usage,
             "kpi": {
                 "active": users.filter(is_active=True).count(),
-                "sessions": "N/A",
+                "sessions": logins.count(),
                 "avgTime": "N/A",
                 "actions": total_activities
             }
         }
-        return Response(data)
\ No newline at end of file
+        return Response(data)
@@ -0,0 +1,318 @@
+# tenants/logic/bulk_import.py
+import csv
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils.text import slugify
+
+from brd_platform.tenant_context import tenant_cache
+from tenants.models import Branch, Category, Tenant
+from tenants.serializers import TenantImportRowSerializer
+
+User = get_user_model()
+
+# Streaming tenant onboarding: rows are read lazily, validated and inserted in batches
+# (one uniqueness query per kind and one bulk_create per table per batch), admin
+# passwords are hashed in a process pool, and every row's outcome is appended to a
+# JSONL result log that a re-run uses to skip what is already done.
+
+CREATED, EXISTS, ERROR = "created", "exists", "error"
+DONE = (CREATED, EXISTS)
+
+
+# ------------------------------------------------------------------
+# 1. READING
+# ------------------------------------------------------------------
+
+def _pairs(value, first, second):
+    """CSV cell "A:one;B:two" -> [{first: "A", second: "one"}, ...]"""
+    items = []
+    for part in (value or "").split(";"):
+        if part.strip():
+            key, _, rest = part.partition(":")
+            items.append({first: key.strip(), second: rest.strip()})
+    return items
+
+
+def read_csv(handle):
+    """
+    Header columns follow TenantImportRowSerializer; `branches` holds "CODE:Name;..." and
+    `categories` holds "category_key:Title;...". Empty cells count as missing.
+    """
+    for number, row in enumerate(csv.DictReader(handle), start=1):
+        data = {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+        if "branches" in data:
+            data["branches"] = _pairs(data["branches"], "branch_code", "name")
+        if "categories" in data:
+            data["categories"] = _pairs(data["categories"], "category_key", "title")
+        yield number, data
+
+
+def read_jsonl(handle):
+    for number, line in enumerate(handle, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            yield number, {"_error": f"Invalid JSON: {exc}"}
+            continue
+        yield number, data if isinstance(data, dict) else {"_error": "Expected a JSON object"}
+
+
+def read_rows(path, fmt=None):
+    fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".json")) else "csv")
+    with open(path, newline="", encoding="utf-8-sig") as handle:
+        yield from (read_jsonl(handle) if fmt == "jsonl" else read_csv(handle))
+
+
+def batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ------------------------------------------------------------------
+# 2. RESULT LOG
+# ------------------------------------------------------------------
+
+class ResultLog:
+    """
+    Append-only JSONL, one record per input row, keyed by the tenant email. Rows whose key
+    already has a created/exists record are skipped on the next run. Generated admin
+    passwords are written here, so treat the file as a secret.
+    """
+
+    def __init__(self, path, resume=True):
+        self.path = path
+        self.done = set()
+        if resume and os.path.exists(path):
+            with open(path, encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from an interrupted run
+                    if record.get("status") in DONE:
+                        self.done.add(record["key"])
+        self._handle = open(path, "a" if resume else "w", encoding="utf-8")
+
+    def write(self, record):
+        self._handle.write(json.dumps(record, default=str) + "\n")
+
+    def flush(self):
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+
+    def close(self):
+        self._handle.close()
+
+
+def row_key(data):
+    return (data.get("email") or "").strip().lower()
+
+
+# ------------------------------------------------------------------
+# 3. VALIDATION (per batch)
+# ------------------------------------------------------------------
+
+def validate_batch(batch):
+    """
+    batch: [(row number, raw dict)]. Returns (valid, results): valid is [(number, data)]
+    with cleaned data; results holds exists/error records for the other rows.
+    """
+    cleaned, results = [], []
+    for number, raw in batch:
+        if "_error" in raw:
+            results.append({"row": number, "key": "", "status": ERROR, "errors": raw["_error"]})
+            continue
+        serializer = TenantImportRowSerializer(data=raw)
+        if not serializer.is_valid():
+            results.append({"row": number, "key": row_key(raw), "status": ERROR, "errors": serializer.errors})
+            continue
+        data = dict(serializer.validated_data)
+        data["slug"] = slugify(data["name"])
+        data["admin_email"] = User.objects.normalize_email(data.get("admin_email") or data["email"])
+        cleaned.append((number, data))
+
+    names = {d["name"].lower() for _, d in cleaned}
+    emails = {d["email"].lower() for _, d in cleaned}
+    slugs = {d["slug"] for _, d in cleaned}
+    existing = set()
+    taken = {"name": set(), "email": set(), "slug": set(), "admin": set(), "branch": set()}
+    if cleaned:
+        for name, email, slug in (
+            Tenant.objects.annotate(lname=Lower("name"), lemail=Lower("email"))
+            .filter(Q(lname__in=names) | Q(lemail__in=emails) | Q(slug__in=slugs))
+            .values_list("lname", "lemail", "slug")
+        ):
+            existing.add((name, email))
+            taken["name"].add(name)
+            taken["email"].add(email)
+            taken["slug"].add(slug)
+        taken["admin"] = set(
+            User.objects.annotate(lemail=Lower("email"))
+            .filter(lemail__in={d["admin_email"].lower() for _, d in cleaned})
+            .values_list("lemail", flat=True)
+        )
+        codes = {b["branch_code"] for _, d in cleaned for b in d.get("branches", [])}
+        taken["branch"] = set(Branch.objects.filter(branch_code__in=codes).values_list("branch_code", flat=True))
+
+    valid = []
+    for number, data in cleaned:
+        key = data["email"].lower()
+        if (data["name"].lower(), key) in existing:
+            # Same tenant already imported (e.g. the log write was lost); nothing to do
+            results.append({"row": number, "key": key, "status": EXISTS})
+            continue
+        errors = {}
+        if data["name"].lower() in taken["name"] or data["slug"] in taken["slug"]:
+            errors["name"] = "Tenant with this name already exists"
+        if key in taken["email"]:
+            errors["email"] = "Tenant with this email already exists"
+        if data["admin_email"].lower() in taken["admin"]:
+            errors["admin_email"] = "User with this email already exists"
+        codes = [b["branch_code"] for b in data.get("branches", [])]
+        duplicate = [code for code in codes if code in taken["branch"] or codes.count(code) > 1]
+        if duplicate:
+            errors["branches"] = f"Branch code already in use: {', '.join(sorted(set(duplicate)))}"
+        if errors:
+            results.append({"row": number, "key": key, "status": ERROR, "errors": errors})
+            continue
+        # Later rows in the same batch must not reuse what this one claims
+        taken["name"].add(data["name"].lower())
+        taken["slug"].add(data["slug"])
+        taken["email"].add(key)
+        taken["admin"].add(data["admin_email"].lower())
+        taken["branch"].update(codes)
+        valid.append((number, data))
+    return valid, results
+
+
+# ------------------------------------------------------------------
+# 4. PASSWORDS
+# ------------------------------------------------------------------
+
+def hash_passwords(passwords, executor=None):
+    """Hashes in the process pool when one is given (hashing is CPU-bound and holds the GIL)."""
+    if executor is None:
+        return [make_password(password) for password in passwords]
+    return list(executor.map(make_password, passwords, chunksize=8))
+
+
+def password_pool(workers):
+    # Workers re-run django.setup() so the hasher settings are loaded under spawn as well as fork
+    return ProcessPoolExecutor(max_workers=workers, initializer=django.setup) if workers else None
+
+
+# ------------------------------------------------------------------
+# 5. INSERT
+# ------------------------------------------------------------------
+
+def _insert(rows):
+    """rows: [(number, data, password hash)]. One bulk_create per table, all-or-nothing."""
+    tenants = [
+        Tenant(
+            name=data["name"], slug=data["slug"], tenant_type=data["tenant_type"], email=data["email"],
+            phone=data.get("phone", ""), address=data.get("address", ""), city=data.get("city", ""),
+            state=data.get("state", ""), pincode=data.get("pincode", ""), is_active=data.get("is_active", True),
+        )
+        for _, data, _ in rows
+    ]
+    with transaction.atomic():
+        Tenant.objects.bulk_create(tenants)
+        if any(tenant.pk is None for tenant in tenants):
+            # Backends that cannot return ids from a bulk insert
+            pks = dict(Tenant.objects.filter(tenant_id__in=[t.tenant_id for t in tenants]).values_list("tenant_id", "pk"))
+            for tenant in tenants:
+                tenant.pk = pks[tenant.tenant_id]
+
+        branches, categories, users = [], [], []
+        for tenant, (_, data, password) in zip(tenants, rows):
+            branches += [Branch(tenant=tenant, **branch) for branch in data.get("branches", [])]
+            categories += [Category(tenant=tenant, **category) for category in data.get("categories", [])]
+            users.append(User(email=data["admin_email"], password=password, tenant=tenant,
+                              role="TENANT_ADMIN", is_active=True))
+        Branch.objects.bulk_create(branches)
+        Category.objects.bulk_create(categories)
+        User.objects.bulk_create(users)
+    return tenants
+
+
+def import_batch(batch, executor=None):
+    """Validates, hashes and inserts one batch; returns one result record per row."""
+    valid, results = validate_batch(batch)
+    if not valid:
+        return results
+
+    generated = {}
+    for number, data in valid:
+        if not data.get("admin_password"):
+            generated[number] = User.objects.make_random_password(length=10)
+    hashes = hash_passwords([data.get("admin_password") or generated[number] for number, data in valid], executor)
+    rows = [(number, data, password) for (number, data), password in zip(valid, hashes)]
+
+    try:
+        groups = [(rows, _insert(rows))]
+    except IntegrityError:
+        # Lost a race with another writer: retry row by row so only the conflicting rows fail
+        groups = []
+        for row in rows:
+            try:
+                groups.append(([row], _insert([row])))
+            except IntegrityError as exc:
+                results.append({"row": row[0], "key": row[1]["email"].lower(), "status": ERROR, "errors": str(exc)})
+
+    for inserted, tenants in groups:
+        for (number, data, _), tenant in zip(inserted, tenants):
+            tenant_cache.invalidate(tenant)  # drop a cached "not found" for this tenant
+            record = {
+                "row": number, "key": data["email"].lower(), "status": CREATED,
+                "tenant_id": str(tenant.tenant_id), "admin_email": data["admin_email"],
+            }
+            if number in generated:
+                record["password"] = generated[number]
+            results.append(record)
+    return sorted(results, key=lambda record: record["row"])
+
+
+def import_tenants(rows, log, batch_size=500, workers=0, progress=None):
+    """
+    rows: iterable of (row number, dict) from read_rows(). Rows already done according to
+    `log` are skipped. Returns a Counter of statuses (plus "skipped").
+    """
+    counts = Counter()
+
+    def pending():
+        for number, data in rows:
+            if row_key(data) and row_key(data) in log.done:
+                counts["skipped"] += 1
+                continue
+            yield number, data
+
+    executor = password_pool(workers)
+    try:
+        for batch in batched(pending(), batch_size):
+            for record in import_batch(batch, executor):
+                log.write(record)
+                counts[record["status"]] += 1
+            log.flush()
+            if progress:
+                progress(counts)
+    finally:
+        if executor:
+            executor.shutdown()
+    return counts
@@ -0,0 +1,268 @@
+# tenants/logic/rule_config.py
+import datetime
+import logging
+import threading
+import time
+from types import MappingProxyType
+
+from django.conf import settings
+from django.core.cache import cache
+
+from tenants.models import TenantRuleConfig
+
+logger = logging.getLogger(__name__)
+
+# TenantRuleConfig.config is parsed once per tenant (and per saved version) into the
+# immutable objects below; request code reads attributes instead of walking the JSON.
+# Defaults match what TenantRuleConfigForm shows for a missing key.
+
+
+class RuleConfigError(ValueError):
+    pass
+
+
+class _Frozen:
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def _set(self, **values):
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+# ------------------------------------------------------------------
+# 1. TYPED READERS (raise RuleConfigError with the JSON path)
+# ------------------------------------------------------------------
+
+def _section(data, path):
+    value = data.get(path[-1], {}) if isinstance(data, dict) else {}
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise RuleConfigError(f"{'.'.join(path)}: expected an object")
+    return value
+
+
+def _bool(data, key, default, path):
+    value = data.get(key, default)
+    if not isinstance(value, bool):
+        raise RuleConfigError(f"{'.'.join(path + (key,))}: expected true/false")
+    return value
+
+
+def _int(data, key, default, path, minimum=0):
+    value = data.get(key, default)
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).strip().isdigit():
+        raise RuleConfigError(f"{'.'.join(path + (key,))}: expected a whole number")
+    value = int(value)
+    if value < minimum:
+        raise RuleConfigError(f"{'.'.join(path + (key,))}: must be at least {minimum}")
+    return value
+
+
+def _names(data, key, path):
+    value = data.get(key) or []
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, (list, tuple)):
+        raise RuleConfigError(f"{'.'.join(path + (key,))}: expected a list")
+    return tuple(str(item).strip() for item in value if str(item).strip())
+
+
+# ------------------------------------------------------------------
+# 2. SECTIONS
+# ------------------------------------------------------------------
+
+class LeadAccess(_Frozen):
+    __slots__ = ("view", "add", "edit", "delete")
+
+    def __init__(self, data, path=("access", "permissions", "leads")):
+        self._set(**{action: _bool(data, action, False, path) for action in self.__slots__})
+
+
+class ModuleAccess(_Frozen):
+    __slots__ = ("crm", "loan", "collection")
+
+    def __init__(self, data, path=("access", "module_access")):
+        self._set(**{module: _bool(data, module, False, path) for module in self.__slots__})
+
+
+class Workflow(_Frozen):
+    __slots__ = ("approval_levels", "approver_roles", "rejector_roles", "auto_validation", "upload_limit_mb")
+
+    def __init__(self, data, path=("workflow",)):
+        documents = _section(data, path + ("document_verification",))
+        doc_path = path + ("document_verification",)
+        self._set(
+            approval_levels=_names(data, "approval_levels", path),
+            approver_roles=frozenset(_names(data, "approver_roles", path)),
+            rejector_roles=frozenset(_names(data, "rejector_roles", path)),
+            auto_validation=_bool(documents, "auto_validation", False, doc_path),
+            upload_limit_mb=_int(documents, "upload_limit_mb", 10, doc_path, minimum=1),
+        )
+
+
+class Validation(_Frozen):
+    __slots__ = ("unique_email", "pan_format", "aadhaar_format", "phone_10_digits")
+
+    def __init__(self, data, path=("validation",)):
+        self._set(
+            unique_email=_bool(data, "unique_email", True, path),
+            pan_format=_bool(data, "pan_format", False, path),
+            aadhaar_format=_bool(data, "aadhaar_format", False, path),
+            phone_10_digits=_bool(data, "phone_10_digits", False, path),
+        )
+
+
+class Assignment(_Frozen):
+    __slots__ = ("lead_by_category", "auto_sales", "auto_verification", "auto_credit")
+
+    def __init__(self, data, path=("assignment",)):
+        auto = _section(data, path + ("auto_assign",))
+        auto_path = path + ("auto_assign",)
+        self._set(
+            lead_by_category=_bool(data, "lead_by_category", False, path),
+            auto_sales=_bool(auto, "sales", True, auto_path),
+            auto_verification=_bool(auto, "verification", True, auto_path),
+            auto_credit=_bool(auto, "credit", True, auto_path),
+        )
+
+
+class Security(_Frozen):
+    __slots__ = ("password_min_length", "password_special_required", "session_timeout_minutes")
+
+    def __init__(self, data, path=("security",)):
+        self._set(
+            password_min_length=_int(data, "password_min_length", 8, path, minimum=1),
+            password_special_required=_bool(data, "password_special_required", True, path),
+            session_timeout_minutes=_int(data, "session_timeout_minutes", 30, path, minimum=1),
+        )
+
+
+class RuleConfig(_Frozen):
+    """Validated, read-only view of one tenant's TenantRuleConfig.config."""
+    __slots__ = (
+        "version", "lead_access", "modules", "workflow", "validation", "assignment", "security",
+        "extra", "upload_limit_bytes", "session_timeout",
+    )
+    SECTIONS = ("access", "workflow", "validation", "assignment", "security")
+
+    def __init__(self, config, version=None):
+        if not isinstance(config, dict):
+            raise RuleConfigError("config: expected an object")
+        access = _section(config, ("access",))
+        permissions = _section(access, ("access", "permissions"))
+        workflow = Workflow(_section(config, ("workflow",)))
+        security = Security(_section(config, ("security",)))
+        self._set(
+            version=version,
+            lead_access=LeadAccess(_section(permissions, ("access", "permissions", "leads"))),
+            modules=ModuleAccess(_section(access, ("access", "module_access"))),
+            workflow=workflow,
+            validation=Validation(_section(config, ("validation",))),
+            assignment=Assignment(_section(config, ("assignment",))),
+            security=security,
+            # Product rules and anything else outside the known sections, read-only
+            extra=MappingProxyType({k: v for k, v in config.items() if k not in self.SECTIONS}),
+            # Precomputed for the hot paths
+            upload_limit_bytes=workflow.upload_limit_mb * 1024 * 1024,
+            session_timeout=datetime.timedelta(minutes=security.session_timeout_minutes),
+        )
+
+    # ---------------- accessors ----------------
+    def module_enabled(self, module):
+        return getattr(self.modules, module, False)
+
+    def can_leads(self, action):
+        return getattr(self.lead_access, action, False)
+
+    def auto_assign(self, team):
+        return getattr(self.assignment, f"auto_{team}", False)
+
+    def can_approve(self, role):
+        return not self.workflow.approver_roles or role in self.workflow.approver_roles
+
+    def can_reject(self, role):
+        return not self.workflow.rejector_roles or role in self.workflow.rejector_roles
+
+
+def validate_config(config):
+    """Raises RuleConfigError for a config the typed readers would reject."""
+    RuleConfig(config)
+
+
+# Tenants that never saved rules keep their current behaviour: no automatic assignment
+UNCONFIGURED = RuleConfig({"assignment": {"auto_assign": {"sales": False, "verification": False, "credit": False}}})
+
+
+# ------------------------------------------------------------------
+# 3. CACHE (per process, versioned through the Django cache)
+# ------------------------------------------------------------------
+
+def _version_key(tenant_id):
+    return f"rules:version:{tenant_id}"
+
+
+class RuleConfigCache:
+    """
+    tenant pk -> RuleConfig. A saved TenantRuleConfig bumps the tenant's version stamp
+    (tenants.signals); each process compares stamps at most every `check_interval`
+    seconds and re-parses only when it moved.
+    """
+
+    def __init__(self, check_interval=5):
+        self.check_interval = check_interval
+        self._entries = {}  # tenant pk -> (version, checked_at, RuleConfig)
+        self._lock = threading.Lock()
+
+    def get(self, tenant_id):
+        if not tenant_id:
+            return UNCONFIGURED
+        now = time.monotonic()
+        entry = self._entries.get(tenant_id)
+        if entry and now - entry[1] < self.check_interval:
+            return entry[2]
+
+        version = cache.get(_version_key(tenant_id))
+        if version is None:
+            cache.add(_version_key(tenant_id), time.time_ns(), None)
+            version = cache.get(_version_key(tenant_id))
+        rules = entry[2] if entry and entry[0] == version else self._load(tenant_id, version)
+        with self._lock:
+            self._entries[tenant_id] = (version, now, rules)
+        return rules
+
+    def _load(self, tenant_id, version):
+        config = TenantRuleConfig.objects.filter(tenant_id=tenant_id).values_list("config", flat=True).first()
+        if config is None:
+            return UNCONFIGURED
+        try:
+            return RuleConfig(config, version=version)
+        except RuleConfigError as exc:
+            # Saved before validation existed; run on defaults rather than fail every request
+            logger.warning("Invalid rule config for tenant %s (%s); using defaults", tenant_id, exc)
+            return RuleConfig({}, version=version)
+
+    def invalidate(self, tenant_id):
+        cache.set(_version_key(tenant_id), time.time_ns(), None)
+        with self._lock:
+            self._entries.pop(tenant_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+rule_configs = RuleConfigCache(check_interval=getattr(settings, "RULE_CONFIG_CHECK_INTERVAL", 5))
+
+
+def rules_for(tenant_id):
+    return rule_configs.get(tenant_id)
@@ -0,0 +1,47 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tenants.logic.bulk_import import ResultLog, import_tenants, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-onboard tenants (with branches, categories and a TENANT_ADMIN user) from a CSV or JSONL file. "
+        "Outcomes are appended to a JSONL result log; re-running skips rows already imported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL file")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="defaults to the file extension")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="password hashing processes (0 hashes in this process)")
+        parser.add_argument("--log", help="result log path (default: <path>.results.jsonl)")
+        parser.add_argument("--restart", action="store_true", help="ignore the existing result log and start over")
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options["path"]):
+            raise CommandError(f"{options['path']} not found")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        log = ResultLog(options["log"] or f"{options['path']}.results.jsonl", resume=not options["restart"])
+        if log.done:
+            self.stdout.write(f"Resuming: {len(log.done)} rows already imported.")
+
+        def progress(counts):
+            self.stdout.write(f"created {counts['created']}, errors {counts['error']}, skipped {counts['skipped']}")
+
+        try:
+            counts = import_tenants(
+                read_rows(options["path"], options["format"]), log,
+                batch_size=options["batch_size"], workers=options["workers"],
+                progress=progress if options["verbosity"] > 1 else None,
+            )
+        finally:
+            log.close()
+
+        summary = (f"{counts['created']} tenants created, {counts['exists']} already present, "
+                   f"{counts['skipped']} skipped, {counts['error']} failed. Results: {log.path}")
+        self.stdout.write(self.style.ERROR(summary) if counts["error"] else self.style.SUCCESS(summary))
@@ -9,8 +9,14 @@ class Migration(migrations.Migration):
         ('tenants', '0012_category_remove_financialyear_calendar_and_more'),
     ]
 
+    # The table itself is already dropped by 0012 (safe_delete_calendar_table),
+    # so only the model state is removed here.
     operations = [
-        migrations.DeleteModel(
-            name='Calendar',
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.DeleteModel(
+                    name='Calendar',
+                ),
+            ],
         ),
     ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0015_chargeconfig_interestconfig_repaymentconfig_riskrule_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scorecard',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0016_scorecard_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='interestconfig',
+            name='accrual_method',
+            field=models.CharField(choices=[('SIMPLE', 'Simple'), ('COMPOUND', 'Compound'), ('FLAT', 'Flat')], default='SIMPLE', max_length=20),
+        ),
+    ]
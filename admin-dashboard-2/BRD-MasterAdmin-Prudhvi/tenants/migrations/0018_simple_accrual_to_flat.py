@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-18 10:05
+
+from django.db import migrations
+
+
+def simple_to_flat(apps, schema_editor):
+    # Configs saved before 0017 picked "SIMPLE" when it meant flat rate ("Simple Interest (Flat)"
+    # in the UI); keep their schedules and accruals unchanged under the explicit FLAT method
+    InterestConfig = apps.get_model('tenants', 'InterestConfig')
+    InterestConfig.objects.filter(accrual_method='SIMPLE').update(accrual_method='FLAT')
+
+
+def flat_to_simple(apps, schema_editor):
+    InterestConfig = apps.get_model('tenants', 'InterestConfig')
+    InterestConfig.objects.filter(accrual_method='FLAT').update(accrual_method='SIMPLE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0017_interest_config_flat_accrual'),
+    ]
+
+    operations = [
+        migrations.RunPython(simple_to_flat, flat_to_simple),
+    ]
@@ -146,7 +146,7 @@ class TenantRuleConfig(models.Model):
 
 class InterestConfig(models.Model):
     INTEREST_TYPES = (('FIXED', 'Fixed Rate'), ('FLOATING', 'Floating Rate'))
-    ACCRUAL_METHODS = (('SIMPLE', 'Simple'), ('COMPOUND', 'Compound'))
+    ACCRUAL_METHODS = (('SIMPLE', 'Simple'), ('COMPOUND', 'Compound'), ('FLAT', 'Flat'))
     ACCRUAL_STAGES = (('PRE_EMI', 'Pre-EMI'), ('POST_EMI', 'Post-EMI'))
     BENCHMARKS = (('REPO', 'RBI Repo Rate'), ('MCLR', 'Bank MCLR'), ('TBILL', 'T-Bill Rate'))
 
@@ -287,6 +287,8 @@ class ScoreCard(models.Model):
     rules_config = models.JSONField(default=list)
     
     created_at = models.DateTimeField(auto_now_add=True)
+    # Version stamp for the compiled evaluator cache (los/logic/scorecard.py)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = "tenant_scorecards"
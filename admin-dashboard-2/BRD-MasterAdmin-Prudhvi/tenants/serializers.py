@@ -7,6 +7,7 @@ import uuid
 from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.contrib.auth.password_validation import validate_password
+from tenants.logic.rule_config import RuleConfigError, validate_config
 
 User = get_user_model()
 
@@ -149,6 +150,13 @@ class TenantRuleConfigSerializer(serializers.ModelSerializer):
             "tenant": {"read_only": True}
         }
 
+    def validate_config(self, value):
+        try:
+            validate_config(value)
+        except RuleConfigError as exc:
+            raise serializers.ValidationError(str(exc))
+        return value
+
 
 # -------------------- Tenant Create (Master Admin Only) --------------------
 class TenantCreateByMasterSerializer(serializers.Serializer):
@@ -212,6 +220,42 @@ class TenantCreateByMasterSerializer(serializers.Serializer):
         }
 
 
+# -------------------- Bulk Import Rows --------------------
+class ImportBranchSerializer(serializers.Serializer):
+    branch_code = serializers.CharField(max_length=50)
+    name = serializers.CharField(max_length=200)
+    phone = serializers.CharField(max_length=15, required=False, allow_blank=True)
+    address = serializers.CharField(required=False, allow_blank=True)
+
+
+class ImportCategorySerializer(serializers.Serializer):
+    category_key = serializers.ChoiceField(choices=Category.CATEGORY_KEYS)
+    title = serializers.CharField(max_length=200)
+    description = serializers.CharField(required=False, allow_blank=True)
+
+
+class TenantImportRowSerializer(TenantCreateByMasterSerializer):
+    """
+    One row of a bulk tenant import (tenants/logic/bulk_import.py). Field rules match
+    TenantCreateByMasterSerializer; uniqueness is checked once per batch by the importer.
+    """
+    admin_email = serializers.EmailField(required=False)
+    admin_password = serializers.CharField(required=False, allow_blank=True, write_only=True)
+    branches = ImportBranchSerializer(many=True, required=False)
+    categories = ImportCategorySerializer(many=True, required=False)
+
+    def validate_email(self, value):
+        return value
+
+    def validate_name(self, value):
+        return value
+
+    def validate_admin_password(self, value):
+        if value:
+            validate_password(value)
+        return value
+
+
 # =========================================================
 # NEW: MASTERS & CONFIGURATION SERIALIZERS
 # =========================================================
@@ -246,6 +290,15 @@ class ScoreCardSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['tenant']
 
+    def validate_rules_config(self, value):
+        # Reject configs the scorecard engine cannot compile
+        from los.logic.scorecard import compile_rules_config, ScoreCardConfigError
+        try:
+            compile_rules_config(value)
+        except ScoreCardConfigError as exc:
+            raise serializers.ValidationError(str(exc))
+        return value
+
 class TenantLoanProductSerializer(serializers.ModelSerializer):
     # Nested representation for Read operations (so frontend gets names/values)
     interest_details = InterestConfigSerializer(source='interest_config', read_only=True)
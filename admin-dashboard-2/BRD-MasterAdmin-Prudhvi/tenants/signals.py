@@ -0,0 +1,19 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from brd_platform.tenant_context import tenant_cache
+from tenants.logic.rule_config import rule_configs
+from .models import Tenant, TenantRuleConfig
+
+
+@receiver(post_save, sender=Tenant)
+@receiver(post_delete, sender=Tenant)
+def invalidate_tenant_cache(sender, instance, **kwargs):
+    tenant_cache.invalidate(instance)
+
+
+@receiver(post_save, sender=TenantRuleConfig)
+@receiver(post_delete, sender=TenantRuleConfig)
+def invalidate_rule_config(sender, instance, **kwargs):
+    transaction.on_commit(lambda: rule_configs.invalidate(instance.tenant_id))
@@ -1,3 +1,188 @@
+import datetime
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.hashers import check_password
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from brd_platform.tenant_context import TenantCache, tenant_cache
+from crm.models import Lead
+from users.models import User
+from .logic.rule_config import RuleConfig, RuleConfigError, UNCONFIGURED, rule_configs, rules_for
+from .models import Branch, Category, Tenant, TenantRuleConfig
+
+
+class RuleConfigTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        rule_configs.clear()
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+
+    def save_rules(self, config):
+        with self.captureOnCommitCallbacks(execute=True):
+            TenantRuleConfig.objects.update_or_create(tenant=self.tenant, defaults={"config": config})
+
+    def test_parse_applies_defaults_and_keeps_unknown_keys(self):
+        rules = RuleConfig({
+            "workflow": {"document_verification": {"upload_limit_mb": "5"}, "approver_roles": ["CREDIT_MANAGER"]},
+            "security": {"session_timeout_minutes": 45},
+            "products": {"gold": {"ltv": 75}},
+        })
+        self.assertEqual(rules.upload_limit_bytes, 5 * 1024 * 1024)
+        self.assertEqual(rules.session_timeout, datetime.timedelta(minutes=45))
+        self.assertTrue(rules.validation.unique_email)
+        self.assertTrue(rules.can_approve("CREDIT_MANAGER"))
+        self.assertFalse(rules.can_approve("SALES_EXECUTIVE"))
+        self.assertEqual(rules.extra["products"]["gold"]["ltv"], 75)
+        with self.assertRaises(AttributeError):
+            rules.security = None
+
+    def test_parse_reports_the_bad_path(self):
+        with self.assertRaisesMessage(RuleConfigError, "validation.pan_format"):
+            RuleConfig({"validation": {"pan_format": "yes"}})
+        with self.assertRaisesMessage(RuleConfigError, "workflow.document_verification.upload_limit_mb"):
+            RuleConfig({"workflow": {"document_verification": {"upload_limit_mb": 0}}})
+
+    def test_cached_until_the_config_is_saved(self):
+        self.assertIs(rules_for(self.tenant.pk), UNCONFIGURED)
+        self.save_rules({"validation": {"pan_format": True}})
+        rules = rules_for(self.tenant.pk)
+        self.assertTrue(rules.validation.pan_format)
+        with self.assertNumQueries(0):
+            self.assertIs(rules_for(self.tenant.pk), rules)
+
+        self.save_rules({"validation": {"pan_format": False}})
+        self.assertFalse(rules_for(self.tenant.pk).validation.pan_format)
+
+    def test_invalid_stored_config_falls_back_to_defaults(self):
+        TenantRuleConfig.objects.create(tenant=self.tenant, config={"security": "strict"})
+        with self.assertLogs("tenants.logic.rule_config", "WARNING"):
+            rules = rules_for(self.tenant.pk)
+        self.assertEqual(rules.security.password_min_length, 8)
+
+    def test_lead_rules_apply_on_create(self):
+        self.save_rules({"validation": {"phone_10_digits": True}, "assignment": {"auto_assign": {"sales": True}}})
+        busy = User.objects.create_user(email="busy@acme.test", password="pw", tenant=self.tenant, role="SALES_EXECUTIVE")
+        idle = User.objects.create_user(email="idle@acme.test", password="pw", tenant=self.tenant, role="SALES_EXECUTIVE")
+        Lead.objects.create(name="Existing", tenant=self.tenant, assigned_to=busy)
+
+        client = APIClient()
+        client.force_authenticate(busy)
+        self.assertEqual(client.post("/api/v1/crm/leads/", {"name": "Bad", "phone": "12345"}).status_code, 400)
+
+        response = client.post("/api/v1/crm/leads/", {"name": "New", "phone": "9876543210"})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["assigned_to"], idle.pk)
+
+
+class BulkImportTests(TestCase):
+
+    CSV = (
+        "name,tenant_type,email,phone,branches,categories,admin_password\n"
+        "North Credit,NBFC,ops@north.test,9876543210,NC01:North HQ;NC02:North East,loan:Gold Loan,Str0ng-Passw0rd!\n"
+        "South Bank,BANK,ops@south.test,,SB01:South HQ,,\n"
+        "Broken,NOPE,not-an-email,,,,\n"
+        "Clash,NBFC,ops@clash.test,,NC01:Duplicate,,\n"
+    )
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = os.path.join(self.dir, "tenants.csv")
+        with open(self.path, "w") as handle:
+            handle.write(self.CSV)
+
+    def run_import(self, *args):
+        out = StringIO()
+        call_command("import_tenants", self.path, "--workers", "0", *args, stdout=out)
+        return out.getvalue()
+
+    def results(self):
+        with open(self.path + ".results.jsonl") as handle:
+            return [json.loads(line) for line in handle]
+
+    def test_imports_valid_rows_and_logs_every_row(self):
+        self.assertIn("2 tenants created", self.run_import())
+
+        north = Tenant.objects.get(email="ops@north.test")
+        self.assertEqual(north.slug, "north-credit")
+        self.assertEqual(set(Branch.objects.filter(tenant=north).values_list("branch_code", flat=True)), {"NC01", "NC02"})
+        self.assertTrue(Category.objects.filter(tenant=north, category_key="loan", title="Gold Loan").exists())
+        admin = User.objects.get(email="ops@north.test")
+        self.assertEqual((admin.tenant, admin.role), (north, "TENANT_ADMIN"))
+        self.assertTrue(check_password("Str0ng-Passw0rd!", admin.password))
+
+        records = {record["row"]: record for record in self.results()}
+        self.assertEqual([records[n]["status"] for n in (1, 2, 3, 4)], ["created", "created", "error", "error"])
+        self.assertTrue(check_password(records[2]["password"], User.objects.get(email="ops@south.test").password))
+        self.assertNotIn("password", records[1])
+        self.assertIn("NC01", records[4]["errors"]["branches"])
+
+    def test_rerun_resumes_from_the_log(self):
+        self.run_import()
+        output = self.run_import()
+        self.assertIn("2 skipped, 2 failed", output)
+        self.assertEqual(Tenant.objects.count(), 2)
+
+
+class TenantCacheTests(TestCase):
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        self.cache = TenantCache(maxsize=16, ttl=60)
+
+    def test_lookups_are_cached_under_every_alias(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.cache.get_by_pk(self.tenant.pk), self.tenant)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.cache.resolve(str(self.tenant.tenant_id)), self.tenant)
+            self.assertEqual(self.cache.resolve(self.tenant.slug), self.tenant)
+        self.assertEqual((self.cache.stats()["hits"], self.cache.stats()["misses"]), (2, 1))
+
+    def test_unknown_identifiers_are_cached_as_misses(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(self.cache.resolve("no-such-tenant"))
+            self.assertIsNone(self.cache.resolve("no-such-tenant"))
+
+    def test_entries_expire_after_ttl(self):
+        with patch("brd_platform.tenant_context.time.monotonic", return_value=1000.0):
+            self.cache.get_by_pk(self.tenant.pk)
+        with patch("brd_platform.tenant_context.time.monotonic", return_value=1059.0), self.assertNumQueries(0):
+            self.cache.get_by_pk(self.tenant.pk)
+        with patch("brd_platform.tenant_context.time.monotonic", return_value=1061.0), self.assertNumQueries(1):
+            self.cache.get_by_pk(self.tenant.pk)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TenantCache(maxsize=2, ttl=60)
+        cache.get_by_slug("a")
+        cache.get_by_slug("b")
+        cache.get_by_slug("a")
+        cache.get_by_slug("c")
+        self.assertEqual(cache.stats()["evictions"], 1)
+        with self.assertNumQueries(0):
+            cache.get_by_slug("a")
+        with self.assertNumQueries(1):
+            cache.get_by_slug("b")
+
+    def test_save_and_delete_invalidate_the_shared_cache(self):
+        tenant_cache.clear()
+        self.addCleanup(tenant_cache.clear)
+        tenant_cache.get_by_pk(self.tenant.pk)
+
+        self.tenant.name = "Acme Capital"
+        self.tenant.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(tenant_cache.get_by_pk(self.tenant.pk).name, "Acme Capital")
 
-# Create your tests here.
+        pk, slug = self.tenant.pk, self.tenant.slug
+        self.tenant.delete()
+        self.assertIsNone(tenant_cache.get_by_pk(pk))
+        self.assertIsNone(tenant_cache.resolve(slug))
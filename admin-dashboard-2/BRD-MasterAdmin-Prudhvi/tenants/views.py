@@ -7,6 +7,8 @@ from django.core.exceptions import ValidationError
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
 
+from users.logic.audit import AuditMixin
+
 
 # MODELS
 from .models import (
@@ -154,7 +156,7 @@ class TenantCreateByMasterView(APIView):
 #            BASE VIEW FOR TENANT FILTERING
 # --------------------------------------------------------
 
-class BaseTenantViewSet(viewsets.ModelViewSet):
+class BaseTenantViewSet(AuditMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
@@ -203,7 +205,7 @@ class HolidayViewSet(BaseTenantViewSet):
 # NEW CATEGORY VIEWSET  (Types of Category)
 # -----------------------------------------------------------
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(AuditMixin, viewsets.ModelViewSet):
     serializer_class = CategorySerializer
     queryset = Category.objects.all().order_by("category_key", "title")
     permission_classes = [permissions.IsAuthenticated]
@@ -231,7 +233,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
 #               RULE CONFIG VIEWSET
 # --------------------------------------------------------
 
-class TenantRuleConfigViewSet(viewsets.ModelViewSet):
+class TenantRuleConfigViewSet(AuditMixin, viewsets.ModelViewSet):
     queryset = TenantRuleConfig.objects.all()
     serializer_class = TenantRuleConfigSerializer
 
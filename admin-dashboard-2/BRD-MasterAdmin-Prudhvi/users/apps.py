@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from .authentication import user_changed
+
+        post_save.connect(user_changed, sender=self.get_model('User'), dispatch_uid='users.user_state.save')
+        post_delete.connect(user_changed, sender=self.get_model('User'), dispatch_uid='users.user_state.delete')
@@ -0,0 +1,153 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from brd_platform.tenant_context import tenant_cache
+
+# Identity claims embedded in every access token (see add_identity_claims)
+IDENTITY_CLAIMS = ("role", "role_id", "tenant_id", "branch_id", "approval_limit", "is_staff", "is_superuser")
+
+USER_STATE_KEY = "auth:user-state:{pk}"
+USER_STATE_TTL = getattr(settings, "AUTH_USER_STATE_TTL", 300)
+
+
+def identity_claims(user):
+    return {
+        "role": user.role,
+        "role_id": user.role_id,
+        "tenant_id": user.tenant_id,
+        "branch_id": user.branch_id,
+        "approval_limit": str(user.approval_limit) if user.approval_limit is not None else None,
+        "is_staff": user.is_staff,
+        "is_superuser": user.is_superuser,
+    }
+
+
+def add_identity_claims(token, user):
+    """Embeds the fields ClaimsUser needs so read-only requests never load the User row."""
+    for name, value in identity_claims(user).items():
+        token[name] = value
+    return token
+
+
+def user_state(user_id):
+    """
+    is_active plus the current identity claims of a user, shared through the Django cache
+    (one query on a miss). Saving or deleting the User drops the entry (users.signals), so
+    deactivations and role changes reach tokens that are already issued.
+    """
+    key = USER_STATE_KEY.format(pk=user_id)
+    state = cache.get(key)
+    if state is None:
+        from users.models import User
+
+        user = User.objects.filter(pk=user_id).first()
+        state = {"is_active": user.is_active, **identity_claims(user)} if user else {"is_active": False}
+        cache.set(key, state, USER_STATE_TTL)
+    return state
+
+
+def invalidate_user_state(user_id):
+    cache.delete(USER_STATE_KEY.format(pk=user_id))
+
+
+def user_changed(sender, instance, **kwargs):
+    # post_save / post_delete receiver for User (connected in UsersConfig.ready); after
+    # commit, so no request can re-cache the pre-save row
+    transaction.on_commit(lambda: invalidate_user_state(instance.pk))
+
+
+class ClaimsUser(TokenUser):
+    """
+    Lightweight request.user built from JWT claims.
+    role / role_id / tenant / branch / approval_limit come from the cached user state (see
+    user_state), else from the token; any other attribute falls back to the full User row,
+    loaded once per request.
+    """
+
+    def __init__(self, token, state=None):
+        super().__init__(token)
+        self.__dict__["_state"] = state or {}
+
+    def _claim(self, name):
+        if name in self._state:
+            return self._state[name]
+        if name in self.token:
+            return self.token[name]
+        return getattr(self.get_full_user(), name)
+
+    def get_full_user(self):
+        if "_full_user" not in self.__dict__:
+            from users.models import User
+            self.__dict__["_full_user"] = User.objects.select_related("branch").get(pk=self.id)
+        return self.__dict__["_full_user"]
+
+    @cached_property
+    def role(self):
+        return self._claim("role")
+
+    @cached_property
+    def role_id(self):
+        return self._claim("role_id")
+
+    @cached_property
+    def tenant_id(self):
+        return self._claim("tenant_id")
+
+    @cached_property
+    def branch_id(self):
+        return self._claim("branch_id")
+
+    @cached_property
+    def approval_limit(self):
+        value = self._claim("approval_limit")
+        return Decimal(value) if value is not None else None
+
+    @cached_property
+    def is_staff(self):
+        return bool(self._claim("is_staff"))
+
+    @cached_property
+    def is_superuser(self):
+        return bool(self._claim("is_superuser"))
+
+    @property
+    def tenant(self):
+        # Served from the process-local tenant cache: no query on the hot path
+        return tenant_cache.get_by_pk(self.tenant_id) if self.tenant_id else None
+
+    @property
+    def branch(self):
+        return self.get_full_user().branch if self.branch_id else None
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        if attr in self._state:
+            return self._state[attr]
+        if attr in self.token:
+            return self.token[attr]
+        return getattr(self.get_full_user(), attr)
+
+
+class ClaimsJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT authentication for read-only endpoints: request.user is a ClaimsUser whose identity
+    comes from the cached user state, so a warm request costs no queries. Inactive or
+    deleted users are refused. Views that write to the user must keep the default
+    JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        super().get_user(validated_token)  # validates the user id claim
+        state = user_state(validated_token[api_settings.USER_ID_CLAIM])
+        if not state["is_active"]:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return ClaimsUser(validated_token, state)
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from brd_platform.timing import stage
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2-SHA256 with the work factor taken from PASSWORD_PBKDF2_ITERATIONS,
+    never below Django's own default. Stored hashes with a lower count keep verifying and
+    are re-hashed on next login; stronger ones are left alone, so lowering the setting
+    never weakens existing hashes. Verification shows up as the "password_hash" stage of
+    the login timings.
+    """
+    min_iterations = hashers.PBKDF2PasswordHasher.iterations
+
+    @property
+    def iterations(self):
+        configured = getattr(settings, "PASSWORD_PBKDF2_ITERATIONS", self.min_iterations)
+        return max(configured, self.min_iterations)
+
+    def must_update(self, encoded):
+        decoded = self.decode(encoded)
+        update_salt = hashers.must_update_salt(decoded["salt"], self.salt_entropy)
+        return decoded["iterations"] < self.iterations or update_salt
+
+    def verify(self, password, encoded):
+        with stage("password_hash"):
+            return super().verify(password, encoded)
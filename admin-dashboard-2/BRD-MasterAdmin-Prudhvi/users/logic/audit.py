@@ -0,0 +1,72 @@
+# users/logic/audit.py
+from django.conf import settings
+
+from brd_platform.batch_writer import BatchWriter
+from users.models import AuditLog
+
+# AuditLog rows share the write-behind path of login activity (brd_platform.batch_writer):
+# a request only appends to the queue; inserts happen in batches off the request thread.
+audit_log = BatchWriter(
+    AuditLog,
+    batch_size=getattr(settings, "AUDIT_LOG_BATCH_SIZE", 500),
+    flush_interval=getattr(settings, "AUDIT_LOG_FLUSH_INTERVAL", 2.0),
+    max_pending=getattr(settings, "AUDIT_LOG_MAX_PENDING", 20000),
+)
+
+UNKNOWN_IP = "0.0.0.0"  # AuditLog.ip_address is NOT NULL
+
+
+def client_ip(request):
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR")
+    if forwarded:
+        return forwarded.split(",")[0].strip() or UNKNOWN_IP
+    return request.META.get("REMOTE_ADDR") or UNKNOWN_IP
+
+
+def record_audit(request, action_type, module, description, tenant_id=None):
+    user = request.user if getattr(request.user, "is_authenticated", False) else None
+    if tenant_id is None:
+        tenant = getattr(request, "tenant", None)
+        tenant_id = getattr(user, "tenant_id", None) or getattr(tenant, "pk", None)
+    audit_log.add(AuditLog(
+        user_id=getattr(user, "pk", None),
+        tenant_id=tenant_id,
+        action_type=action_type,
+        module=module[:50],
+        description=description,
+        ip_address=client_ip(request),
+    ))
+
+
+class AuditMixin:
+    """
+    ViewSet mixin: every successful create/update/destroy (and any action listed in
+    `audit_actions`) queues one AuditLog row. It hooks finalize_response, so viewsets keep
+    their own perform_* overrides.
+    """
+    audit_module = None  # defaults to the model's app label, e.g. "LOS"
+    audit_actions = {}   # extra action name -> AuditLog action type
+
+    AUDITED = {"create": "CREATE", "update": "UPDATE", "partial_update": "UPDATE", "destroy": "DELETE"}
+
+    def get_audit_action_type(self, request, response):
+        return self.AUDITED.get(self.action) or self.audit_actions.get(self.action)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if 200 <= response.status_code < 300 and request.method not in ("GET", "HEAD", "OPTIONS"):
+            action_type = self.get_audit_action_type(request, response)
+            if action_type:
+                self.audit(request, response, action_type)
+        return response
+
+    def audit(self, request, response, action_type):
+        model = self.queryset.model if self.queryset is not None else self.get_serializer_class().Meta.model
+        data = response.data if isinstance(response.data, dict) else {}
+        pk = data.get("id") or self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        description = f"{self.action} {model._meta.object_name}"
+        if pk is not None:
+            description += f" #{pk}"
+        if action_type == "UPDATE" and hasattr(request.data, "keys"):
+            description += f" ({', '.join(sorted(request.data.keys())[:20])})"
+        record_audit(request, action_type, self.audit_module or model._meta.app_label.upper(), description)
@@ -0,0 +1,24 @@
+# users/logic/login_activity.py
+from django.conf import settings
+
+from brd_platform.batch_writer import BatchWriter
+from users.models import LoginActivity
+
+# Login rows are written behind the response (see BatchWriter); the admin list and the
+# user-activity report see them within LOGIN_ACTIVITY_FLUSH_INTERVAL seconds. A failed bulk insert
+# falls back to row-by-row inserts, so one bad row is retried (then logged) without losing the batch.
+login_activity = BatchWriter(
+    LoginActivity,
+    batch_size=getattr(settings, "LOGIN_ACTIVITY_BATCH_SIZE", 200),
+    flush_interval=getattr(settings, "LOGIN_ACTIVITY_FLUSH_INTERVAL", 1.0),
+    max_pending=getattr(settings, "LOGIN_ACTIVITY_MAX_PENDING", 10000),
+)
+
+
+def record_login(request, user, successful=True):
+    login_activity.add(LoginActivity(
+        user=user,
+        ip_address=request.META.get("REMOTE_ADDR"),
+        user_agent=request.META.get("HTTP_USER_AGENT", "")[:255],
+        successful=successful,
+    ))
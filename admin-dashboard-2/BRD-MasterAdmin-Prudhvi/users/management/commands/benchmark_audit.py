@@ -0,0 +1,58 @@
+import time
+import uuid
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from brd_platform.batch_writer import BatchWriter
+from users.logic.audit import client_ip
+from users.models import AuditLog
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure what an audited request pays for its AuditLog row: an inline insert versus "
+        "queueing it on the batched writer. Writes and then deletes benchmark rows in the current database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2000)
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        if rows < 1 or options["batch_size"] < 1:
+            raise CommandError("--rows and --batch-size must be at least 1")
+        request = RequestFactory().post("/benchmark/audit/")
+        request.user = AnonymousUser()
+        marker = f"benchmark {uuid.uuid4().hex[:8]}"
+
+        def entry():
+            return AuditLog(action_type="UPDATE", module="BENCHMARK", description=marker, ip_address=client_ip(request))
+
+        try:
+            started = time.perf_counter()
+            for _ in range(rows):
+                entry().save()
+            inline = time.perf_counter() - started
+
+            writer = BatchWriter(AuditLog, batch_size=options["batch_size"], flush_interval=0.5,
+                                 max_pending=max(rows, options["batch_size"]) * 2, name="audit-benchmark")
+            started = time.perf_counter()
+            for _ in range(rows):
+                writer.add(entry())
+            queued = time.perf_counter() - started
+            writer.flush()
+            drained = time.perf_counter() - started
+            if writer.written != rows:
+                raise CommandError(f"Batched writer stored {writer.written} of {rows} rows ({writer.failed} failed)")
+        finally:
+            AuditLog.objects.filter(module="BENCHMARK", description=marker).delete()
+
+        per_row = lambda seconds: f"{seconds / rows * 1e6:9.1f} us/row"  # noqa: E731
+        self.stdout.write(f"rows                  {rows}")
+        self.stdout.write(f"inline insert         {per_row(inline)}   (request path, {rows / inline:,.0f} rows/s)")
+        self.stdout.write(f"batched: enqueue      {per_row(queued)}   (request path)")
+        self.stdout.write(f"batched: until stored {per_row(drained)}   ({rows / drained:,.0f} rows/s)")
+        self.stdout.write(self.style.SUCCESS(f"Per-request overhead cut by {inline / queued:,.0f}x"))
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 08:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_user_role_id_user_supervisor_email_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['tenant', 'timestamp'], name='audit_tenant_timestamp'),
+        ),
+        migrations.AddIndex(
+            model_name='loginactivity',
+            index=models.Index(fields=['user', 'timestamp'], name='login_user_timestamp'),
+        ),
+    ]
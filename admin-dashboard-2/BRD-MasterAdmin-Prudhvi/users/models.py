@@ -94,6 +94,9 @@ class AuditLog(models.Model):
 
     class Meta:
         db_table = "audit_logs"
+        indexes = [
+            models.Index(fields=["tenant", "timestamp"], name="audit_tenant_timestamp"),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.action_type}"
@@ -129,6 +132,10 @@ class LoginActivity(models.Model):
     class Meta:
         db_table = "login_activity"
         ordering = ["-timestamp"]
+        indexes = [
+            # Last-login lookups per user (reporting.logic.user_activity)
+            models.Index(fields=["user", "timestamp"], name="login_user_timestamp"),
+        ]
 
     def __str__(self):
         return f"{self.user.email} - {self.timestamp} - {'Success' if self.successful else 'Failed'}"
\ No newline at end of file
@@ -3,3 +3,28 @@ from rest_framework.permissions import BasePermission
 class DefaultPermission(BasePermission):
     def has_permission(self, request, view):
         return bool(request.user and request.user.is_authenticated)
+
+
+def has_role_permission(user, code):
+    """True when the user's RoleMaster (or one of its parents) grants `code`; no DB access once warm."""
+    from adminpanel.logic.role_permissions import role_permissions
+
+    return role_permissions.has_permission(user, code)
+
+
+class HasRolePermission(BasePermission):
+    """
+    Checks RoleMaster permission codes. The view declares them per action:
+
+        required_permissions = {"disburse_loan": "loan_disburse", "destroy": "loan_edit"}
+
+    Actions without an entry are allowed ("*" sets a default for all of them).
+    """
+    message = "Your role does not allow this action."
+
+    def has_permission(self, request, view):
+        required = getattr(view, "required_permissions", {})
+        code = required.get(getattr(view, "action", None), required.get("*"))
+        if code is None:
+            return True
+        return has_role_permission(request.user, code)
@@ -1,7 +1,13 @@
 from rest_framework import serializers
 from .models import User, AuditLog, LoginActivity
 from tenants.models import Tenant
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from django.contrib.auth.models import update_last_login
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenObtainSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from brd_platform.timing import stage
+from .authentication import add_identity_claims
+from .logic.login_activity import record_login
 
 class TwoFASerializer(serializers.Serializer):
     code = serializers.CharField(max_length=6)
@@ -143,90 +149,87 @@ class LoginActivitySerializer(serializers.ModelSerializer):
         model = LoginActivity
         fields = "__all__"
 
-class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+class LoginTokenSerializer(TokenObtainPairSerializer):
+    """
+    Shared login pipeline: authenticate -> portal checks -> tokens -> bookkeeping, each
+    timed as a request stage (brd_platform.timing). Tokens are only minted for logins that
+    pass the checks, and the LoginActivity row is queued rather than inserted inline.
+    """
+
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
-        token["role"] = user.role
-        return token
-    
+        return add_identity_claims(token, user)
+
+    def check_user(self, user, request):
+        """Raise ValidationError to refuse the login; return a dict to answer without tokens."""
+        return None
+
     def validate(self, attrs):
-        data = super().validate(attrs)
-        user = self.user
         request = self.context.get("request")
+        with stage("authenticate"):
+            TokenObtainSerializer.validate(self, attrs)
+        user = self.user
+
+        with stage("checks"):
+            early = self.check_user(user, request)
+        if early is not None:
+            return early
+
+        with stage("token"):
+            refresh = self.get_token(user)
+            data = {"refresh": str(refresh), "access": str(refresh.access_token)}
+
+        with stage("bookkeeping"):
+            if api_settings.UPDATE_LAST_LOGIN:
+                update_last_login(None, user)
+            record_login(request, user, successful=True)
+        return data
+
+
+class CustomTokenObtainPairSerializer(LoginTokenSerializer):
+    def check_user(self, user, request):
         if not user.is_active:
             raise serializers.ValidationError("Account is disabled.")
         if user.role != "MASTER_ADMIN":
-            LoginActivity.objects.create(
-                user=user,
-                ip_address=request.META.get("REMOTE_ADDR"),
-                user_agent=request.META.get("HTTP_USER_AGENT", ""),
-                successful=False
-            )
+            record_login(request, user, successful=False)
             raise serializers.ValidationError("Access restricted to Master Admins only.")
         if user.is_2fa_enabled:
-            data["requires_2fa"] = True
-            data.pop("access", None)
-            data.pop("refresh", None)
-            return data
-        LoginActivity.objects.create(
-            user=user,
-            ip_address=request.META.get("REMOTE_ADDR"),
-            user_agent=request.META.get("HTTP_USER_AGENT", ""),
-            successful=True
-        )
-        return data
+            return {"requires_2fa": True}
+        return None
 
-class MasterAdminTokenSerializer(TokenObtainPairSerializer):
-    @classmethod
-    def get_token(cls, user):
-        token = super().get_token(user)
-        token["role"] = user.role
-        token["tenant_id"] = user.tenant_id
-        return token
 
-    def validate(self, attrs):
-        data = super().validate(attrs)
-        user = self.user
-        request = self.context.get("request")
+class MasterAdminTokenSerializer(LoginTokenSerializer):
+    def check_user(self, user, request):
         if not user.is_active:
             raise serializers.ValidationError("Account disabled")
         if user.role != "MASTER_ADMIN":
-            LoginActivity.objects.create(
-                user=user,
-                ip_address=request.META.get("REMOTE_ADDR"),
-                user_agent=request.META.get("HTTP_USER_AGENT", ""),
-                successful=False
-            )
+            record_login(request, user, successful=False)
             raise serializers.ValidationError("Master Admin access only")
-        LoginActivity.objects.create(
-            user=user,
-            ip_address=request.META.get("REMOTE_ADDR"),
-            user_agent=request.META.get("HTTP_USER_AGENT", ""),
-            successful=True
-        )
-        return data
+        return None
 
-class TenantTokenSerializer(TokenObtainPairSerializer):
-    @classmethod
-    def get_token(cls, user):
-        token = super().get_token(user)
-        token["role"] = user.role
-        token["tenant_id"] = user.tenant_id
-        return token
 
-    def validate(self, attrs):
-        data = super().validate(attrs)
-        user = self.user
-        request = self.context.get("request")
+class TenantTokenSerializer(LoginTokenSerializer):
+    def check_user(self, user, request):
         if not user.is_active:
             raise serializers.ValidationError("Account disabled")
         if user.role == "MASTER_ADMIN":
             raise serializers.ValidationError("Master Admin must login via Master Panel")
-        LoginActivity.objects.create(
-            user=user,
-            ip_address=request.META.get("REMOTE_ADDR"),
-            user_agent=request.META.get("HTTP_USER_AGENT", ""),
-            successful=True
-        )
-        return data
\ No newline at end of file
+        return None
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh that re-reads the user: inactive or deleted users get no new tokens, and the
+    identity claims (role, tenant, ...) are re-issued from the User row instead of being
+    copied forward from the old refresh token.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        user = User.objects.filter(pk=refresh[api_settings.USER_ID_CLAIM]).first()
+        if user is None or not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        add_identity_claims(refresh, user)
+        attrs["refresh"] = str(refresh)
+        return super().validate(attrs)
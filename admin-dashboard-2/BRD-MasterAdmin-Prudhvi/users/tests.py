@@ -1,3 +1,188 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
-# Create your tests here.
+from brd_platform.batch_writer import BatchWriter
+from crm.models import Lead
+from tenants.models import Tenant
+from .authentication import ClaimsJWTAuthentication, add_identity_claims
+from .hashers import PBKDF2PasswordHasher
+from .logic.audit import audit_log
+from .logic.login_activity import login_activity, record_login
+from .models import AuditLog, LoginActivity, User
+
+
+class LoginPipelineTests(TestCase):
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        self.user = User.objects.create_user(
+            email="officer@acme.test", password="S3cure-pass!", tenant=self.tenant, role="LOAN_OFFICER",
+        )
+        login_activity.flush()
+
+    @override_settings(SERVER_TIMING_HEADER=True)
+    def test_tenant_login_queues_activity_and_reports_stages(self):
+        client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post("/api/token/tenant/", {"email": "officer@acme.test", "password": "S3cure-pass!"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("access", response.data)
+        for name in ("authenticate", "password_hash", "token", "total"):
+            self.assertIn(f"{name};dur=", response["Server-Timing"])
+
+        self.assertEqual(login_activity.flush(), 1)
+        self.assertTrue(LoginActivity.objects.filter(user=self.user, successful=True).exists())
+
+    def test_rejected_portal_login_records_failure_without_tokens(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = APIClient().post("/api/token/master/", {"email": "officer@acme.test", "password": "S3cure-pass!"})
+        self.assertEqual(response.status_code, 400)
+        self.assertNotIn("access", response.data)
+        login_activity.flush()
+        self.assertTrue(LoginActivity.objects.filter(user=self.user, successful=False).exists())
+
+    def test_failed_login_row_does_not_take_the_batch_with_it(self):
+        request = APIRequestFactory().post("/api/token/tenant/", HTTP_USER_AGENT="pipeline")
+        with self.captureOnCommitCallbacks(execute=True):
+            record_login(request, self.user)
+            record_login(request, User(email="ghost@acme.test"))  # unsaved: user_id is NULL
+            record_login(request, self.user, successful=False)
+
+        with self.assertLogs("brd_platform.batch_writer", "WARNING"):
+            self.assertEqual(login_activity.flush(), 2)
+        self.assertEqual(
+            list(LoginActivity.objects.filter(user_agent="pipeline").order_by("id").values_list("successful", flat=True)),
+            [True, False],
+        )
+        for _ in range(login_activity.max_attempts - 1):
+            with self.assertLogs("brd_platform.batch_writer", "WARNING"):
+                login_activity.flush()
+        self.assertEqual(len(login_activity), 0)
+
+    def test_writer_flushes_inline_when_full(self):
+        writer = BatchWriter(LoginActivity, batch_size=10, flush_interval=60, max_pending=3)
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(3):
+                writer.add(LoginActivity(user=self.user, user_agent="test"))
+        self.assertEqual(len(writer), 0)
+        self.assertEqual(writer.written, 3)
+        self.assertEqual(LoginActivity.objects.filter(user_agent="test").count(), 3)
+
+
+class AuditTrailTests(TestCase):
+
+    def setUp(self):
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        self.user = User.objects.create_user(email="sales@acme.test", password="pw", tenant=self.tenant, role="SALES_EXECUTIVE")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        audit_log.flush()
+
+    def test_viewset_writes_are_audited_in_batches(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            created = self.client.post("/api/v1/crm/leads/", {"name": "Walk-in"}, HTTP_X_FORWARDED_FOR="10.1.2.3")
+            lead_id = created.data["id"]
+            self.client.patch(f"/api/v1/crm/leads/{lead_id}/", {"status": "CONTACTED"})
+            self.client.delete(f"/api/v1/crm/leads/{lead_id}/")
+            self.client.get("/api/v1/crm/leads/")
+        self.assertFalse(AuditLog.objects.exists())
+
+        self.assertEqual(audit_log.flush(), 3)
+        entries = list(AuditLog.objects.order_by("id").values_list("action_type", "module", "tenant_id", "ip_address"))
+        self.assertEqual(entries, [
+            ("CREATE", "CRM", self.tenant.pk, "10.1.2.3"),
+            ("UPDATE", "CRM", self.tenant.pk, "127.0.0.1"),
+            ("DELETE", "CRM", self.tenant.pk, "127.0.0.1"),
+        ])
+        self.assertIn(f"Lead #{lead_id} (status)", AuditLog.objects.get(action_type="UPDATE").description)
+        self.assertFalse(Lead.objects.exists())
+
+    def test_failed_insert_drops_only_the_bad_row(self):
+        writer = BatchWriter(AuditLog, batch_size=10, flush_interval=60, max_attempts=2)
+        with self.captureOnCommitCallbacks(execute=True):
+            writer.add(AuditLog(user=self.user, action_type="CREATE", module="CRM", description="ok", ip_address="10.0.0.1"))
+            # description is NOT NULL: this row alone fails to insert
+            writer.add(AuditLog(user=self.user, action_type="UPDATE", module="CRM", description=None, ip_address="10.0.0.1"))
+            writer.add(AuditLog(user=self.user, action_type="DELETE", module="CRM", description="ok", ip_address="10.0.0.1"))
+
+        with self.assertLogs("brd_platform.batch_writer", "WARNING"):
+            self.assertEqual(writer.flush(), 2)
+        self.assertEqual(list(AuditLog.objects.order_by("id").values_list("action_type", flat=True)), ["CREATE", "DELETE"])
+        # The failed row is retried once more, then dropped with its values logged
+        self.assertEqual(len(writer), 1)
+        with self.assertLogs("brd_platform.batch_writer", "ERROR") as logs:
+            self.assertEqual(writer.flush(), 0)
+        self.assertIn("'action_type': 'UPDATE'", logs.output[-1])
+        self.assertEqual((len(writer), writer.written, writer.failed), (0, 2, 1))
+
+    def test_rejected_requests_are_not_audited(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/api/v1/crm/leads/", {})
+        self.assertEqual(audit_log.flush(), 0)
+
+
+class PasswordHasherTests(TestCase):
+
+    def test_iterations_never_drop_below_django_default(self):
+        hasher = PBKDF2PasswordHasher()
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            self.assertEqual(hasher.iterations, PBKDF2PasswordHasher.min_iterations)
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=PBKDF2PasswordHasher.min_iterations + 1):
+            self.assertEqual(hasher.iterations, PBKDF2PasswordHasher.min_iterations + 1)
+
+    def test_hashes_are_only_upgraded(self):
+        hasher = PBKDF2PasswordHasher()
+        salt = hasher.salt()
+        weaker = hasher.encode("pw", salt, iterations=hasher.iterations - 1)
+        stronger = hasher.encode("pw", salt, iterations=hasher.iterations + 1)
+        self.assertTrue(hasher.must_update(weaker))
+        self.assertFalse(hasher.must_update(stronger))
+        self.assertTrue(hasher.verify("pw", stronger))
+
+
+class ClaimsAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.tenant = Tenant.objects.create(name="Acme Finance", tenant_type="NBFC", email="ops@acme.test")
+        self.user = User.objects.create_user(email="officer@acme.test", password="pw", tenant=self.tenant, role="LOAN_OFFICER")
+        self.refresh = add_identity_claims(RefreshToken.for_user(self.user), self.user)
+
+    def authenticate(self):
+        request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {self.refresh.access_token}")
+        user, _ = ClaimsJWTAuthentication().authenticate(request)
+        return user
+
+    def update_user(self, **fields):
+        for name, value in fields.items():
+            setattr(self.user, name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+    def test_warm_requests_cost_no_queries(self):
+        self.authenticate()
+        with self.assertNumQueries(0):
+            user = self.authenticate()
+            self.assertEqual((user.role, user.tenant_id), ("LOAN_OFFICER", self.tenant.pk))
+
+    def test_deactivated_user_is_refused(self):
+        self.assertEqual(self.authenticate().pk, self.user.pk)
+        self.update_user(is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+        response = APIClient().post("/api/token/refresh/", {"refresh": str(self.refresh)})
+        self.assertEqual(response.status_code, 401)
+
+    def test_role_change_applies_without_relogin(self):
+        self.assertEqual(self.authenticate().role, "LOAN_OFFICER")
+        self.update_user(role="UNDERWRITER", approval_limit=500000)
+        user = self.authenticate()
+        self.assertEqual((user.role, user.approval_limit), ("UNDERWRITER", 500000))
+
+        response = APIClient().post("/api/token/refresh/", {"refresh": str(self.refresh)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(AccessToken(response.data["access"])["role"], "UNDERWRITER")
+        self.assertEqual(RefreshToken(response.data["refresh"])["role"], "UNDERWRITER")
@@ -22,6 +22,9 @@ from django.db.models import Q
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.tokens import RefreshToken
 from .serializers import CustomTokenObtainPairSerializer
+from .authentication import add_identity_claims
+from .logic.login_activity import record_login
+from brd_platform.pagination import TimestampCursorPagination
 
 # --- 1. User ViewSet (Protected) ---
 class UserViewSet(viewsets.ModelViewSet):
@@ -38,6 +41,8 @@ class AuditLogViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['action_type', 'user', 'module']
     search_fields = ['description', 'user__email', 'ip_address']
+    pagination_class = TimestampCursorPagination
+    max_page_size = 500
 
 # --- 3. Signup View (Public) ---
 class SignupView(generics.CreateAPIView):
@@ -84,14 +89,9 @@ class Verify2FALoginView(APIView):
         if not totp.verify(code):
             return Response({"detail": "Invalid 2FA code"}, status=400)
 
-        refresh = RefreshToken.for_user(user)
+        refresh = add_identity_claims(RefreshToken.for_user(user), user)
 
-        LoginActivity.objects.create(
-            user=user,
-            ip_address=request.META.get("REMOTE_ADDR"),
-            user_agent=request.META.get("HTTP_USER_AGENT", ""),
-            successful=True
-        )
+        record_login(request, user, successful=True)
 
         return Response({
             "access": str(refresh.access_token),
@@ -149,6 +149,8 @@ class AuditLogViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['action_type', 'user', 'module']
     search_fields = ['description', 'user__email', 'ip_address']
+    pagination_class = TimestampCursorPagination
+    max_page_size = 500
 
 
 # ---------------------------
@@ -204,6 +206,7 @@ class ChangePasswordView(APIView):
 class LoginActivityListAPIView(generics.ListAPIView):
     serializer_class = LoginActivitySerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = TimestampCursorPagination
 
     def get_queryset(self):
         user = self.request.user
@@ -10,6 +10,7 @@ import BulkUploadModal from "../components/BulkUploadModal"; // ✅ Imported Pha
 export default function Leads() {
   const navigate = useNavigate();
   const [leads, setLeads] = useState([]);
+  const [nextPage, setNextPage] = useState(null); // cursor link to the next page of leads
   const [loading, setLoading] = useState(true);
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [isUploadOpen, setIsUploadOpen] = useState(false); // ✅ New State for Bulk Upload
@@ -22,7 +23,8 @@ export default function Leads() {
     setLoading(true);
     try {
       const response = await leadService.getAll();
-      setLeads(response.data);
+      setLeads(response.data.results);
+      setNextPage(response.data.next);
     } catch (err) {
       console.error("Failed to fetch leads", err);
     } finally {
@@ -30,6 +32,16 @@ export default function Leads() {
     }
   };
 
+  const loadMoreLeads = async () => {
+    try {
+      const response = await leadService.getPage(nextPage);
+      setLeads((current) => [...current, ...response.data.results]);
+      setNextPage(response.data.next);
+    } catch (err) {
+      console.error("Failed to fetch more leads", err);
+    }
+  };
+
   useEffect(() => {
     fetchLeads();
   }, []);
@@ -184,6 +196,13 @@ export default function Leads() {
             )}
           </tbody>
         </table>
+        {nextPage && !loading && (
+          <div className="p-4 text-center border-t border-gray-100">
+            <button onClick={loadMoreLeads} className="text-sm font-semibold text-indigo-600 hover:text-indigo-800">
+              Load more
+            </button>
+          </div>
+        )}
       </div>
 
       {/* ADD LEAD MODAL */}
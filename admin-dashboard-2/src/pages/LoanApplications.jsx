@@ -18,6 +18,7 @@ import {
 export default function LoanApplications() {
   const navigate = useNavigate(); 
   const [applications, setApplications] = useState([]);
+  const [nextPage, setNextPage] = useState(null); // cursor link to the next page
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   
@@ -44,7 +45,8 @@ export default function LoanApplications() {
       if (searchTerm) params.search = searchTerm;
 
       const response = await loanApplicationAPI.getAll(params);
-      setApplications(response.data);
+      setApplications(response.data.results);
+      setNextPage(response.data.next);
     } catch (error) {
       console.error("Failed to fetch loans:", error);
       setError("Unable to load applications. Please check your connection or try again.");
@@ -53,6 +55,17 @@ export default function LoanApplications() {
     }
   };
 
+  const loadMoreApplications = async () => {
+    try {
+      const response = await loanApplicationAPI.getPage(nextPage);
+      setApplications((current) => [...current, ...response.data.results]);
+      setNextPage(response.data.next);
+    } catch (error) {
+      console.error("Failed to fetch more loans:", error);
+      setError("Unable to load more applications. Please try again.");
+    }
+  };
+
   // ------------------------------------------------------------------
   // 2. HANDLERS
   // ------------------------------------------------------------------
@@ -231,6 +244,13 @@ export default function LoanApplications() {
             )}
           </tbody>
         </table>
+        {nextPage && !loading && (
+          <div className="p-4 text-center border-t border-gray-100">
+            <button onClick={loadMoreApplications} className="text-sm font-semibold text-indigo-600 hover:text-indigo-800">
+              Load more
+            </button>
+          </div>
+        )}
       </div>
 
       {/* ---------------- MODALS / OVERLAYS ---------------- */}
@@ -247,7 +247,7 @@ const InterestConfigForm = ({ product, onSave, onCancel }) => {
                  <SelectBox 
                     value={form.accrual_method}
                     onChange={e=>setForm({...form, accrual_method: e.target.value})}
-                    options={[{ label: "Simple Interest (Flat)", value: "SIMPLE" }, { label: "Compound (Reducing)", value: "COMPOUND" }]}
+                    options={[{ label: "Simple (Reducing, no capitalisation)", value: "SIMPLE" }, { label: "Compound (Reducing)", value: "COMPOUND" }, { label: "Flat Rate", value: "FLAT" }]}
                  />
               </FormGroup>
            </div>
@@ -1,9 +1,12 @@
 import axiosInstance from "../utils/axiosInstance";
 
 export const leadService = {
-  // Get all leads with optional filters
+  // Get a page of leads with optional filters: { results, next, previous }
   getAll: (params) => axiosInstance.get("/crm/leads/", { params }),
 
+  // Follow the `next` cursor link of a previous page
+  getPage: (url) => axiosInstance.get(url),
+
   // Create a new manual lead
   create: (data) => axiosInstance.post("/crm/leads/", data),
 
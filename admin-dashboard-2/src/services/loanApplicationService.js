@@ -1,7 +1,9 @@
 import axiosInstance from "../utils/axiosInstance";
 
 export const loanApplicationAPI = {
+  // Cursor-paginated: { results, next, previous }; follow `next` with getPage
   getAll: (params) => axiosInstance.get("los/loan-applications/", { params }),
+  getPage: (url) => axiosInstance.get(url),
   getById: (id) => axiosInstance.get(`los/loan-applications/${id}/`),
   create: (data) => axiosInstance.post("los/loan-applications/", data),
   